@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""
+Atomic file content cache for the Atomic/Composable Architecture.
+This is the most basic building block for sharing file reads between the file tools
+and writing files atomically.
+"""
+
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# "none", "file" or "dir", see write_text
+WRITE_DURABILITY = "file"
+
+# Cached (size, mtime_ns, inode) and content by path, least recently used first
+content_cache = OrderedDict()
+content_cache_bytes = 0
+
+
+def read_text(path: str) -> str:
+    """
+    Read a text file through the content cache.
+
+    Cached content is reused only while the file's size, modification time and
+    inode are unchanged, so edits made outside the tools (e.g. by bash) are seen.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        The file's content
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    cached = content_cache.get(path)
+    if cached and cached[0] == key:
+        content_cache.move_to_end(path)
+        return cached[1]
+    with open(path, "r") as f:
+        content = f.read()
+    cache_content(path, key, content)
+    return content
+
+
+def write_text(path: str, content: str) -> None:
+    """
+    Write a text file atomically and keep the content cache in step with it.
+
+    The content goes to a temp file in the same directory that is then renamed
+    over the target, so readers and crashes never see a half-written file.
+    WRITE_DURABILITY controls fsync: "none" leaves flushing to the OS, "file"
+    syncs the data before the rename and "dir" also syncs the directory so the
+    rename itself survives a power loss.
+
+    Args:
+        path: The path to the file
+        content: The new content
+    """
+    # Write through symlinks rather than replacing them
+    target = os.path.realpath(path)
+    directory = os.path.dirname(target)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            if WRITE_DURABILITY != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(target):
+            shutil.copymode(target, tmp_path)
+        else:
+            # mkstemp creates files as 0600, new files should get the usual mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if WRITE_DURABILITY == "dir":
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    stat = os.stat(target)
+    cache_content(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino), content)
+
+
+def cache_content(path: str, key: tuple, content: str) -> None:
+    """
+    Store content in the cache, evicting least recently used files past the byte budget.
+
+    Args:
+        path: The path to the file
+        key: The file's (size, mtime_ns, inode) when content was read or written
+        content: The file's content
+    """
+    global content_cache_bytes
+    if path in content_cache:
+        content_cache_bytes -= len(content_cache.pop(path)[1])
+    # Files too big to be worth caching are read straight from disk each time
+    if len(content) > CONTENT_CACHE_MAX_BYTES // 4:
+        return
+    content_cache[path] = (key, content)
+    content_cache_bytes += len(content)
+    while content_cache_bytes > CONTENT_CACHE_MAX_BYTES:
+        _, (_, evicted) = content_cache.popitem(last=False)
+        content_cache_bytes -= len(evicted)
@@ -5,6 +5,7 @@ Atomic file insert operation for the Atomic/Composable Architecture.
 This is the most basic building block for inserting content in files.
 """
 
+import io
 import sys
 import os
 
@@ -16,6 +17,8 @@ sys.path.insert(
 from atom.path_utils.normalize import normalize_path
 from atom.path_utils.validation import is_valid_path, file_exists
 from atom.logging.console import log_info, log_error
+from atom.file_tools.undo_tool import record_edit
+from atom.file_tools.cache_tool import read_text, write_text
 from atom.file_tools.result import FileOperationResult
 
 
@@ -54,8 +57,7 @@ def insert_in_file(path: str, insert_line: int, new_str: str) -> FileOperationRe
             return FileOperationResult(False, error_msg)
 
         # Read the file
-        with open(path, "r") as f:
-            lines = f.readlines()
+        lines = io.StringIO(read_text(path)).readlines()
 
         # Line is 0-indexed for this function, but Claude provides 1-indexed
         insert_line = min(max(0, insert_line - 1), len(lines))
@@ -73,11 +75,13 @@ def insert_in_file(path: str, insert_line: int, new_str: str) -> FileOperationRe
             new_str += "\n"
 
         # Insert the text
+        old_content = "".join(lines)
         lines.insert(insert_line, new_str)
 
         # Write the file
-        with open(path, "w") as f:
-            f.writelines(lines)
+        new_content = "".join(lines)
+        write_text(path, new_content)
+        record_edit(path, old_content, new_content)
 
         log_info(
             "insert_in_file",
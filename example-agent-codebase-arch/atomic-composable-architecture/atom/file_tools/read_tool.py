@@ -5,6 +5,7 @@ Atomic file read operation for the Atomic/Composable Architecture.
 This is the most basic building block for reading files.
 """
 
+import io
 import sys
 import os
 
@@ -15,6 +16,7 @@ from atom.path_utils.normalize import normalize_path
 from atom.path_utils.validation import is_valid_path, file_exists
 from atom.logging.console import log_error
 from atom.logging.display import display_file_content
+from atom.file_tools.cache_tool import read_text
 from atom.file_operations.result import FileOperationResult
 
 def read_file(path: str, start_line: int = None, end_line: int = None) -> FileOperationResult:
@@ -46,8 +48,7 @@ def read_file(path: str, start_line: int = None, end_line: int = None) -> FileOp
             return FileOperationResult(False, error_msg)
 
         # Read the file
-        with open(path, "r") as f:
-            lines = f.readlines()
+        lines = io.StringIO(read_text(path)).readlines()
 
         # Apply line range if specified
         if start_line is not None or end_line is not None:
@@ -14,6 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from atom.path_utils.normalize import normalize_path
 from atom.path_utils.validation import is_valid_path, file_exists
 from atom.logging.console import log_info, log_error
+from atom.file_tools.undo_tool import record_edit
+from atom.file_tools.cache_tool import read_text, write_text
 from atom.file_operations.result import FileOperationResult
 
 def replace_in_file(path: str, old_str: str, new_str: str) -> FileOperationResult:
@@ -45,8 +47,7 @@ def replace_in_file(path: str, old_str: str, new_str: str) -> FileOperationResul
             return FileOperationResult(False, error_msg)
 
         # Read the file
-        with open(path, "r") as f:
-            content = f.read()
+        content = read_text(path)
 
         # Check if the string exists
         if old_str not in content:
@@ -58,8 +59,8 @@ def replace_in_file(path: str, old_str: str, new_str: str) -> FileOperationResul
         new_content = content.replace(old_str, new_str, 1)
 
         # Write the file
-        with open(path, "w") as f:
-            f.write(new_content)
+        write_text(path, new_content)
+        record_edit(path, content, new_content)
 
         log_info("replace_in_file", f"Successfully replaced text in {path}")
         return FileOperationResult(True, f"Successfully replaced text in {path}")
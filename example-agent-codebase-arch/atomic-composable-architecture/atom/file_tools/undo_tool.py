@@ -3,10 +3,13 @@
 """
 Atomic file undo operation for the Atomic/Composable Architecture.
 This is the most basic building block for undoing changes to files.
+Edits made by the other file tools are recorded here as reverse diffs.
 """
 
 import sys
 import os
+import hashlib
+from typing import Any, Dict, List, Optional
 
 # Add the parent directory to the Python path to enable absolute imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -14,18 +17,243 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from atom.path_utils.normalize import normalize_path
 from atom.path_utils.validation import is_valid_path
 from atom.logging.console import log_info, log_error
+from atom.file_tools.cache_tool import read_text, write_text
 from atom.file_operations.result import FileOperationResult
 
+UNDO_FILE_BUDGET_BYTES = 4 * 1024 * 1024
+UNDO_TOTAL_BUDGET_BYTES = 32 * 1024 * 1024
+UNDO_SPILL_DIR = None
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """
+    Find how many leading characters two strings share.
+    Compares large slices first so long unchanged regions are skipped at C speed.
+
+    Args:
+        a: First string
+        b: Second string
+
+    Returns:
+        Length of the common prefix
+    """
+    limit = min(len(a), len(b))
+    length = 0
+    step = 1 << 16
+    while step:
+        if length + step <= limit and a[length : length + step] == b[length : length + step]:
+            length += step
+        else:
+            step //= 2
+    return length
+
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """
+    Find how many trailing characters two strings share, up to limit.
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Maximum suffix length to consider
+
+    Returns:
+        Length of the common suffix
+    """
+    length = 0
+    step = 1 << 16
+    while step:
+        if length + step <= limit and a[len(a) - length - step : len(a) - length] == b[
+            len(b) - length - step : len(b) - length
+        ]:
+            length += step
+        else:
+            step //= 2
+    return length
+
+
+class EditJournal:
+    """
+    Per-file history of reverse diffs for undo_edit.
+
+    Each edit is stored as the single span that changed: its offset, the text it
+    replaced and a hash of the text it became. Memory grows with the size of the
+    changes, not the size of the files, and is capped per file and overall. Past
+    the caps, the oldest entries are spilled to disk when a spill directory is
+    set, and dropped otherwise. History is keyed by the resolved path, so edits
+    made through a symlink or another spelling of a path undo together.
+    """
+
+    def __init__(self, file_budget: int, total_budget: int, spill_dir: Optional[str] = None):
+        self.file_budget = file_budget
+        self.total_budget = total_budget
+        self.spill_dir = spill_dir
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+        self.memory = 0
+        self.sequence = 0
+
+    def record(self, path: str, old_content: Optional[str], new_content: str) -> None:
+        """
+        Record the reverse diff of a write to path.
+
+        Args:
+            path: Normalized path of the file that was written
+            old_content: Content before the write, or None if the file was created
+            new_content: Content after the write
+        """
+        path = os.path.realpath(path)
+        if old_content is None:
+            offset, old_text, new_text = 0, "", new_content
+        else:
+            offset = common_prefix_length(old_content, new_content)
+            suffix = common_suffix_length(
+                old_content, new_content, min(len(old_content), len(new_content)) - offset
+            )
+            old_text = old_content[offset : len(old_content) - suffix]
+            new_text = new_content[offset : len(new_content) - suffix]
+            if not old_text and not new_text:
+                return
+        self.sequence += 1
+        entry = {
+            "sequence": self.sequence,
+            "created": old_content is None,
+            "offset": offset,
+            "old_text": old_text,
+            "spill_path": None,
+            "size": len(old_text.encode()),
+            "new_length": len(new_text),
+            "new_hash": hashlib.sha1(new_text.encode()).hexdigest(),
+            "content_length": len(new_content),
+        }
+        self.history.setdefault(path, []).append(entry)
+        self.memory += entry["size"]
+        self.enforce_budget(path)
+
+    def file_memory(self, path: str) -> int:
+        return sum(
+            entry["size"]
+            for entry in self.history.get(path, [])
+            if entry["old_text"] is not None
+        )
+
+    def evict(self, path: str) -> None:
+        """Spill or drop the oldest entry still held in memory for path."""
+        entries = self.history[path]
+        for index, entry in enumerate(entries):
+            if entry["old_text"] is None or not entry["size"]:
+                continue
+            self.memory -= entry["size"]
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                spill_path = os.path.join(self.spill_dir, f"{entry['sequence']}.txt")
+                with open(spill_path, "w") as f:
+                    f.write(entry["old_text"])
+                entry["spill_path"] = spill_path
+                entry["old_text"] = None
+            else:
+                # Older entries can't be applied without this one, so they go too
+                del entries[: index + 1]
+                if not entries:
+                    del self.history[path]
+            return
+
+    def enforce_budget(self, path: str) -> None:
+        while path in self.history and self.file_memory(path) > self.file_budget:
+            self.evict(path)
+        while self.memory > self.total_budget:
+            # Evict from whichever file holds the oldest in-memory entry
+            oldest = min(
+                (
+                    (entry["sequence"], entry_path)
+                    for entry_path, entries in self.history.items()
+                    for entry in entries
+                    if entry["old_text"] is not None and entry["size"]
+                ),
+                default=None,
+            )
+            if oldest is None:
+                break
+            self.evict(oldest[1])
+
+    def undo(self, path: str) -> str:
+        """
+        Undo the most recent recorded edit to path.
+
+        Args:
+            path: Normalized path of the file
+
+        Returns:
+            Message describing what was undone
+
+        Raises:
+            ValueError: If there is nothing to undo or the file changed since the edit
+        """
+        path = os.path.realpath(path)
+        entries = self.history.get(path)
+        if not entries:
+            raise ValueError(f"No edits to undo for {path}")
+        entry = entries[-1]
+
+        if not os.path.exists(path):
+            raise ValueError(f"File {path} no longer exists, so its last edit can't be undone")
+        content = read_text(path)
+        start, end = entry["offset"], entry["offset"] + entry["new_length"]
+        if (
+            len(content) != entry["content_length"]
+            or hashlib.sha1(content[start:end].encode()).hexdigest() != entry["new_hash"]
+        ):
+            raise ValueError(
+                f"File {path} was changed outside the editor since its last edit, so it can't be undone"
+            )
+
+        if entry["old_text"] is None:
+            with open(entry["spill_path"], "r") as f:
+                old_text = f.read()
+        else:
+            old_text = entry["old_text"]
+            self.memory -= entry["size"]
+
+        if entry["created"]:
+            os.remove(path)
+            message = f"Removed {path}, which was created by the last edit"
+        else:
+            write_text(path, content[:start] + old_text + content[end:])
+            message = f"Undid the last edit to {path}"
+
+        entries.pop()
+        if not entries:
+            del self.history[path]
+        if entry["spill_path"]:
+            os.remove(entry["spill_path"])
+        remaining = len(entries)
+        return f"{message} ({remaining} earlier edit{'s' if remaining != 1 else ''} can still be undone)"
+
+
+edit_journal = EditJournal(UNDO_FILE_BUDGET_BYTES, UNDO_TOTAL_BUDGET_BYTES, UNDO_SPILL_DIR)
+
+
+def record_edit(path: str, old_content: Optional[str], new_content: str) -> None:
+    """
+    Record a write so it can be undone with undo_edit.
+
+    Args:
+        path: The normalized path of the file that was written
+        old_content: The content before the write, or None if the file was created
+        new_content: The content after the write
+    """
+    edit_journal.record(path, old_content, new_content)
+
+
 def undo_edit(path: str) -> FileOperationResult:
     """
-    Placeholder for undo_edit functionality.
-    In a real implementation, you would need to track edit history.
+    Undo the most recent recorded edit to a file.
+    Can be called repeatedly to step further back through the file's history.
 
     Args:
         path: The path to the file whose last edit should be undone
 
     Returns:
-        FileOperationResult with message about undo functionality
+        FileOperationResult with result or error message
     """
     try:
         # Validate path
@@ -37,7 +265,12 @@ def undo_edit(path: str) -> FileOperationResult:
         # Normalize the path
         path = normalize_path(path)
 
-        message = "Undo functionality is not implemented in this version."
+        try:
+            message = edit_journal.undo(path)
+        except ValueError as e:
+            log_error("undo_edit", str(e))
+            return FileOperationResult(False, str(e))
+
         log_info("undo_edit", message)
         return FileOperationResult(True, message)
     except Exception as e:
@@ -15,6 +15,8 @@ from atom.path_utils.normalize import normalize_path
 from atom.path_utils.validation import is_valid_path
 from atom.path_utils.directory import ensure_directory_exists
 from atom.logging.console import log_info, log_error
+from atom.file_tools.undo_tool import record_edit
+from atom.file_tools.cache_tool import read_text, write_text
 from atom.file_operations.result import FileOperationResult
 
 def write_file(path: str, content: str) -> FileOperationResult:
@@ -41,9 +43,14 @@ def write_file(path: str, content: str) -> FileOperationResult:
         # Ensure the directory exists
         ensure_directory_exists(path)
 
+        # Keep the previous content so the write can be undone
+        old_content = None
+        if os.path.isfile(path):
+            old_content = read_text(path)
+
         # Write the file
-        with open(path, "w") as f:
-            f.write(content or "")
+        write_text(path, content or "")
+        record_edit(path, old_content, content or "")
 
         log_info("write_file", f"Successfully wrote to file {path}")
         return FileOperationResult(True, f"Successfully wrote to file {path}")
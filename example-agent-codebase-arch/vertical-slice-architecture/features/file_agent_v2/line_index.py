@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""
+Line index for the Vertical Slice Architecture implementation of the file editor agent.
+This module lets ranged views of large files seek straight to the requested lines.
+"""
+
+import os
+import mmap
+import bisect
+from array import array
+from collections import OrderedDict
+
+LINE_INDEX_BLOCK_BYTES = 1 << 16
+LINE_INDEX_MIN_BYTES = 1 << 20
+LINE_INDEX_MAX_FILES = 16
+
+# Cached indexes by path, least recently used first
+line_indexes = OrderedDict()
+
+
+def get_line_index(path: str) -> array:
+    """
+    Get the line index of a file, building it on first use.
+
+    The index stores, for every LINE_INDEX_BLOCK_BYTES block of the file, how
+    many newlines come before it. It's built with one C-speed count per block
+    and cached until the file's size or modification time changes.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        Array where entry i is the number of newlines before block i
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = line_indexes.get(path)
+    if cached and cached[0] == key:
+        line_indexes.move_to_end(path)
+        return cached[1]
+
+    counts = array("Q", [0])
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(LINE_INDEX_BLOCK_BYTES)
+            if not block:
+                break
+            counts.append(counts[-1] + block.count(b"\n"))
+
+    line_indexes[path] = (key, counts)
+    if len(line_indexes) > LINE_INDEX_MAX_FILES:
+        line_indexes.popitem(last=False)
+    return counts
+
+
+def line_start_offset(data: mmap.mmap, counts: array, newlines: int) -> int:
+    """
+    Find the byte offset just after the given number of newlines.
+
+    Args:
+        data: The memory-mapped file
+        counts: The file's line index
+        newlines: How many newlines to skip
+
+    Returns:
+        Byte offset of the start of line newlines + 1
+    """
+    if newlines <= 0:
+        return 0
+    if newlines > counts[-1]:
+        return len(data)
+    # Jump to the block holding the newline, then scan within it
+    block = bisect.bisect_left(counts, newlines) - 1
+    offset = block * LINE_INDEX_BLOCK_BYTES
+    for _ in range(newlines - counts[block]):
+        offset = data.find(b"\n", offset) + 1
+    return offset
+
+
+def read_line_range(path: str, start: int, end: int) -> str:
+    """
+    Read lines start through end (1-indexed, end -1 for end of file) of a file.
+
+    Small files are read whole. Larger files are memory-mapped and only the
+    requested window is read, using the cached line index to seek to it.
+
+    Args:
+        path: The path to the file
+        start: First line to read
+        end: Last line to read, or -1 for the end of the file
+
+    Returns:
+        The text of the requested lines
+    """
+    if os.path.getsize(path) < LINE_INDEX_MIN_BYTES:
+        with open(path, "r") as f:
+            lines = f.readlines()
+        start = max(0, start - 1)
+        end = len(lines) if end == -1 else min(len(lines), end)
+        return "".join(lines[start:end])
+
+    counts = get_line_index(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        begin = line_start_offset(data, counts, start - 1)
+        stop = len(data) if end == -1 else line_start_offset(data, counts, end)
+        window = data[begin:stop] if stop > begin else b""
+    return window.decode(errors="replace").replace("\r\n", "\n")
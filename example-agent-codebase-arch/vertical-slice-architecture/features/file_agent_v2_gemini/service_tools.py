@@ -14,6 +14,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from shared.utils import console, normalize_path, display_file_content
 from features.file_operations.model import FileOperationResult
+from features.file_agent_v2_gemini.line_index import read_line_range
+from features.file_agent_v2_gemini.atomic_write import write_text
 
 class FileOperationService:
     """
@@ -41,20 +43,12 @@ class FileOperationService:
                 console.log(f"[view_file] Error: {error_msg}")
                 return FileOperationResult(False, error_msg)
 
-            with open(path, "r") as f:
-                lines = f.readlines()
-
             if view_range:
                 start, end = view_range
-                # Convert to 0-indexed for Python
-                start = max(0, start - 1)
-                if end == -1:
-                    end = len(lines)
-                else:
-                    end = min(len(lines), end)
-                lines = lines[start:end]
-
-            content = "".join(lines)
+                content = read_line_range(path, start, end)
+            else:
+                with open(path, "r") as f:
+                    content = f.read()
 
             # Display the file content (only for console, not returned to Claude)
             display_file_content(path, content)
@@ -99,8 +93,7 @@ class FileOperationService:
 
             new_content = content.replace(old_str, new_str, 1)
 
-            with open(path, "w") as f:
-                f.write(new_content)
+            write_text(path, new_content)
 
             console.print(f"[green]Successfully replaced text in {path}[/green]")
             console.log(f"[str_replace] Successfully replaced text in {path}")
@@ -140,8 +133,7 @@ class FileOperationService:
                 console.log(f"[create_file] Creating directory: {directory}")
                 os.makedirs(directory)
 
-            with open(path, "w") as f:
-                f.write(file_text or "")
+            write_text(path, file_text or "")
 
             console.print(f"[green]Successfully created file {path}[/green]")
             console.log(f"[create_file] Successfully created file {path}")
@@ -205,8 +197,7 @@ class FileOperationService:
 
             lines.insert(insert_line, new_str)
 
-            with open(path, "w") as f:
-                f.writelines(lines)
+            write_text(path, "".join(lines))
 
             console.print(
                 f"[green]Successfully inserted text at line {insert_line + 1} in {path}[/green]"
@@ -0,0 +1,107 @@
+# /// script
+# dependencies = []
+# ///
+
+"""
+Micro-benchmark for how the file agents write edits to disk.
+
+Compares rewriting the file in place (what the agents did before) with writing
+a temp file and renaming it over the target under each durability mode the
+agents support: no fsync, fsync the file, and fsync the file and its directory.
+Every edit reads the file, replaces one short line and writes the whole file
+back, on a small source-sized file and on a large generated file.
+
+Example Usage:
+    uv run extra/bench_file_writes.py --dir /tmp --large-mb 32 --edits 50
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+
+def write_in_place(path: str, content: str, durability: str) -> None:
+    """Rewrites the file in place with open(path, "w")."""
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def write_atomic(path: str, content: str, durability: str) -> None:
+    """Writes a temp file and renames it over path, syncing per durability."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+        if durability != "none":
+            f.flush()
+            os.fsync(f.fileno())
+    shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+    if durability == "dir":
+        dir_fd = os.open(directory, os.O_RDONLY)
+        os.fsync(dir_fd)
+        os.close(dir_fd)
+
+
+STRATEGIES = [
+    ("in place", write_in_place, "none"),
+    ("atomic, no fsync", write_atomic, "none"),
+    ("atomic, fsync file", write_atomic, "file"),
+    ("atomic, fsync file + dir", write_atomic, "dir"),
+]
+
+
+def benchmark(path: str, edits: int, write, durability: str) -> list:
+    """Applies edits one-line replacements to path and returns per-edit times in ms."""
+    timings = []
+    for i in range(edits):
+        start = time.perf_counter()
+        with open(path) as f:
+            content = f.read()
+        content = content.replace(f"value_{i} = {i}\n", f"value_{i} = {i * 2}\n", 1)
+        write(path, content, durability)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def create_file(path: str, size: int) -> None:
+    """Writes a Python-like file of roughly size bytes."""
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = f"value_{i} = {i}\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+    with open(path, "w") as f:
+        f.writelines(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File agent write strategy benchmark")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Directory to write the benchmark files in")
+    parser.add_argument("--small-kb", type=int, default=4, help="Size of the small file in KB")
+    parser.add_argument("--large-mb", type=int, default=32, help="Size of the large file in MB")
+    parser.add_argument("--edits", type=int, default=50, help="Edits per strategy and file")
+    args = parser.parse_args()
+
+    for label, size in [
+        (f"{args.small_kb} KB file", args.small_kb * 1024),
+        (f"{args.large_mb} MB file", args.large_mb * 1024 * 1024),
+    ]:
+        print(f"\n{label}")
+        for name, write, durability in STRATEGIES:
+            path = os.path.join(args.dir, "sfa_bench_writes.py")
+            create_file(path, size)
+            timings = benchmark(path, args.edits, write, durability)
+            median = statistics.median(timings)
+            print(f"  {name:<26} median {median:8.2f} ms   {1000 / median:8.0f} edits/s")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
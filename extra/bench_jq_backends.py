@@ -0,0 +1,100 @@
+# /// script
+# dependencies = [
+#   "jq>=1.6.0",
+# ]
+# ///
+
+"""
+Micro-benchmark for running jq programs from the jq agent.
+
+Compares the jq binary (what sfa_jq_gemini_v1.py runs today) with evaluating
+the same programs in-process through the jq Python binding, both from the raw
+file text and from a document parsed once and kept in memory. The input is a
+synthetic JSON array generated on first run.
+
+Example Usage:
+    uv run extra/bench_jq_backends.py --json /tmp/sfa_bench.json --records 500000
+"""
+
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+import jq
+
+# The kind of programs the agent generates while refining a request
+PROGRAMS = [
+    "length",
+    "[.[] | select(.score > 80)] | length",
+    "[.[] | select(.status == \"active\") | {name, score}] | .[:5]",
+    "group_by(.status) | map({status: .[0].status, count: length})",
+]
+
+
+def create_json(path: str, records: int) -> None:
+    """Writes a JSON array of records synthetic user objects."""
+    statuses = ["active", "inactive", "pending"]
+    with open(path, "w") as f:
+        json.dump(
+            [
+                {
+                    "id": i,
+                    "name": f"user{i}",
+                    "score": i % 100,
+                    "status": statuses[i % 3],
+                    "tags": ["a", "b"],
+                }
+                for i in range(records)
+            ],
+            f,
+        )
+
+
+def run_binary(path: str, program: str) -> None:
+    """Runs a program the way the agent does: one jq process per attempt."""
+    subprocess.run(["jq", program, path], capture_output=True, check=True)
+
+
+def benchmark(label: str, run) -> float:
+    """Times run(program) for each program and prints the per-program latency."""
+    timings = []
+    for program in PROGRAMS:
+        start = time.perf_counter()
+        run(program)
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    print(f"{label:<28} median {median:9.1f} ms   max {max(timings):9.1f} ms")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description="jq agent execution backend benchmark")
+    parser.add_argument("--json", default="/tmp/sfa_bench.json", help="Benchmark JSON path")
+    parser.add_argument("--records", type=int, default=500_000, help="Records to generate if the file is missing")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json):
+        print(f"Creating {args.records:,} record JSON array at {args.json} ...")
+        create_json(args.json, args.records)
+    print(f"JSON size: {os.path.getsize(args.json) / 1e6:.1f} MB")
+
+    with open(args.json) as f:
+        text = f.read()
+    document = json.loads(text)
+
+    binary = benchmark("jq binary per attempt", lambda p: run_binary(args.json, p))
+    from_text = benchmark(
+        "binding, cached file text", lambda p: jq.compile(p).input_text(text).all()
+    )
+    # input_value serializes the document back to text for jq to parse
+    from_value = benchmark(
+        "binding, cached parsed value", lambda p: jq.compile(p).input_value(document).all()
+    )
+    print(f"Binding vs binary: {binary / from_text:.2f}x (text), {binary / from_value:.2f}x (value)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# /// script
+# dependencies = [
+#   "openai>=1.63.0",
+#   "rich>=13.7.0",
+#   "pydantic>=2.0.0",
+# ]
+# ///
+
+"""
+Micro-benchmark for the SQLite agent's tool latency.
+
+Compares the old pattern (sqlite3.connect + close on every tool call) with the
+shared, tuned read-only connection used by sfa_sqlite_openai_v2.py, over a
+typical sequence of agent tool queries. The database is generated on first run;
+the default row count produces a file of roughly 3 GB.
+
+Example Usage:
+    uv run extra/bench_sqlite_connection.py --db /tmp/sfa_bench.sqlite --rows 20000000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sfa_sqlite_openai_v2 as agent  # noqa: E402
+
+# The kind of queries the agent issues while exploring and testing
+TOOL_QUERIES = [
+    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';",
+    "PRAGMA table_info('events');",
+    "SELECT * FROM events LIMIT 5;",
+    "SELECT * FROM events WHERE id BETWEEN {start} AND {start} + 20;",
+    "SELECT category, COUNT(*), AVG(amount) FROM events WHERE id BETWEEN {start} AND {start} + 50000 GROUP BY category;",
+]
+
+
+def create_database(path: str, rows: int) -> None:
+    """Creates an events table with rows rows of synthetic data."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF;")
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute(
+        "CREATE TABLE events (id INTEGER PRIMARY KEY, user_id INTEGER, category TEXT, amount REAL, payload TEXT);"
+    )
+    categories = ["click", "view", "purchase", "signup", "logout"]
+    batch = 100_000
+    for offset in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?, ?, ?);",
+            (
+                (
+                    i,
+                    random.randrange(1_000_000),
+                    random.choice(categories),
+                    random.random() * 100,
+                    os.urandom(48).hex(),
+                )
+                for i in range(offset, min(offset + batch, rows))
+            ),
+        )
+        conn.commit()
+    conn.close()
+
+
+def run_per_call_connection(db_path: str, sql_query: str) -> None:
+    """Runs a query the way the agent used to: a fresh connection per tool call."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(sql_query)
+    cursor.fetchall()
+    conn.close()
+
+
+def benchmark(label: str, run, queries) -> float:
+    """Times run(query) for each query and prints the latency distribution."""
+    timings = []
+    for sql_query in queries:
+        start = time.perf_counter()
+        run(sql_query)
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    print(
+        f"{label:<24} median {median:8.3f} ms   p95 {sorted(timings)[int(len(timings) * 0.95)]:8.3f} ms"
+    )
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite agent connection benchmark")
+    parser.add_argument("--db", default="/tmp/sfa_bench.sqlite", help="Benchmark database path")
+    parser.add_argument("--rows", type=int, default=20_000_000, help="Rows to generate if the database is missing")
+    parser.add_argument("--iterations", type=int, default=200, help="Tool calls to time per mode")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Creating {args.rows:,} row database at {args.db} ...")
+        create_database(args.db, args.rows)
+    print(f"Database size: {os.path.getsize(args.db) / 1e9:.2f} GB")
+
+    max_id = sqlite3.connect(args.db).execute("SELECT MAX(id) FROM events;").fetchone()[0]
+    # An agent session iterates on a few slices of the data rather than random ones
+    working_set = [random.randrange(max_id) for _ in range(5)]
+    queries = [
+        random.choice(TOOL_QUERIES).format(start=random.choice(working_set))
+        for _ in range(args.iterations)
+    ]
+
+    # Warm the OS page cache so neither mode pays for the first disk reads
+    for sql_query in queries:
+        run_per_call_connection(args.db, sql_query)
+
+    agent.DB_PATH = args.db
+    per_call = benchmark(
+        "connect per tool call", lambda q: run_per_call_connection(args.db, q), queries
+    )
+    shared = benchmark("shared tuned connection", agent.execute_sql, queries)
+    print(f"Speedup: {per_call / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
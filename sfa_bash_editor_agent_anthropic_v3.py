@@ -28,11 +28,27 @@ Usage:
     uv run sfa_bash_editor_agent_anthropic_v3.py --prompt "List all Python files in the current directory sorted by size, then output to a markdown file called python_files_sorted_by_size.md"
 """
 
+import io
 import os
+import re
 import sys
+import mmap
+import bisect
+import time
+import uuid
+import atexit
+import select
+import signal
+import resource
 import argparse
 import json
+import tempfile
+import shutil
+import subprocess
 import traceback
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.panel import Panel
 import anthropic
@@ -40,7 +56,21 @@ import anthropic
 # Initialize global console
 console = Console()
 
-current_bash_env = os.environ.copy()
+bash_session = None
+BASH_TIMEOUT_SECONDS = 120
+OUTPUT_BUDGET_BYTES = 20000
+SPILL_OUTPUT = False
+LINE_INDEX_BLOCK_BYTES = 1 << 16
+LINE_INDEX_MIN_BYTES = 1 << 20
+LINE_INDEX_MAX_FILES = 16
+line_indexes = OrderedDict()
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+WRITE_DURABILITY = "file"
+MAX_PARALLEL_COMMANDS = 4
+COMMAND_CPU_SECONDS = 0
+COMMAND_MEMORY_MB = 0
+content_cache = OrderedDict()
+content_cache_bytes = 0
 
 AGENT_PROMPT = """<purpose>
     You are an expert integration assistant that can both edit files and execute bash commands.
@@ -50,6 +80,8 @@ AGENT_PROMPT = """<purpose>
     <instruction>Use the tools provided to accomplish file editing and bash command execution as needed.</instruction>
     <instruction>When you have completed the user's task, call complete_task to finalize the process.</instruction>
     <instruction>Provide reasoning with every tool call.</instruction>
+    <instruction>When a change touches many places, use apply_edits to make all of them in one call instead of one str_replace per change.</instruction>
+    <instruction>When you need to run several independent commands, such as tests and a linter, use execute_bash_many to run them at the same time.</instruction>
     <instruction>When constructing paths use /repo to start from the root of the repository. We'll replace it with the current working directory.</instruction>
 </instructions>
 
@@ -70,6 +102,12 @@ AGENT_PROMPT = """<purpose>
                 <description>Path of the file to view</description>
                 <required>true</required>
             </parameter>
+            <parameter>
+                <name>view_range</name>
+                <type>array</type>
+                <description>Optional [start, end] lines to view (1-indexed, end -1 for end of file)</description>
+                <required>false</required>
+            </parameter>
         </parameters>
     </tool>
 
@@ -160,9 +198,28 @@ AGENT_PROMPT = """<purpose>
         </parameters>
     </tool>
 
+    <tool>
+        <name>apply_edits</name>
+        <description>Apply many replacements and insertions across one or more files in one call. Each old_str must match exactly once, anchors and line numbers refer to the files before the batch, and either every edit is applied or none are.</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Explain why these edits are needed</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>edits</name>
+                <type>array</type>
+                <description>Edits, each with path, new_str and either old_str (unique text to replace) or insert_line (insert after this line, 0 for the top)</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+
     <tool>
         <name>execute_bash</name>
-        <description>Execute a bash command</description>
+        <description>Execute a bash command in a persistent session that keeps the working directory and environment</description>
         <parameters>
             <parameter>
                 <name>reasoning</name>
@@ -176,12 +233,55 @@ AGENT_PROMPT = """<purpose>
                 <description>The bash command to run</description>
                 <required>true</required>
             </parameter>
+            <parameter>
+                <name>timeout</name>
+                <type>integer</type>
+                <description>Seconds to wait for the command before giving up</description>
+                <required>false</required>
+            </parameter>
+        </parameters>
+    </tool>
+
+    <tool>
+        <name>execute_bash_many</name>
+        <description>Run several independent commands at the same time, each in a fresh bash process started in the session's working directory, with a timeout and optional CPU time and memory limits. Returns each command's exit code, duration and output as JSON.</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Explain why these commands should be executed</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>commands</name>
+                <type>array</type>
+                <description>Commands, each with command and optional timeout (seconds), cpu_seconds and memory_mb overriding the defaults below</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>timeout</name>
+                <type>integer</type>
+                <description>Default seconds each command may run before it is killed</description>
+                <required>false</required>
+            </parameter>
+            <parameter>
+                <name>cpu_seconds</name>
+                <type>integer</type>
+                <description>Default CPU time limit per process in seconds</description>
+                <required>false</required>
+            </parameter>
+            <parameter>
+                <name>memory_mb</name>
+                <type>integer</type>
+                <description>Default address space limit per process in MB</description>
+                <required>false</required>
+            </parameter>
         </parameters>
     </tool>
 
     <tool>
         <name>restart_bash</name>
-        <description>Restart the bash session with a fresh environment</description>
+        <description>Restart the bash session with a fresh environment and working directory</description>
         <parameters>
             <parameter>
                 <name>reasoning</name>
@@ -214,10 +314,243 @@ AGENT_PROMPT = """<purpose>
 root_path_to_replace_with_cwd = "/repo"
 
 
+def read_text(path: str) -> str:
+    """Read a text file through the content cache.
+
+    Cached content is reused only while the file's size, modification time and
+    inode are unchanged, so edits made outside the tools (e.g. by bash) are seen.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        The file's content
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    cached = content_cache.get(path)
+    if cached and cached[0] == key:
+        content_cache.move_to_end(path)
+        return cached[1]
+    with open(path, "r") as f:
+        content = f.read()
+    cache_content(path, key, content)
+    return content
+
+
+def write_text(path: str, content: str) -> None:
+    """Write a text file atomically and keep the content cache in step with it.
+
+    The content goes to a temp file in the same directory that is then renamed
+    over the target, so readers and crashes never see a half-written file.
+    WRITE_DURABILITY controls fsync: "none" leaves flushing to the OS, "file"
+    syncs the data before the rename and "dir" also syncs the directory so the
+    rename itself survives a power loss.
+
+    Args:
+        path: The path to the file
+        content: The new content
+    """
+    target, tmp_path = stage_text(path, content)
+    try:
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if WRITE_DURABILITY == "dir":
+        sync_directory(os.path.dirname(target))
+    stat = os.stat(target)
+    cache_content(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino), content)
+
+
+def stage_text(path: str, content: str) -> Tuple[str, str]:
+    """Write content to a temp file next to path, ready to be renamed over it.
+
+    Args:
+        path: The path to the file
+        content: The new content
+
+    Returns:
+        Tuple of the resolved target path and the temp file path
+    """
+    # Write through symlinks rather than replacing them
+    target = os.path.realpath(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target), prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            if WRITE_DURABILITY != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(target):
+            shutil.copymode(target, tmp_path)
+        else:
+            # mkstemp creates files as 0600, new files should get the usual mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return target, tmp_path
+
+
+def sync_directory(directory: str) -> None:
+    """Fsync a directory so renames into it survive a power loss."""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def write_texts(changes: Dict[str, Tuple[str, str]]) -> None:
+    """Write several files so that either all of them change or none do.
+
+    Every file is staged to a temp file first, so a failed write leaves all
+    targets untouched. The temp files are then renamed into place, and if a
+    rename fails the files already replaced get their original content back.
+
+    Args:
+        changes: Map of path to (original content, new content)
+    """
+    staged = []
+    try:
+        for path, (_, new_content) in changes.items():
+            staged.append((path, *stage_text(path, new_content)))
+    except BaseException:
+        for _, _, tmp_path in staged:
+            os.remove(tmp_path)
+        raise
+
+    replaced = []
+    try:
+        for path, target, tmp_path in staged:
+            os.replace(tmp_path, target)
+            replaced.append(path)
+    except BaseException:
+        for _, _, tmp_path in staged[len(replaced) :]:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        for path in replaced:
+            write_text(path, changes[path][0])
+        raise
+
+    if WRITE_DURABILITY == "dir":
+        for directory in {os.path.dirname(target) for _, target, _ in staged}:
+            sync_directory(directory)
+    for path, target, _ in staged:
+        stat = os.stat(target)
+        cache_content(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino), changes[path][1])
+
+
+def cache_content(path: str, key: tuple, content: str) -> None:
+    """Store content in the cache, evicting least recently used files past the byte budget."""
+    global content_cache_bytes
+    if path in content_cache:
+        content_cache_bytes -= len(content_cache.pop(path)[1])
+    # Files too big to be worth caching are read straight from disk each time
+    if len(content) > CONTENT_CACHE_MAX_BYTES // 4:
+        return
+    content_cache[path] = (key, content)
+    content_cache_bytes += len(content)
+    while content_cache_bytes > CONTENT_CACHE_MAX_BYTES:
+        _, (_, evicted) = content_cache.popitem(last=False)
+        content_cache_bytes -= len(evicted)
+
+
+def get_line_index(path: str) -> array:
+    """Get the line index of a file, building it on first use.
+
+    The index stores, for every LINE_INDEX_BLOCK_BYTES block of the file, how
+    many newlines come before it. It's built with one C-speed count per block
+    and cached until the file's size or modification time changes.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        Array where entry i is the number of newlines before block i
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = line_indexes.get(path)
+    if cached and cached[0] == key:
+        line_indexes.move_to_end(path)
+        return cached[1]
+
+    counts = array("Q", [0])
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(LINE_INDEX_BLOCK_BYTES)
+            if not block:
+                break
+            counts.append(counts[-1] + block.count(b"\n"))
+
+    line_indexes[path] = (key, counts)
+    if len(line_indexes) > LINE_INDEX_MAX_FILES:
+        line_indexes.popitem(last=False)
+    return counts
+
+
+def line_start_offset(data: mmap.mmap, counts: array, newlines: int) -> int:
+    """Find the byte offset just after the given number of newlines.
+
+    Args:
+        data: The memory-mapped file
+        counts: The file's line index
+        newlines: How many newlines to skip
+
+    Returns:
+        Byte offset of the start of line newlines + 1
+    """
+    if newlines <= 0:
+        return 0
+    if newlines > counts[-1]:
+        return len(data)
+    # Jump to the block holding the newline, then scan within it
+    block = bisect.bisect_left(counts, newlines) - 1
+    offset = block * LINE_INDEX_BLOCK_BYTES
+    for _ in range(newlines - counts[block]):
+        offset = data.find(b"\n", offset) + 1
+    return offset
+
+
+def read_line_range(path: str, start: int, end: int) -> str:
+    """Read lines start through end (1-indexed, end -1 for end of file) of a file.
+
+    Small files are read whole. Larger files are memory-mapped and only the
+    requested window is read, using the cached line index to seek to it.
+
+    Args:
+        path: The path to the file
+        start: First line to read
+        end: Last line to read, or -1 for the end of the file
+
+    Returns:
+        The text of the requested lines
+    """
+    if os.path.getsize(path) < LINE_INDEX_MIN_BYTES:
+        lines = io.StringIO(read_text(path)).readlines()
+        start = max(0, start - 1)
+        end = len(lines) if end == -1 else min(len(lines), end)
+        return "".join(lines[start:end])
+
+    counts = get_line_index(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        begin = line_start_offset(data, counts, start - 1)
+        stop = len(data) if end == -1 else line_start_offset(data, counts, end)
+        window = data[begin:stop] if stop > begin else b""
+    return window.decode(errors="replace").replace("\r\n", "\n")
+
+
 def tool_view_file(tool_input: dict) -> dict:
     try:
         reasoning = tool_input.get("reasoning")
         path = tool_input.get("path")
+        view_range = tool_input.get("view_range")
         if path:
             path = path.replace(root_path_to_replace_with_cwd, os.getcwd())
 
@@ -226,15 +559,19 @@ def tool_view_file(tool_input: dict) -> dict:
             console.log(f"[tool_view_file] Error: {error_message}")
             return {"error": error_message}
 
-        console.log(f"[tool_view_file] reasoning: {reasoning}, path: {path}")
+        console.log(
+            f"[tool_view_file] reasoning: {reasoning}, path: {path}, view_range: {view_range}"
+        )
 
         if not os.path.exists(path):
             error_message = f"File {path} does not exist"
             console.log(f"[tool_view_file] Error: {error_message}")
             return {"error": error_message}
 
-        with open(path, "r") as f:
-            content = f.read()
+        if view_range:
+            start, end = view_range
+            return {"result": read_line_range(path, start, end)}
+        content = read_text(path)
         return {"result": content}
     except Exception as e:
         console.log(f"[tool_view_file] Error: {str(e)}")
@@ -268,8 +605,7 @@ def tool_create_file(tool_input: dict) -> dict:
         else:
             os.makedirs(dirname, exist_ok=True)
 
-        with open(path, "w") as f:
-            f.write(file_text or "")
+        write_text(path, file_text or "")
         return {"result": f"File created at {path}"}
     except Exception as e:
         console.log(f"[tool_create_file] Error: {str(e)}")
@@ -306,8 +642,7 @@ def tool_str_replace(tool_input: dict) -> dict:
             console.log(f"[tool_str_replace] Error: {error_message}")
             return {"error": error_message}
 
-        with open(path, "r") as f:
-            content = f.read()
+        content = read_text(path)
 
         if old_str not in content:
             error_message = f"'{old_str}' not found in {path}"
@@ -315,8 +650,7 @@ def tool_str_replace(tool_input: dict) -> dict:
             return {"error": error_message}
 
         new_content = content.replace(old_str, new_str or "")
-        with open(path, "w") as f:
-            f.write(new_content)
+        write_text(path, new_content)
         return {"result": "Text replaced successfully"}
     except Exception as e:
         console.log(f"[tool_str_replace] Error: {str(e)}")
@@ -358,8 +692,7 @@ def tool_insert_line(tool_input: dict) -> dict:
             console.log(f"[tool_insert_line] Error: {error_message}")
             return {"error": error_message}
 
-        with open(path, "r") as f:
-            lines = f.readlines()
+        lines = io.StringIO(read_text(path)).readlines()
 
         # Check that the index is within acceptable bounds (allowing insertion at end)
         if insert_line_num < 0 or insert_line_num > len(lines):
@@ -370,8 +703,7 @@ def tool_insert_line(tool_input: dict) -> dict:
             return {"error": error_message}
 
         lines.insert(insert_line_num, new_str + "\n")
-        with open(path, "w") as f:
-            f.writelines(lines)
+        write_text(path, "".join(lines))
         return {"result": "Line inserted successfully"}
     except Exception as e:
         console.log(f"[tool_insert_line] Error: {str(e)}")
@@ -379,6 +711,331 @@ def tool_insert_line(tool_input: dict) -> dict:
         return {"error": str(e)}
 
 
+def plan_edits(content: str, edits: List[Tuple[int, dict]]) -> Tuple[Optional[str], List[str]]:
+    """Apply a batch of edits to a file's content in a single pass.
+
+    Every anchor is resolved against the original content before anything is
+    changed: old_str must occur exactly once and insert_line must be in range,
+    and no two edits may touch overlapping text.
+
+    Args:
+        content: The file's current content
+        edits: (number, edit) pairs, where each edit has new_str and either
+            old_str or insert_line (insert after that line, 0 for the top)
+
+    Returns:
+        Tuple of the new content (None if any edit is invalid) and the errors
+    """
+    spans = []
+    errors = []
+    line_starts = None
+    for number, edit in edits:
+        new_str = edit.get("new_str") or ""
+        if edit.get("old_str"):
+            count = content.count(edit["old_str"])
+            if count != 1:
+                errors.append(
+                    f"edit {number}: old_str "
+                    + ("not found" if count == 0 else f"found {count} times, it must be unique")
+                )
+                continue
+            start = content.index(edit["old_str"])
+            spans.append((start, start + len(edit["old_str"]), new_str, number))
+        elif edit.get("insert_line") is not None:
+            if line_starts is None:
+                line_starts = [0] + [match.end() for match in re.finditer("\n", content)]
+                line_count = len(line_starts) - (1 if not content or content.endswith("\n") else 0)
+            line = edit["insert_line"]
+            if line < 0 or line > line_count:
+                errors.append(f"edit {number}: insert_line {line} out of range (0-{line_count})")
+                continue
+            if not new_str.endswith("\n"):
+                new_str += "\n"
+            if line == line_count:
+                offset = len(content)
+                if content and not content.endswith("\n"):
+                    new_str = "\n" + new_str
+            else:
+                offset = line_starts[line]
+            spans.append((offset, offset, new_str, number))
+        else:
+            errors.append(f"edit {number}: needs either old_str or insert_line")
+
+    # Sorting is stable, so insertions at the same line keep their order
+    spans.sort(key=lambda span: (span[0], span[1]))
+    for previous, current in zip(spans, spans[1:]):
+        if current[0] < previous[1]:
+            errors.append(f"edit {current[3]}: overlaps edit {previous[3]}")
+    if errors:
+        return None, errors
+
+    pieces = []
+    position = 0
+    for start, end, new_str, _ in spans:
+        pieces.append(content[position:start])
+        pieces.append(new_str)
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces), []
+
+
+def tool_apply_edits(tool_input: dict) -> dict:
+    try:
+        reasoning = tool_input.get("reasoning")
+        edits = tool_input.get("edits")
+
+        if not edits:
+            error_message = "No edits provided: edits is empty."
+            console.log(f"[tool_apply_edits] Error: {error_message}")
+            return {"error": error_message}
+
+        console.log(f"[tool_apply_edits] reasoning: {reasoning}, edits: {len(edits)}")
+
+        by_path = OrderedDict()
+        errors = []
+        for number, edit in enumerate(edits, 1):
+            path = edit.get("path")
+            if not path or not path.strip():
+                errors.append(f"edit {number}: path is empty")
+                continue
+            path = path.replace(root_path_to_replace_with_cwd, os.getcwd())
+            # Different spellings of one file must share a plan, or the later
+            # write would discard the earlier one's edits
+            by_path.setdefault(os.path.realpath(path), []).append((number, edit))
+
+        planned = {}
+        for path, file_edits in by_path.items():
+            if not os.path.isfile(path):
+                errors.append(f"{path}: file does not exist")
+                continue
+            content = read_text(path)
+            new_content, file_errors = plan_edits(content, file_edits)
+            errors.extend(f"{path}: {error}" for error in file_errors)
+            planned[path] = (content, new_content)
+
+        if errors:
+            error_message = "No edits were applied:\n- " + "\n- ".join(errors)
+            console.log(f"[tool_apply_edits] Error: {error_message}")
+            return {"error": error_message}
+
+        write_texts(planned)
+        summary = []
+        for path, (content, new_content) in planned.items():
+            summary.append(
+                f"{path}: {len(by_path[path])} edit{'s' if len(by_path[path]) != 1 else ''}, {content.count(chr(10))} -> {new_content.count(chr(10))} lines"
+            )
+        return {
+            "result": f"Applied {len(edits)} edits to {len(planned)} file{'s' if len(planned) != 1 else ''}:\n"
+            + "\n".join(summary)
+        }
+    except Exception as e:
+        console.log(f"[tool_apply_edits] Error: {str(e)}")
+        console.log(traceback.format_exc())
+        return {"error": str(e)}
+
+
+class OutputCapture:
+    """Keeps the head and tail of a command's output within a byte budget.
+
+    Everything written is counted, and optionally spilled to a temp file so the
+    agent can page through the full output with view_file.
+    """
+
+    def __init__(self, budget: int, spill: bool):
+        self.head_limit = budget // 2
+        self.tail_limit = budget - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.spill_path = None
+        self.spill_file = None
+        if spill:
+            fd, self.spill_path = tempfile.mkstemp(prefix="sfa_bash_", suffix=".log")
+            self.spill_file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        self.total_lines += data.count(b"\n")
+        if self.spill_file:
+            self.spill_file.write(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[: len(self.tail) - self.tail_limit]
+
+    def close(self) -> None:
+        if self.spill_file:
+            self.spill_file.close()
+            self.spill_file = None
+
+    def text(self) -> str:
+        """Returns the captured output, noting what was dropped from the middle."""
+        self.close()
+        dropped_bytes = self.total_bytes - len(self.head) - len(self.tail)
+        if dropped_bytes <= 0:
+            if self.spill_path:
+                os.remove(self.spill_path)
+                self.spill_path = None
+            return (self.head + self.tail).decode(errors="replace")
+        # Cut at line boundaries so no partial lines are shown, unless the
+        # output has no newline to cut at, then keep the byte-cut head and tail
+        head_end = self.head.rfind(b"\n") + 1
+        head = self.head[:head_end] if head_end else self.head
+        tail_start = self.tail.find(b"\n") + 1
+        tail = self.tail[tail_start:] if tail_start < len(self.tail) else self.tail
+        dropped_bytes = self.total_bytes - len(head) - len(tail)
+        dropped_lines = self.total_lines - head.count(b"\n") - tail.count(b"\n")
+        note = f"... [{dropped_bytes:,} bytes / {dropped_lines:,} lines omitted"
+        if self.spill_path:
+            note += f"; full output ({self.total_bytes:,} bytes) saved to {self.spill_path}, page through it with view_file and view_range"
+        if head and not head.endswith(b"\n"):
+            note = "\n" + note
+        return (
+            head.decode(errors="replace")
+            + note
+            + "] ...\n"
+            + tail.decode(errors="replace")
+        )
+
+
+class BashSession:
+    """A long-lived bash process that keeps cwd, variables and functions between commands.
+
+    Commands are written to bash's stdin and their output is framed by a
+    sentinel line carrying the exit code, so each call only pays for the
+    command itself instead of a new shell.
+    """
+
+    def __init__(self):
+        self.sentinel = f"__SFA_DONE_{uuid.uuid4().hex}__"
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=os.environ.copy(),
+            start_new_session=True,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, command: str, timeout: float) -> Tuple[int, str, str]:
+        """Runs a command in the session and waits for its sentinel.
+
+        Output is streamed into an OutputCapture per stream, so only
+        OUTPUT_BUDGET_BYTES of each is held in memory however much the
+        command prints.
+
+        Args:
+            command: Bash command, may span several lines
+            timeout: Seconds to wait before giving up on the command
+
+        Returns:
+            Tuple of exit code, stdout and stderr
+
+        Raises:
+            TimeoutError: If the command didn't finish within timeout
+            RuntimeError: If the command ended the session (e.g. exit)
+        """
+        # The command is read into a variable first so unbalanced quotes can't
+        # swallow the sentinel, and runs with stdin closed so it can't read the
+        # commands that follow it
+        delimiter = f"__SFA_CMD_{uuid.uuid4().hex}__"
+        script = (
+            f"IFS= read -r -d '' __sfa_command <<'{delimiter}'\n"
+            f"{command}\n"
+            f"{delimiter}\n"
+            f'eval "$__sfa_command" < /dev/null\n'
+            f"printf '\\n{self.sentinel} %d\\n' $?\n"
+            f"printf '\\n{self.sentinel}\\n' >&2\n"
+        )
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+        stdout_fd = self.process.stdout.fileno()
+        stderr_fd = self.process.stderr.fileno()
+        captures = {
+            stdout_fd: OutputCapture(OUTPUT_BUDGET_BYTES, SPILL_OUTPUT),
+            stderr_fd: OutputCapture(OUTPUT_BUDGET_BYTES, SPILL_OUTPUT),
+        }
+        marker = f"\n{self.sentinel}".encode()
+        # Bytes held back in case the sentinel is split across reads, and
+        # whatever follows the sentinel once it's been seen
+        held = {stdout_fd: b"", stderr_fd: b""}
+        trailers = {}
+        pending = set(captures)
+        deadline = time.monotonic() + timeout
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if stdout_fd not in trailers:
+                        captures[stdout_fd].write(held[stdout_fd])
+                    output = captures[stdout_fd].text().strip()
+                    raise TimeoutError(
+                        f"Command timed out after {timeout:g} seconds."
+                        + (f" Output so far:\n{output}" if output else "")
+                    )
+                ready, _, _ = select.select(list(pending), [], [], remaining)
+                for fd in ready:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        raise RuntimeError("The command ended the bash session.")
+                    if fd in trailers:
+                        trailers[fd] += chunk
+                    else:
+                        data = held[fd] + chunk
+                        index = data.find(marker)
+                        if index == -1:
+                            keep = min(len(data), len(marker))
+                            captures[fd].write(data[: len(data) - keep])
+                            held[fd] = data[len(data) - keep :]
+                            continue
+                        captures[fd].write(data[:index])
+                        trailers[fd] = data[index + len(marker) :]
+                    if trailers[fd].endswith(b"\n"):
+                        pending.discard(fd)
+        finally:
+            for capture in captures.values():
+                capture.close()
+
+        return (
+            int(trailers[stdout_fd]),
+            captures[stdout_fd].text(),
+            captures[stderr_fd].text(),
+        )
+
+    def close(self) -> None:
+        """Kills bash and everything it started."""
+        if self.alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.process.wait()
+
+
+def get_bash_session() -> BashSession:
+    """Returns the running bash session, starting a new one if needed."""
+    global bash_session
+    if bash_session is None or not bash_session.alive():
+        bash_session = BashSession()
+    return bash_session
+
+
+def close_bash_session() -> None:
+    global bash_session
+    if bash_session is not None:
+        bash_session.close()
+        bash_session = None
+
+
 def tool_execute_bash(tool_input: dict) -> dict:
     try:
         reasoning = tool_input.get("reasoning")
@@ -392,28 +1049,243 @@ def tool_execute_bash(tool_input: dict) -> dict:
             console.log(f"[tool_execute_bash] Error: {error_message}")
             return {"error": error_message}
 
+        timeout = tool_input.get("timeout") or BASH_TIMEOUT_SECONDS
         console.log(f"[tool_execute_bash] reasoning: {reasoning}, command: {command}")
-        import subprocess
 
-        result = subprocess.run(
-            command, shell=True, capture_output=True, text=True, env=current_bash_env
+        started = time.perf_counter()
+        try:
+            returncode, stdout, stderr = get_bash_session().run(command, timeout)
+        except (TimeoutError, RuntimeError) as e:
+            # The session's state is unknown now, so start over from a clean one
+            close_bash_session()
+            error_message = f"{str(e)}\nThe bash session was restarted, so the working directory and environment were reset."
+            console.log(f"[tool_execute_bash] Error: {error_message}")
+            return {"error": error_message}
+        console.log(
+            f"[tool_execute_bash] exit code {returncode} in {time.perf_counter() - started:.2f}s"
         )
-        if result.returncode != 0:
+
+        if returncode != 0:
             error_message = (
-                result.stderr.strip()
-                or "Command execution failed with non-zero exit code."
+                stderr.strip()
+                or f"Command execution failed with exit code {returncode}."
             )
             console.log(f"[tool_execute_bash] Error: {error_message}")
             return {"error": error_message}
-        return {"result": result.stdout.strip()}
+        return {"result": stdout.strip()}
     except Exception as e:
         console.log(f"[tool_execute_bash] Error: {str(e)}")
         console.log(traceback.format_exc())
         return {"error": str(e)}
 
 
+def limit_resources(cpu_seconds: int, memory_mb: int):
+    """Returns a preexec_fn that applies CPU time and memory rlimits in the child.
+
+    A limit of 0 leaves that resource unlimited. Limits are clamped to the
+    current hard limit, which an unprivileged process can't raise.
+    """
+
+    def clamp(limit: int, hard: int) -> int:
+        return limit if hard == resource.RLIM_INFINITY else min(limit, hard)
+
+    def apply() -> None:
+        if cpu_seconds:
+            # SIGXCPU at the soft limit, SIGKILL a second later at the hard one
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(
+                resource.RLIMIT_CPU,
+                (clamp(cpu_seconds, hard), clamp(cpu_seconds + 1, hard)),
+            )
+        if memory_mb:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            limit = clamp(memory_mb * 1024 * 1024, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return apply
+
+
+def session_cwd() -> str:
+    """Returns the bash session's working directory, or ours if it isn't running."""
+    if bash_session is not None and bash_session.alive():
+        try:
+            returncode, stdout, _ = bash_session.run("pwd", 5)
+            if returncode == 0 and os.path.isdir(stdout.strip()):
+                return stdout.strip()
+        except (TimeoutError, RuntimeError):
+            close_bash_session()
+    return os.getcwd()
+
+
+def run_commands_in_parallel(specs: List[dict], cwd: str, budget: int) -> List[dict]:
+    """Runs independent commands concurrently, each in its own bash process.
+
+    At most MAX_PARALLEL_COMMANDS run at once and the rest start as slots free
+    up. Each command gets its own process group, so a timeout kills everything
+    it started, and its stdout and stderr are kept in OutputCaptures.
+
+    Args:
+        specs: Dicts with command, timeout, cpu_seconds and memory_mb
+        cwd: Directory the commands start in
+        budget: Bytes of stdout and of stderr kept per command
+
+    Returns:
+        One result dict per spec, in the same order
+    """
+    results = [None] * len(specs)
+    queue = list(range(len(specs)))
+    running = {}
+    streams = {}
+
+    def finish(index: int) -> None:
+        state = running.pop(index)
+        process = state["process"]
+        for pipe in (process.stdout, process.stderr):
+            streams.pop(pipe.fileno(), None)
+            pipe.close()
+        returncode = process.wait()
+        result = {
+            "command": specs[index]["command"],
+            "exit_code": None if state["timed_out"] else returncode,
+            "duration_seconds": round(time.monotonic() - state["started"], 3),
+        }
+        if state["timed_out"]:
+            result["timed_out"] = True
+        elif returncode < 0:
+            result["signal"] = signal.Signals(-returncode).name
+        result["stdout"] = state["stdout"].text()
+        result["stderr"] = state["stderr"].text()
+        results[index] = result
+
+    while queue or running:
+        while queue and len(running) < MAX_PARALLEL_COMMANDS:
+            index = queue.pop(0)
+            spec = specs[index]
+            try:
+                process = subprocess.Popen(
+                    ["bash", "--noprofile", "--norc", "-c", spec["command"]],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=cwd,
+                    start_new_session=True,
+                    preexec_fn=limit_resources(spec["cpu_seconds"], spec["memory_mb"]),
+                )
+            except (OSError, subprocess.SubprocessError) as e:
+                results[index] = {"command": spec["command"], "error": str(e)}
+                continue
+            started = time.monotonic()
+            state = {
+                "process": process,
+                "started": started,
+                "deadline": started + spec["timeout"],
+                "timed_out": False,
+                "stdout": OutputCapture(budget, SPILL_OUTPUT),
+                "stderr": OutputCapture(budget, SPILL_OUTPUT),
+                "open": 2,
+            }
+            running[index] = state
+            streams[process.stdout.fileno()] = (index, state["stdout"])
+            streams[process.stderr.fileno()] = (index, state["stderr"])
+
+        now = time.monotonic()
+        for index, state in list(running.items()):
+            if now >= state["deadline"]:
+                # Kill the whole group and stop reading: a daemonized child
+                # could otherwise hold the pipes open forever
+                state["timed_out"] = True
+                try:
+                    os.killpg(state["process"].pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                finish(index)
+            elif state["open"] == 0 and state["process"].poll() is not None:
+                finish(index)
+        if not running:
+            continue
+
+        # Wake up for the next deadline, or shortly if a command closed its
+        # pipes but hasn't exited yet
+        wait = min(state["deadline"] for state in running.values()) - now
+        if any(state["open"] == 0 for state in running.values()):
+            wait = min(wait, 0.05)
+        ready, _, _ = select.select(list(streams), [], [], max(wait, 0))
+        for fd in ready:
+            index, capture = streams[fd]
+            chunk = os.read(fd, 65536)
+            if chunk:
+                capture.write(chunk)
+            else:
+                del streams[fd]
+                running[index]["open"] -= 1
+
+    return results
+
+
+def tool_execute_bash_many(tool_input: dict) -> dict:
+    try:
+        reasoning = tool_input.get("reasoning")
+        commands = tool_input.get("commands") or []
+
+        specs = []
+        for item in commands:
+            if isinstance(item, str):
+                item = {"command": item}
+            command = (item.get("command") or "").replace(
+                root_path_to_replace_with_cwd, os.getcwd()
+            )
+            if not command.strip():
+                error_message = "No command specified: every entry needs a command."
+                console.log(f"[tool_execute_bash_many] Error: {error_message}")
+                return {"error": error_message}
+            specs.append(
+                {
+                    "command": command,
+                    "timeout": item.get("timeout")
+                    or tool_input.get("timeout")
+                    or BASH_TIMEOUT_SECONDS,
+                    "cpu_seconds": item.get("cpu_seconds")
+                    or tool_input.get("cpu_seconds")
+                    or COMMAND_CPU_SECONDS,
+                    "memory_mb": item.get("memory_mb")
+                    or tool_input.get("memory_mb")
+                    or COMMAND_MEMORY_MB,
+                }
+            )
+
+        if not specs:
+            error_message = "No commands specified: commands is empty."
+            console.log(f"[tool_execute_bash_many] Error: {error_message}")
+            return {"error": error_message}
+
+        console.log(
+            f"[tool_execute_bash_many] reasoning: {reasoning}, commands: {[spec['command'] for spec in specs]}"
+        )
+
+        # Split the output budget so the combined result stays bounded
+        budget = max(OUTPUT_BUDGET_BYTES // len(specs), 2048)
+        started = time.perf_counter()
+        results = run_commands_in_parallel(specs, session_cwd(), budget)
+        for result in results:
+            status = (
+                "timed out"
+                if result.get("timed_out")
+                else result.get("signal") or result.get("error") or f"exit code {result['exit_code']}"
+            )
+            console.log(
+                f"[tool_execute_bash_many] {result['command']}: {status} in {result.get('duration_seconds', 0):.2f}s"
+            )
+        console.log(
+            f"[tool_execute_bash_many] {len(specs)} command{'s' if len(specs) != 1 else ''} in {time.perf_counter() - started:.2f}s"
+        )
+        return {"result": json.dumps(results, indent=2)}
+    except Exception as e:
+        console.log(f"[tool_execute_bash_many] Error: {str(e)}")
+        console.log(traceback.format_exc())
+        return {"error": str(e)}
+
+
 def tool_restart_bash(tool_input: dict) -> dict:
-    global current_bash_env
     try:
         reasoning = tool_input.get("reasoning")
 
@@ -423,7 +1295,8 @@ def tool_restart_bash(tool_input: dict) -> dict:
             return {"error": error_message}
 
         console.log(f"[tool_restart_bash] reasoning: {reasoning}")
-        current_bash_env = os.environ.copy()
+        close_bash_session()
+        get_bash_session()
         return {"result": "Bash session restarted."}
     except Exception as e:
         console.log(f"[tool_restart_bash] Error: {str(e)}")
@@ -456,8 +1329,60 @@ def main():
     parser.add_argument(
         "-c", "--compute", type=int, default=10, help="Maximum compute loops"
     )
+    parser.add_argument(
+        "--bash-timeout",
+        type=int,
+        default=120,
+        help="Default seconds a bash command may run before the session is restarted",
+    )
+    parser.add_argument(
+        "--output-budget",
+        type=int,
+        default=20000,
+        help="Bytes of stdout and of stderr kept per command, split between head and tail",
+    )
+    parser.add_argument(
+        "--spill-output",
+        action="store_true",
+        help="Save the full output of truncated commands to a temp file",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=["none", "file", "dir"],
+        default="file",
+        help="fsync edited files before renaming them into place (file), also fsync their directory (dir), or neither (none)",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=4,
+        help="Most commands execute_bash_many runs at the same time",
+    )
+    parser.add_argument(
+        "--command-cpu-seconds",
+        type=int,
+        default=0,
+        help="Default CPU time limit for execute_bash_many commands (0 for none)",
+    )
+    parser.add_argument(
+        "--command-memory-mb",
+        type=int,
+        default=0,
+        help="Default address space limit for execute_bash_many commands in MB (0 for none)",
+    )
     args = parser.parse_args()
 
+    global BASH_TIMEOUT_SECONDS, OUTPUT_BUDGET_BYTES, SPILL_OUTPUT, WRITE_DURABILITY
+    global MAX_PARALLEL_COMMANDS, COMMAND_CPU_SECONDS, COMMAND_MEMORY_MB
+    WRITE_DURABILITY = args.durability
+    MAX_PARALLEL_COMMANDS = args.max_parallel
+    COMMAND_CPU_SECONDS = args.command_cpu_seconds
+    COMMAND_MEMORY_MB = args.command_memory_mb
+    BASH_TIMEOUT_SECONDS = args.bash_timeout
+    OUTPUT_BUDGET_BYTES = args.output_budget
+    SPILL_OUTPUT = args.spill_output
+    atexit.register(close_bash_session)
+
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
     if not ANTHROPIC_API_KEY:
         Console().print(
@@ -486,6 +1411,11 @@ def main():
                         "description": "Why view the file",
                     },
                     "path": {"type": "string", "description": "File path"},
+                    "view_range": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Optional [start, end] lines to view, end -1 for end of file",
+                    },
                 },
                 "required": ["reasoning", "path"],
             },
@@ -555,9 +1485,45 @@ def main():
                 "required": ["reasoning", "path", "insert_line", "new_str"],
             },
         },
+        {
+            "name": "apply_edits",
+            "description": "Apply many replacements and insertions across files in one call, all or nothing",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Why these edits are needed",
+                    },
+                    "edits": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "path": {"type": "string", "description": "File path"},
+                                "old_str": {
+                                    "type": "string",
+                                    "description": "Unique text to replace",
+                                },
+                                "insert_line": {
+                                    "type": "integer",
+                                    "description": "Insert after this line instead (0 for the top)",
+                                },
+                                "new_str": {
+                                    "type": "string",
+                                    "description": "Replacement or inserted text",
+                                },
+                            },
+                            "required": ["path", "new_str"],
+                        },
+                    },
+                },
+                "required": ["reasoning", "edits"],
+            },
+        },
         {
             "name": "execute_bash",
-            "description": "Execute a bash command",
+            "description": "Execute a bash command in a persistent session",
             "input_schema": {
                 "type": "object",
                 "properties": {
@@ -569,10 +1535,62 @@ def main():
                         "type": "string",
                         "description": "Bash command",
                     },
+                    "timeout": {
+                        "type": "integer",
+                        "description": "Seconds to wait before giving up",
+                    },
                 },
                 "required": ["reasoning", "command"],
             },
         },
+        {
+            "name": "execute_bash_many",
+            "description": "Run independent commands concurrently with timeouts and resource limits",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "reasoning": {
+                        "type": "string",
+                        "description": "Reason for command execution",
+                    },
+                    "commands": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "command": {"type": "string", "description": "Bash command"},
+                                "timeout": {
+                                    "type": "integer",
+                                    "description": "Seconds before the command is killed",
+                                },
+                                "cpu_seconds": {
+                                    "type": "integer",
+                                    "description": "CPU time limit in seconds",
+                                },
+                                "memory_mb": {
+                                    "type": "integer",
+                                    "description": "Address space limit in MB",
+                                },
+                            },
+                            "required": ["command"],
+                        },
+                    },
+                    "timeout": {
+                        "type": "integer",
+                        "description": "Default seconds before each command is killed",
+                    },
+                    "cpu_seconds": {
+                        "type": "integer",
+                        "description": "Default CPU time limit in seconds",
+                    },
+                    "memory_mb": {
+                        "type": "integer",
+                        "description": "Default address space limit in MB",
+                    },
+                },
+                "required": ["reasoning", "commands"],
+            },
+        },
         {
             "name": "restart_bash",
             "description": "Restart the bash session with fresh environment",
@@ -639,7 +1657,9 @@ def main():
                 "create_file": tool_create_file,
                 "str_replace": tool_str_replace,
                 "insert_line": tool_insert_line,
+                "apply_edits": tool_apply_edits,
                 "execute_bash": tool_execute_bash,
+                "execute_bash_many": tool_execute_bash_many,
                 "restart_bash": tool_restart_bash,
                 "complete_task": tool_complete_task,
             }
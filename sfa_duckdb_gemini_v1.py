@@ -15,15 +15,26 @@ uv run sfa_duckdb_gemini_v1.py --db ./data/analytics.db "Filter employees with s
 # generates DuckDB command only without executing
 uv run sfa_duckdb_gemini_v1.py --db ./data/analytics.db --no-exe "Select name and department from employees table and save to employees.json"
 
+# reuses the cached command for near-identical requests, or always asks the model
+uv run sfa_duckdb_gemini_v1.py --db ./data/analytics.db --similarity 0.9 "Filter employees with salary above 50000 and export to high_salary_employees.csv"
+uv run sfa_duckdb_gemini_v1.py --db ./data/analytics.db --no-cache "Filter employees with salary above 50000 and export to high_salary_employees.csv"
+
 ///
 """
 
 import os
+import re
 import sys
+import json
+import time
+import hashlib
 import argparse
 import subprocess
+from typing import Any, Dict, Optional, Tuple
 from google import genai
 
+MODEL = "gemini-2.0-flash-001"
+
 DUCKDB_PROMPT = """<purpose>
     You are a world-class expert at crafting precise DuckDB CLI commands for database operations.
     Your goal is to generate accurate, minimal DuckDB commands that exactly match the user's data manipulation needs.
@@ -110,6 +121,161 @@ DUCKDB_PROMPT = """<purpose>
 
 Your DuckDB command:"""
 
+# Generated commands are reused for repeat requests against the same input schema
+COMMAND_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "sfa", "commands", "duckdb.json"
+)
+COMMAND_CACHE_TTL_SECONDS = 7 * 24 * 3600
+COMMAND_CACHE_MAX_ENTRIES = 500
+SHINGLE_SIZE = 3
+# Tokens like numbers, paths and file names must match exactly for a near-match
+LITERAL_TOKEN_PATTERN = re.compile(r"\S*[\d/.'\"]\S*")
+
+
+def normalize_request(request: str) -> str:
+    """Collapses whitespace and trailing punctuation so trivially different requests share a key."""
+    return " ".join(request.split()).rstrip(".!?; ")
+
+
+def request_shingles(request: str) -> set:
+    """Returns the set of lowercase character shingles of a normalized request."""
+    text = request.lower()
+    return {text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+
+
+def load_command_cache(ttl_seconds: int) -> Dict[str, Dict[str, Any]]:
+    """Loads the command cache, dropping entries older than ttl_seconds.
+
+    Args:
+        ttl_seconds: Maximum age of a cached command
+
+    Returns:
+        Dict of cache key to entry, empty if the cache is missing or unreadable
+    """
+    try:
+        with open(COMMAND_CACHE_PATH, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {
+        key: entry
+        for key, entry in entries.items()
+        if now - entry["created_at"] <= ttl_seconds
+    }
+
+
+def save_command_cache(entries: Dict[str, Dict[str, Any]]) -> None:
+    """Writes the command cache atomically, keeping the most recently used entries."""
+    if len(entries) > COMMAND_CACHE_MAX_ENTRIES:
+        recent = sorted(entries, key=lambda key: entries[key]["last_used"])
+        for key in recent[: len(entries) - COMMAND_CACHE_MAX_ENTRIES]:
+            del entries[key]
+    os.makedirs(os.path.dirname(COMMAND_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{COMMAND_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+    os.replace(tmp_path, COMMAND_CACHE_PATH)
+
+
+def command_cache_key(request: str, scope: str) -> str:
+    """Returns the cache key for a normalized request within a scope."""
+    return hashlib.sha256(f"{scope}|{request}".encode()).hexdigest()
+
+
+def lookup_command(
+    entries: Dict[str, Dict[str, Any]], request: str, scope: str, similarity: float
+) -> Optional[Tuple[str, float]]:
+    """Finds a cached command for a request, exactly or by shingle similarity.
+
+    Args:
+        entries: Loaded command cache
+        request: Normalized user request
+        scope: Input schema fingerprint, model and prompt version
+        similarity: Minimum Jaccard similarity for a near-match, 0 to disable
+
+    Returns:
+        Tuple of the cached command and its similarity, or None on a miss
+    """
+    entry = entries.get(command_cache_key(request, scope))
+    score = 1.0
+    if entry is None and similarity > 0:
+        shingles = request_shingles(request)
+        literals = sorted(LITERAL_TOKEN_PATTERN.findall(request))
+        score = 0.0
+        for candidate in entries.values():
+            if candidate["scope"] != scope:
+                continue
+            if sorted(LITERAL_TOKEN_PATTERN.findall(candidate["request"])) != literals:
+                continue
+            other = request_shingles(candidate["request"])
+            candidate_score = len(shingles & other) / len(shingles | other)
+            if candidate_score >= similarity and candidate_score > score:
+                entry, score = candidate, candidate_score
+    if entry is None:
+        return None
+    entry["last_used"] = time.time()
+    save_command_cache(entries)
+    return entry["command"], score
+
+
+def store_command(
+    entries: Dict[str, Dict[str, Any]], request: str, scope: str, command: str
+) -> None:
+    """Adds a generated command to the cache and saves it."""
+    now = time.time()
+    entries[command_cache_key(request, scope)] = {
+        "request": request,
+        "scope": scope,
+        "command": command,
+        "created_at": now,
+        "last_used": now,
+    }
+    save_command_cache(entries)
+
+
+def database_schema_fingerprint(database_path: str) -> str:
+    """Returns a digest of the database's tables, columns and types.
+
+    Falls back to the file's size and modification time when the duckdb CLI
+    can't read the catalog (e.g. the database is locked by a writer). A
+    database that doesn't exist yet, such as one the request will create, gets
+    the fixed fingerprint "missing".
+
+    Args:
+        database_path: Path to the DuckDB database file
+
+    Returns:
+        Hex digest identifying the database schema
+    """
+    if not os.path.exists(database_path):
+        return "missing"
+    try:
+        result = subprocess.run(
+            [
+                "duckdb",
+                "-readonly",
+                "-csv",
+                database_path,
+                "-c",
+                "SELECT table_schema, table_name, column_name, data_type "
+                "FROM information_schema.columns ORDER BY ALL;",
+            ],
+            text=True,
+            capture_output=True,
+            timeout=10,
+        )
+        if result.returncode == 0:
+            return hashlib.sha256(result.stdout.encode()).hexdigest()[:16]
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    try:
+        stat = os.stat(database_path)
+    except OSError:
+        return "missing"
+    key = f"{os.path.abspath(database_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
 
 def main():
     # Set up argument parser
@@ -130,6 +296,23 @@ def main():
         action="store_true",
         help="Generate the DuckDB command without executing it",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask the model instead of reusing a cached command",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=COMMAND_CACHE_TTL_SECONDS,
+        help="Seconds a cached command stays valid",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.0,
+        help="Reuse a cached command for a near-identical request at this shingle similarity (e.g. 0.9, 0 disables)",
+    )
     args = parser.parse_args()
 
     # Configure the API key
@@ -150,12 +333,25 @@ def main():
         prompt = DUCKDB_PROMPT.replace("{{database_path}}", args.db)
         prompt = prompt.replace("{{user_request}}", args.prompt)
 
-        # Generate DuckDB command
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-001", contents=prompt
-        )
-        duckdb_command = response.text.strip()
-        print("\n🤖 Generated DuckDB command:", duckdb_command)
+        # Reuse the command generated for the same request, schema, model and prompt
+        request = normalize_request(args.prompt)
+        prompt_version = hashlib.sha256(DUCKDB_PROMPT.encode()).hexdigest()[:12]
+        scope = f"{args.db}|{database_schema_fingerprint(args.db)}|{MODEL}|{prompt_version}"
+        cache = {} if args.no_cache else load_command_cache(args.cache_ttl)
+        cached = None if args.no_cache else lookup_command(cache, request, scope, args.similarity)
+
+        if cached:
+            duckdb_command, score = cached
+            match = "exact match" if score == 1.0 else f"{score:.0%} similar request"
+            print(f"\n⚡ Cached DuckDB command ({match}):", duckdb_command)
+        else:
+            # Generate DuckDB command
+            response = client.models.generate_content(model=MODEL, contents=prompt)
+            duckdb_command = response.text.strip()
+            print("\n🤖 Generated DuckDB command:", duckdb_command)
+            # Commands that will be executed are only cached once they succeed
+            if args.no_exe and not args.no_cache:
+                store_command(cache, request, scope, duckdb_command)
 
         # Execute the command unless --no-exe flag is present
         if not args.no_exe:
@@ -173,6 +369,8 @@ def main():
 
             if result.stderr:
                 print("❌ Error executing command:", result.stderr)
+            elif not cached and not args.no_cache:
+                store_command(cache, request, scope, duckdb_command)
 
             if result.stdout:
                 print("✅ Command executed successfully:")
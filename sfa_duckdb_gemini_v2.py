@@ -4,6 +4,7 @@
 # dependencies = [
 #   "google-genai>=1.1.0",
 #   "rich>=13.7.0",
+#   "duckdb>=1.1.0",
 # ]
 # ///
 
@@ -23,8 +24,14 @@ import os
 import sys
 import json
 import argparse
-import subprocess
-from typing import List
+import hashlib
+import threading
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import duckdb
 from rich.console import Console
 from rich.panel import Panel
 from google import genai
@@ -34,6 +41,238 @@ from google.genai import types
 console = Console()
 
 
+# Guardrails for agent-issued SQL (overridable from the command line)
+QUERY_TIMEOUT_MS = 30000
+MEMORY_LIMIT = "4GB"
+THREADS = None
+
+# Rows rendered from one query; the rest are counted as omitted
+MAX_RESULT_ROWS = 1000
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def get_connection() -> duckdb.DuckDBPyConnection:
+    """Returns the shared DuckDB connection, opening it on first use.
+
+    The connection is configured with the memory and thread limits so a runaway
+    query spills or fails instead of exhausting the machine. An in-memory scratch
+    database is attached for materialized intermediates.
+
+    Parallel tool calls can all arrive before the connection exists, so it is
+    opened under a lock and only published once fully configured.
+
+    Returns:
+        The DuckDB connection for DB_PATH
+    """
+    global _connection
+    if _connection is None:
+        with _connection_lock:
+            if _connection is None:
+                connection = duckdb.connect(DB_PATH)
+                connection.execute(f"SET memory_limit = '{MEMORY_LIMIT}'")
+                if THREADS:
+                    connection.execute(f"SET threads = {int(THREADS)}")
+                connection.execute(
+                    f"ATTACH IF NOT EXISTS ':memory:' AS {INTERMEDIATE_SCHEMA}"
+                )
+                _connection = connection
+    return _connection
+
+
+def execute_sql(sql_query: str, timeout_ms: Optional[int] = None) -> str:
+    """Executes a SQL query and renders the result, cancelling it after timeout_ms.
+
+    A watchdog timer calls interrupt() on the connection if the query is still
+    running when the deadline passes, so a bad cross join can't stall the agent.
+
+    Args:
+        sql_query: The SQL query to execute
+        timeout_ms: Time limit in milliseconds (defaults to QUERY_TIMEOUT_MS)
+
+    Returns:
+        The query result (at most MAX_RESULT_ROWS rows), or a JSON timeout
+        payload the model can act on
+    """
+    timeout_ms = timeout_ms or QUERY_TIMEOUT_MS
+    touch_intermediates(sql_query)
+    conn = get_connection()
+    finished = threading.Event()
+
+    def watchdog():
+        if not finished.is_set():
+            conn.interrupt()
+
+    timer = threading.Timer(timeout_ms / 1000, watchdog)
+    timer.daemon = True
+    timer.start()
+    try:
+        relation = conn.sql(sql_query)
+        if relation is None:
+            return "OK"
+        # Fetch one row past the bound so truncation can be reported
+        rows = relation.limit(MAX_RESULT_ROWS + 1).fetchall()
+        lines = [" | ".join(relation.columns)]
+        for row in rows[:MAX_RESULT_ROWS]:
+            lines.append(
+                " | ".join("NULL" if value is None else str(value) for value in row)
+            )
+        if len(rows) > MAX_RESULT_ROWS:
+            lines.append(
+                f"... [stopped after {MAX_RESULT_ROWS:,} rows; add a LIMIT or aggregate to see the rest]"
+            )
+        else:
+            lines.append(f"({len(rows):,} rows)")
+        return "\n".join(lines)
+    except duckdb.InterruptException:
+        console.log(f"[yellow]Query timed out after {timeout_ms} ms[/yellow]")
+        return json.dumps(
+            {
+                "error": "timeout",
+                "message": f"Query timed out after {timeout_ms} ms and was cancelled. "
+                "Revise the query to scan less data (add filters, avoid cross joins, aggregate earlier).",
+                "timeout_ms": timeout_ms,
+            }
+        )
+    finally:
+        finished.set()
+        timer.cancel()
+
+
+# Intermediate results live in an in-memory database attached to the session,
+# so every cursor sees them and they are dropped when the agent exits
+INTERMEDIATE_SCHEMA = "scratch"
+INTERMEDIATE_MEMORY_LIMIT = 1024**3
+
+_intermediates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_intermediate_lock = threading.RLock()
+
+
+def in_memory_table_bytes(conn: duckdb.DuckDBPyConnection) -> int:
+    """Returns the bytes DuckDB currently holds for in-memory tables."""
+    row = conn.execute(
+        "SELECT memory_usage_bytes FROM duckdb_memory() WHERE tag = 'IN_MEMORY_TABLE'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def referenced_names(sql_query: str, names: List[str], prefix: str = "") -> List[str]:
+    """Returns the names from names that appear as identifiers in sql_query."""
+    return [
+        name
+        for name in names
+        if re.search(rf"(?<![\w.]){re.escape(prefix + name)}\b", sql_query, re.IGNORECASE)
+    ]
+
+
+def touch_intermediates(sql_query: str) -> None:
+    """Marks the intermediates a query reads as recently used so eviction keeps them."""
+    with _intermediate_lock:
+        for name in referenced_names(
+            sql_query, list(_intermediates), f"{INTERMEDIATE_SCHEMA}."
+        ):
+            _intermediates.move_to_end(name)
+
+
+def evict_intermediates(conn: duckdb.DuckDBPyConnection, keep: str) -> List[str]:
+    """Drops least recently used intermediates until they fit INTERMEDIATE_MEMORY_LIMIT.
+
+    Args:
+        conn: Connection to drop the tables on
+        keep: The intermediate that was just created, evicted only if it alone is too big
+
+    Returns:
+        Names of the dropped intermediates
+    """
+    evicted = []
+    total = sum(info["bytes"] for info in _intermediates.values())
+    for name in [name for name in _intermediates if name != keep] + [keep]:
+        if total <= INTERMEDIATE_MEMORY_LIMIT:
+            break
+        conn.execute(f"DROP TABLE IF EXISTS {INTERMEDIATE_SCHEMA}.{name}")
+        total -= _intermediates.pop(name)["bytes"]
+        evicted.append(name)
+    return evicted
+
+
+def format_lineage() -> str:
+    """Renders every live intermediate with its size and the tables it was built from."""
+    lines = []
+    for name, info in _intermediates.items():
+        sources = ", ".join(info["depends_on"]) or "no tables"
+        lines.append(
+            f"{INTERMEDIATE_SCHEMA}.{name}: {info['rows']} rows, "
+            f"{info['bytes'] / 1024**2:.1f} MB, from {sources}"
+        )
+    return "\n".join(lines)
+
+
+# Column profiles are cached on disk, keyed by the data file's fingerprint
+PROFILE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sfa", "profiles")
+PROFILE_TOP_K = 5
+
+
+def file_fingerprint(path: str, *parts: str) -> str:
+    """Returns a key that changes whenever the file at path is rewritten.
+
+    Args:
+        path: Path to the data file
+        *parts: Extra key parts, such as a table name
+
+    Returns:
+        Hex digest of the absolute path, size, modification time and parts
+    """
+    stat = os.stat(path)
+    key = "|".join(
+        [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), *parts]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_cached_profile(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Returns the cached profile for fingerprint, or None if there is none."""
+    try:
+        with open(os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_profile(fingerprint: str, profile: Dict[str, Any]) -> None:
+    """Writes a profile to the cache, replacing any previous entry atomically."""
+    os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Renders a profile as one compact line per column for the model."""
+    lines = [f"rows: {profile['row_count']}"]
+    for column in profile["columns"]:
+        line = (
+            f"{column['name']} ({column['type']}): "
+            f"nulls={column['null_fraction']:.1%}, "
+            f"distinct~{column['approx_distinct']}, "
+            f"min={column['min']}, max={column['max']}"
+        )
+        if column.get("top_values"):
+            line += f", top={column['top_values']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def is_identifier_like(approx_distinct: int, row_count: int) -> bool:
+    """Returns True for columns where nearly every value is unique (ids, uuids).
+
+    Top values carry no information for these, so profiling skips them.
+    """
+    return row_count > 0 and approx_distinct >= row_count * 0.9
+
+
 def list_tables(reasoning: str) -> List[str]:
     """Returns a list of tables in the database.
 
@@ -46,15 +285,11 @@ def list_tables(reasoning: str) -> List[str]:
         List of table names as strings
     """
     try:
-        result = subprocess.run(
-            f'duckdb {DB_PATH} -c ".tables"',
-            # f"duckdb {DB_PATH} -c \"SELECT name FROM sqlite_master WHERE type='table';\"",
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
+        tables = [row[0] for row in get_connection().execute("SHOW TABLES").fetchall()]
+        with _intermediate_lock:
+            tables += [f"{INTERMEDIATE_SCHEMA}.{name}" for name in _intermediates]
         console.log(f"[blue]List Tables Tool[/blue] - Reasoning: {reasoning}")
-        return result.stdout.strip().split("\n")
+        return tables
     except Exception as e:
         console.log(f"[red]Error listing tables: {str(e)}[/red]")
         return []
@@ -73,16 +308,11 @@ def describe_table(reasoning: str, table_name: str) -> str:
         String containing table schema information
     """
     try:
-        result = subprocess.run(
-            f'duckdb {DB_PATH} -c "DESCRIBE {table_name};"',
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
+        result = execute_sql(f"DESCRIBE {table_name};")
         console.log(
             f"[blue]Describe Table Tool[/blue] - Table: {table_name} - Reasoning: {reasoning}"
         )
-        return result.stdout
+        return result
     except Exception as e:
         console.log(f"[red]Error describing table: {str(e)}[/red]")
         return ""
@@ -102,21 +332,96 @@ def sample_table(reasoning: str, table_name: str, row_sample_size: int) -> str:
         String containing sample rows in readable format
     """
     try:
-        result = subprocess.run(
-            f'duckdb {DB_PATH} -c "SELECT * FROM {table_name} LIMIT {row_sample_size};"',
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
+        result = execute_sql(f"SELECT * FROM {table_name} LIMIT {row_sample_size};")
         console.log(
             f"[blue]Sample Table Tool[/blue] - Table: {table_name} - Rows: {row_sample_size} - Reasoning: {reasoning}"
         )
-        return result.stdout
+        return result
     except Exception as e:
         console.log(f"[red]Error sampling table: {str(e)}[/red]")
         return ""
 
 
+def compute_table_profile(table_name: str) -> Dict[str, Any]:
+    """Computes a column profile for a table with DuckDB's SUMMARIZE.
+
+    SUMMARIZE gathers types, min/max, approximate distinct counts and null
+    percentages in one vectorized scan; a second scan collects approx_top_k values
+    for the categorical columns.
+
+    Args:
+        table_name: Name of table to profile
+
+    Returns:
+        Profile dict with row_count and a list of per-column statistics
+    """
+    with get_connection().cursor() as cursor:
+        summary = cursor.execute(
+            f"SELECT column_name, column_type, min, max, approx_unique, null_percentage, count "
+            f"FROM (SUMMARIZE {table_name})"
+        ).fetchall()
+        row_count = summary[0][6] if summary else 0
+        columns = [
+            {
+                "name": name,
+                "type": column_type,
+                "min": min_value,
+                "max": max_value,
+                "approx_distinct": approx_unique,
+                "null_fraction": float(null_percentage or 0) / 100,
+            }
+            for name, column_type, min_value, max_value, approx_unique, null_percentage, _ in summary
+        ]
+
+        categorical = [
+            column
+            for column in columns
+            if column["type"] in ("VARCHAR", "BOOLEAN")
+            and not is_identifier_like(column["approx_distinct"], row_count)
+        ]
+        if categorical:
+            selects = ", ".join(
+                f"approx_top_k(\"{column['name']}\", {PROFILE_TOP_K})"
+                for column in categorical
+            )
+            top_values = cursor.execute(f"SELECT {selects} FROM {table_name}").fetchone()
+            for column, values in zip(categorical, top_values):
+                column["top_values"] = values
+
+    return {"row_count": row_count, "columns": columns}
+
+
+def profile_table(reasoning: str, table_name: str) -> str:
+    """Returns per-column statistics for the specified table.
+
+    The agent uses this to learn null rates, distinct counts, value ranges and the
+    most frequent values in one call instead of several samples and test queries.
+    Profiles are cached on disk until the database file changes.
+
+    Args:
+        reasoning: Explanation of why we're profiling this table
+        table_name: Name of table to profile
+
+    Returns:
+        String containing one summary line per column
+    """
+    try:
+        fingerprint = file_fingerprint(DB_PATH, table_name)
+        profile = load_cached_profile(fingerprint)
+        cached = profile is not None
+        if not cached:
+            profile = compute_table_profile(table_name)
+            save_cached_profile(fingerprint, profile)
+        output = format_profile(profile)
+        console.log(
+            f"[blue]Profile Table Tool[/blue] - Table: {table_name} - Cached: {cached} - Reasoning: {reasoning}"
+        )
+        return output
+    except Exception as e:
+        console.log(f"[red]Error profiling table: {str(e)}[/red]")
+        return str(e)
+
+
 def run_test_sql_query(reasoning: str, sql_query: str) -> str:
     """Executes a test SQL query and returns results.
 
@@ -131,20 +436,190 @@ def run_test_sql_query(reasoning: str, sql_query: str) -> str:
         Query results as a string
     """
     try:
-        result = subprocess.run(
-            f'duckdb {DB_PATH} -c "{sql_query}"',
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
+        result = execute_sql(sql_query)
         console.log(f"[blue]Test Query Tool[/blue] - Reasoning: {reasoning}")
         console.log(f"[dim]Query: {sql_query}[/dim]")
-        return result.stdout
+        return result
     except Exception as e:
         console.log(f"[red]Error running test query: {str(e)}[/red]")
         return str(e)
 
 
+# Limits for comparing candidate queries in one tool call
+MAX_CANDIDATE_QUERIES = 8
+CANDIDATE_PREVIEW_ROWS = 5
+
+
+def format_candidate_results(
+    sql_queries: List[str], results: List[Dict[str, Any]]
+) -> str:
+    """Renders candidate query results as one block per query, marking the fastest."""
+    timings = [result["elapsed_ms"] for result in results if "error" not in result]
+    fastest = min(timings) if timings else None
+    blocks = []
+    for i, (sql_query, result) in enumerate(zip(sql_queries, results), start=1):
+        if "error" in result:
+            lines = [f"query {i}: error: {' '.join(result['error'].split())}"]
+        else:
+            header = f"query {i}: {result['elapsed_ms']:.1f} ms, {result['row_count']} rows"
+            if result["elapsed_ms"] == fastest:
+                header += " (fastest)"
+            lines = [header]
+        lines.append(f"  sql: {' '.join(sql_query.split())}")
+        if "error" not in result:
+            lines.append(f"  columns: {', '.join(result['columns'])}")
+            lines += [f"  {row}" for row in result["preview"]]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def evaluate_candidate_query(sql_query: str) -> Dict[str, Any]:
+    """Runs one candidate query on its own cursor and measures it.
+
+    Only single SELECT statements are accepted so that candidates running
+    concurrently can't modify the database. The same watchdog as execute_sql
+    cancels candidates that exceed QUERY_TIMEOUT_MS.
+
+    Args:
+        sql_query: The candidate SQL query
+
+    Returns:
+        Dict with elapsed_ms, row_count, columns and preview rows, or an error
+    """
+    touch_intermediates(sql_query)
+    cursor = get_connection().cursor()
+    finished = threading.Event()
+
+    def watchdog():
+        if not finished.is_set():
+            cursor.interrupt()
+
+    timer = threading.Timer(QUERY_TIMEOUT_MS / 1000, watchdog)
+    timer.daemon = True
+    try:
+        statements = cursor.extract_statements(sql_query)
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            return {"error": "only a single SELECT statement can be compared"}
+        timer.start()
+        start = time.perf_counter()
+        cursor.execute(sql_query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        preview = cursor.fetchmany(CANDIDATE_PREVIEW_ROWS)
+        row_count = len(preview)
+        while batch := cursor.fetchmany(100_000):
+            row_count += len(batch)
+        return {
+            "elapsed_ms": elapsed_ms,
+            "row_count": row_count,
+            "columns": [column[0] for column in cursor.description],
+            "preview": preview,
+        }
+    except duckdb.InterruptException:
+        return {"error": f"timed out after {QUERY_TIMEOUT_MS} ms"}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        finished.set()
+        timer.cancel()
+        cursor.close()
+
+
+def run_test_sql_queries(reasoning: str, sql_queries: List[str]) -> str:
+    """Executes several alternative SQL queries concurrently and compares them.
+
+    The agent uses this to evaluate candidate formulations side by side and pick
+    the fastest correct one in a single call. Results are only shown to the agent.
+
+    Args:
+        reasoning: Explanation of why we're comparing these queries
+        sql_queries: Alternative SQL queries to compare (SELECT only)
+
+    Returns:
+        Per-query timing, row count and a preview of the first rows
+    """
+    try:
+        sql_queries = sql_queries[:MAX_CANDIDATE_QUERIES]
+        with ThreadPoolExecutor(max_workers=max(len(sql_queries), 1)) as executor:
+            results = list(executor.map(evaluate_candidate_query, sql_queries))
+        output = format_candidate_results(sql_queries, results)
+        console.log(
+            f"[blue]Compare Queries Tool[/blue] - Queries: {len(sql_queries)} - Reasoning: {reasoning}"
+        )
+        console.log(f"[dim]{output}[/dim]")
+        return output
+    except Exception as e:
+        console.log(f"[red]Error comparing queries: {str(e)}[/red]")
+        return str(e)
+
+
+def materialize_intermediate(reasoning: str, name: str, sql_query: str) -> str:
+    """Stores a query's result as a session table later queries can reference.
+
+    The table is created in the attached scratch database and referenced as
+    scratch.<name>, so complex CTEs are computed once instead of in every test
+    query. When intermediates exceed INTERMEDIATE_MEMORY_LIMIT the least
+    recently used ones are dropped.
+
+    Args:
+        reasoning: Explanation of why this result is worth materializing
+        name: Table name for the intermediate result
+        sql_query: The SELECT query whose result is stored
+
+    Returns:
+        The stored table's size and the lineage of all live intermediates
+    """
+    try:
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            return f"Error: '{name}' is not a valid table name, use letters, digits and underscores"
+        conn = get_connection()
+        with _intermediate_lock:
+            # Drop the previous version first so the size delta only covers the new table
+            conn.execute(f"DROP TABLE IF EXISTS {INTERMEDIATE_SCHEMA}.{name}")
+            _intermediates.pop(name, None)
+            base_tables = [row[0] for row in conn.execute("SHOW TABLES").fetchall()]
+            depends_on = referenced_names(sql_query, base_tables) + [
+                f"{INTERMEDIATE_SCHEMA}.{source}"
+                for source in referenced_names(
+                    sql_query, list(_intermediates), f"{INTERMEDIATE_SCHEMA}."
+                )
+            ]
+            before = in_memory_table_bytes(conn)
+            result = execute_sql(
+                f"CREATE TABLE {INTERMEDIATE_SCHEMA}.{name} AS {sql_query}"
+            )
+            if result != "OK":
+                conn.execute(f"DROP TABLE IF EXISTS {INTERMEDIATE_SCHEMA}.{name}")
+                return result
+            _intermediates[name] = {
+                "sql": sql_query,
+                "depends_on": depends_on,
+                "rows": conn.execute(
+                    f"SELECT COUNT(*) FROM {INTERMEDIATE_SCHEMA}.{name}"
+                ).fetchone()[0],
+                "bytes": max(in_memory_table_bytes(conn) - before, 0),
+            }
+            evicted = evict_intermediates(conn, keep=name)
+            lineage = format_lineage()
+
+        console.log(
+            f"[blue]Materialize Tool[/blue] - Table: {INTERMEDIATE_SCHEMA}.{name} - Reasoning: {reasoning}"
+        )
+        console.log(f"[dim]Query: {sql_query}[/dim]")
+        if name in evicted:
+            return (
+                f"Error: {INTERMEDIATE_SCHEMA}.{name} needs more than the "
+                f"{INTERMEDIATE_MEMORY_LIMIT / 1024**2:.0f} MB intermediate limit and was dropped. "
+                "Aggregate or filter further before materializing."
+            )
+        output = f"Materialized {INTERMEDIATE_SCHEMA}.{name}; reference it by that name in later queries."
+        if evicted:
+            output += f"\nDropped to stay under the memory limit: {', '.join(evicted)}"
+        return f"{output}\n\nIntermediates:\n{lineage}"
+    except Exception as e:
+        console.log(f"[red]Error materializing intermediate: {str(e)}[/red]")
+        return str(e)
+
+
 def run_final_sql_query(reasoning: str, sql_query: str) -> str:
     """Executes the final SQL query and returns results to user.
 
@@ -158,18 +633,13 @@ def run_final_sql_query(reasoning: str, sql_query: str) -> str:
         Query results as a string
     """
     try:
-        result = subprocess.run(
-            f'duckdb {DB_PATH} -c "{sql_query}"',
-            shell=True,
-            text=True,
-            capture_output=True,
-        )
+        result = execute_sql(sql_query)
         console.log(
             Panel(
                 f"[green]Final Query Tool[/green]\nReasoning: {reasoning}\nQuery: {sql_query}"
             )
         )
-        return result.stdout
+        return result
     except Exception as e:
         console.log(f"[red]Error running final query: {str(e)}[/red]")
         return str(e)
@@ -185,10 +655,14 @@ AGENT_PROMPT = """<purpose>
     <instruction>Start by listing tables to understand what's available.</instruction>
     <instruction>Describe tables to understand their schema and columns.</instruction>
     <instruction>Sample tables to see actual data patterns.</instruction>
+    <instruction>Profile tables to learn null rates, distinct counts, value ranges and top values in a single call instead of running several exploratory queries.</instruction>
     <instruction>Test queries before finalizing them.</instruction>
+    <instruction>When several test queries need the same expensive intermediate result (a filtered subset, a join or an aggregation), store it once with materialize_intermediate and query it as scratch.<name> instead of recomputing it.</instruction>
+    <instruction>When you have several candidate formulations, compare them in a single run_test_sql_queries call and pick the fastest one that returns the right data.</instruction>
     <instruction>Only call run_final_sql_query when you're confident the query is perfect.</instruction>
     <instruction>Be thorough but efficient with tool usage.</instruction>
     <instruction>If you find your run_test_sql_query tool call returns an error or won't satisfy the user request, try to fix the query or try a different query.</instruction>
+    <instruction>Queries are cancelled after a time limit; if a tool call returns a timeout error, revise the query to scan less data instead of retrying it unchanged.</instruction>
     <instruction>Think step by step about what information you need.</instruction>
     <instruction>Be sure to specify every parameter for each tool call.</instruction>
     <instruction>Every tool call should have a reasoning parameter which gives you a place to explain why you are calling the tool.</instruction>
@@ -252,6 +726,25 @@ AGENT_PROMPT = """<purpose>
         </parameters>
     </tool>
     
+    <tool>
+        <name>profile_table</name>
+        <description>Returns per-column null rates, distinct counts, min/max and top values for specified table</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Why we need to profile this table</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>table_name</name>
+                <type>string</type>
+                <description>Name of table to profile</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+    
     <tool>
         <name>run_test_sql_query</name>
         <description>Tests a SQL query and returns results (only visible to agent)</description>
@@ -271,6 +764,50 @@ AGENT_PROMPT = """<purpose>
         </parameters>
     </tool>
     
+    <tool>
+        <name>run_test_sql_queries</name>
+        <description>Runs several alternative SQL queries concurrently and returns per-query timing, row counts and previews (only visible to agent)</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Why we're comparing these queries</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>sql_queries</name>
+                <type>array of strings</type>
+                <description>Alternative SELECT queries to compare</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+    
+    <tool>
+        <name>materialize_intermediate</name>
+        <description>Stores a query's result as a session table that later queries reference as scratch.<name> (only visible to agent)</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Why this intermediate result is worth reusing</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>name</name>
+                <type>string</type>
+                <description>Table name for the intermediate result</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>sql_query</name>
+                <type>string</type>
+                <description>The SELECT query whose result is stored</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+    
     <tool>
         <name>run_final_sql_query</name>
         <description>Runs the final validated SQL query and shows results to user</description>
@@ -311,6 +848,23 @@ def main():
         default=10,
         help="Maximum number of agent loops (default: 3)",
     )
+    parser.add_argument(
+        "--timeout-ms",
+        type=int,
+        default=30000,
+        help="Per-query time limit in milliseconds (default: 30000)",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        default="4GB",
+        help="DuckDB memory_limit for agent queries (default: 4GB)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="DuckDB threads for agent queries (default: all cores)",
+    )
     args = parser.parse_args()
 
     # Configure the API key
@@ -329,6 +883,12 @@ def main():
     global DB_PATH
     DB_PATH = args.db
 
+    # Set global query guardrails for tool functions
+    global QUERY_TIMEOUT_MS, MEMORY_LIMIT, THREADS
+    QUERY_TIMEOUT_MS = args.timeout_ms
+    MEMORY_LIMIT = args.memory_limit
+    THREADS = args.threads
+
     # Initialize Gemini client
     client = genai.Client(api_key=GEMINI_API_KEY)
 
@@ -369,7 +929,10 @@ def main():
                         list_tables,
                         describe_table,
                         sample_table,
+                        profile_table,
                         run_test_sql_query,
+                        run_test_sql_queries,
+                        materialize_intermediate,
                         run_final_sql_query,
                     ],
                     automatic_function_calling=types.AutomaticFunctionCallingConfig(
@@ -401,8 +964,14 @@ def main():
                             result = describe_table(**func_args)
                         elif func_name == "sample_table":
                             result = sample_table(**func_args)
+                        elif func_name == "profile_table":
+                            result = profile_table(**func_args)
                         elif func_name == "run_test_sql_query":
                             result = run_test_sql_query(**func_args)
+                        elif func_name == "run_test_sql_queries":
+                            result = run_test_sql_queries(**func_args)
+                        elif func_name == "materialize_intermediate":
+                            result = materialize_intermediate(**func_args)
                         elif func_name == "run_final_sql_query":
                             result = run_final_sql_query(**func_args)
                             console.print("\n[green]Final Results:[/green]")
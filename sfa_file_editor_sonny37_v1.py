@@ -52,12 +52,22 @@ uv run sfa_file_editor_sonny37_v1.py --prompt "Create a Flask API with 3 endpoin
 ///
 """
 
+import io
 import os
+import re
 import sys
+import mmap
+import bisect
 import argparse
 import time
 import json
+import atexit
+import shutil
+import hashlib
+import tempfile
 import traceback
+from array import array
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple, Union
 from rich.console import Console
 from rich.panel import Panel
@@ -74,6 +84,44 @@ console = Console()
 # Define constants
 MODEL = "claude-3-7-sonnet-20250219"
 DEFAULT_THINKING_TOKENS = 3000
+APPLY_EDITS_TOOL = {
+    "name": "apply_edits",
+    "description": "Apply many replacements and insertions across one or more files in one call. "
+    "Each old_str must match exactly once, and anchors and line numbers refer to the files before the batch. "
+    "Either every edit is applied or none are.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "edits": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string", "description": "File path"},
+                        "old_str": {"type": "string", "description": "Unique text to replace"},
+                        "insert_line": {
+                            "type": "integer",
+                            "description": "Insert new_str after this line instead (0 for the top)",
+                        },
+                        "new_str": {"type": "string", "description": "Replacement or inserted text"},
+                    },
+                    "required": ["path", "new_str"],
+                },
+            }
+        },
+        "required": ["edits"],
+    },
+}
+UNDO_FILE_BUDGET_BYTES = 4 * 1024 * 1024
+UNDO_TOTAL_BUDGET_BYTES = 32 * 1024 * 1024
+LINE_INDEX_BLOCK_BYTES = 1 << 16
+LINE_INDEX_MIN_BYTES = 1 << 20
+LINE_INDEX_MAX_FILES = 16
+line_indexes = OrderedDict()
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+WRITE_DURABILITY = "file"
+content_cache = OrderedDict()
+content_cache_bytes = 0
 
 
 def display_token_usage(input_tokens: int, output_tokens: int) -> None:
@@ -152,6 +200,455 @@ def normalize_path(path: str) -> str:
     return path
 
 
+def read_text(path: str) -> str:
+    """
+    Read a text file through the content cache.
+
+    Cached content is reused only while the file's size, modification time and
+    inode are unchanged, so edits made outside the tools (e.g. by bash) are seen.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        The file's content
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    cached = content_cache.get(path)
+    if cached and cached[0] == key:
+        content_cache.move_to_end(path)
+        return cached[1]
+    with open(path, "r") as f:
+        content = f.read()
+    cache_content(path, key, content)
+    return content
+
+
+def write_text(path: str, content: str) -> None:
+    """
+    Write a text file atomically and keep the content cache in step with it.
+
+    The content goes to a temp file in the same directory that is then renamed
+    over the target, so readers and crashes never see a half-written file.
+    WRITE_DURABILITY controls fsync: "none" leaves flushing to the OS, "file"
+    syncs the data before the rename and "dir" also syncs the directory so the
+    rename itself survives a power loss.
+
+    Args:
+        path: The path to the file
+        content: The new content
+    """
+    target, tmp_path = stage_text(path, content)
+    try:
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if WRITE_DURABILITY == "dir":
+        sync_directory(os.path.dirname(target))
+    stat = os.stat(target)
+    cache_content(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino), content)
+
+
+def stage_text(path: str, content: str) -> Tuple[str, str]:
+    """
+    Write content to a temp file next to path, ready to be renamed over it.
+
+    Args:
+        path: The path to the file
+        content: The new content
+
+    Returns:
+        Tuple of the resolved target path and the temp file path
+    """
+    # Write through symlinks rather than replacing them
+    target = os.path.realpath(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target), prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            if WRITE_DURABILITY != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(target):
+            shutil.copymode(target, tmp_path)
+        else:
+            # mkstemp creates files as 0600, new files should get the usual mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return target, tmp_path
+
+
+def sync_directory(directory: str) -> None:
+    """
+    Fsync a directory so renames into it survive a power loss."""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def write_texts(changes: Dict[str, Tuple[str, str]]) -> None:
+    """
+    Write several files so that either all of them change or none do.
+
+    Every file is staged to a temp file first, so a failed write leaves all
+    targets untouched. The temp files are then renamed into place, and if a
+    rename fails the files already replaced get their original content back.
+
+    Args:
+        changes: Map of path to (original content, new content)
+    """
+    staged = []
+    try:
+        for path, (_, new_content) in changes.items():
+            staged.append((path, *stage_text(path, new_content)))
+    except BaseException:
+        for _, _, tmp_path in staged:
+            os.remove(tmp_path)
+        raise
+
+    replaced = []
+    try:
+        for path, target, tmp_path in staged:
+            os.replace(tmp_path, target)
+            replaced.append(path)
+    except BaseException:
+        for _, _, tmp_path in staged[len(replaced) :]:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        for path in replaced:
+            write_text(path, changes[path][0])
+        raise
+
+    if WRITE_DURABILITY == "dir":
+        for directory in {os.path.dirname(target) for _, target, _ in staged}:
+            sync_directory(directory)
+    for path, target, _ in staged:
+        stat = os.stat(target)
+        cache_content(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino), changes[path][1])
+
+
+def cache_content(path: str, key: tuple, content: str) -> None:
+    """
+    Store content in the cache, evicting least recently used files past the byte budget.
+    """
+    global content_cache_bytes
+    if path in content_cache:
+        content_cache_bytes -= len(content_cache.pop(path)[1])
+    # Files too big to be worth caching are read straight from disk each time
+    if len(content) > CONTENT_CACHE_MAX_BYTES // 4:
+        return
+    content_cache[path] = (key, content)
+    content_cache_bytes += len(content)
+    while content_cache_bytes > CONTENT_CACHE_MAX_BYTES:
+        _, (_, evicted) = content_cache.popitem(last=False)
+        content_cache_bytes -= len(evicted)
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """
+    Find how many leading characters two strings share.
+    Compares large slices first so long unchanged regions are skipped at C speed.
+
+    Args:
+        a: First string
+        b: Second string
+
+    Returns:
+        Length of the common prefix
+    """
+    limit = min(len(a), len(b))
+    length = 0
+    step = 1 << 16
+    while step:
+        if length + step <= limit and a[length : length + step] == b[length : length + step]:
+            length += step
+        else:
+            step //= 2
+    return length
+
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """
+    Find how many trailing characters two strings share, up to limit.
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Maximum suffix length to consider
+
+    Returns:
+        Length of the common suffix
+    """
+    length = 0
+    step = 1 << 16
+    while step:
+        if length + step <= limit and a[len(a) - length - step : len(a) - length] == b[
+            len(b) - length - step : len(b) - length
+        ]:
+            length += step
+        else:
+            step //= 2
+    return length
+
+
+class EditJournal:
+    """
+    Per-file history of reverse diffs for undo_edit.
+
+    Each edit is stored as the single span that changed: its offset, the text it
+    replaced and a hash of the text it became. Memory grows with the size of the
+    changes, not the size of the files, and is capped per file and overall. Past
+    the caps, the oldest entries are spilled to disk when a spill directory is
+    set, and dropped otherwise. History is keyed by the resolved path, so edits
+    made through a symlink or another spelling of a path undo together.
+    """
+
+    def __init__(self, file_budget: int, total_budget: int, spill_dir: Optional[str] = None):
+        self.file_budget = file_budget
+        self.total_budget = total_budget
+        self.spill_dir = spill_dir
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+        self.memory = 0
+        self.sequence = 0
+
+    def record(self, path: str, old_content: Optional[str], new_content: str) -> None:
+        """
+        Record the reverse diff of a write to path.
+
+        Args:
+            path: Normalized path of the file that was written
+            old_content: Content before the write, or None if the file was created
+            new_content: Content after the write
+        """
+        path = os.path.realpath(path)
+        if old_content is None:
+            offset, old_text, new_text = 0, "", new_content
+        else:
+            offset = common_prefix_length(old_content, new_content)
+            suffix = common_suffix_length(
+                old_content, new_content, min(len(old_content), len(new_content)) - offset
+            )
+            old_text = old_content[offset : len(old_content) - suffix]
+            new_text = new_content[offset : len(new_content) - suffix]
+            if not old_text and not new_text:
+                return
+        self.sequence += 1
+        entry = {
+            "sequence": self.sequence,
+            "created": old_content is None,
+            "offset": offset,
+            "old_text": old_text,
+            "spill_path": None,
+            "size": len(old_text.encode()),
+            "new_length": len(new_text),
+            "new_hash": hashlib.sha1(new_text.encode()).hexdigest(),
+            "content_length": len(new_content),
+        }
+        self.history.setdefault(path, []).append(entry)
+        self.memory += entry["size"]
+        self.enforce_budget(path)
+
+    def file_memory(self, path: str) -> int:
+        return sum(
+            entry["size"]
+            for entry in self.history.get(path, [])
+            if entry["old_text"] is not None
+        )
+
+    def evict(self, path: str) -> None:
+        """Spill or drop the oldest entry still held in memory for path."""
+        entries = self.history[path]
+        for index, entry in enumerate(entries):
+            if entry["old_text"] is None or not entry["size"]:
+                continue
+            self.memory -= entry["size"]
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                spill_path = os.path.join(self.spill_dir, f"{entry['sequence']}.txt")
+                with open(spill_path, "w") as f:
+                    f.write(entry["old_text"])
+                entry["spill_path"] = spill_path
+                entry["old_text"] = None
+            else:
+                # Older entries can't be applied without this one, so they go too
+                del entries[: index + 1]
+                if not entries:
+                    del self.history[path]
+            return
+
+    def enforce_budget(self, path: str) -> None:
+        while path in self.history and self.file_memory(path) > self.file_budget:
+            self.evict(path)
+        while self.memory > self.total_budget:
+            # Evict from whichever file holds the oldest in-memory entry
+            oldest = min(
+                (
+                    (entry["sequence"], entry_path)
+                    for entry_path, entries in self.history.items()
+                    for entry in entries
+                    if entry["old_text"] is not None and entry["size"]
+                ),
+                default=None,
+            )
+            if oldest is None:
+                break
+            self.evict(oldest[1])
+
+    def undo(self, path: str) -> str:
+        """
+        Undo the most recent recorded edit to path.
+
+        Args:
+            path: Normalized path of the file
+
+        Returns:
+            Message describing what was undone
+
+        Raises:
+            ValueError: If there is nothing to undo or the file changed since the edit
+        """
+        path = os.path.realpath(path)
+        entries = self.history.get(path)
+        if not entries:
+            raise ValueError(f"No edits to undo for {path}")
+        entry = entries[-1]
+
+        if not os.path.exists(path):
+            raise ValueError(f"File {path} no longer exists, so its last edit can't be undone")
+        content = read_text(path)
+        start, end = entry["offset"], entry["offset"] + entry["new_length"]
+        if (
+            len(content) != entry["content_length"]
+            or hashlib.sha1(content[start:end].encode()).hexdigest() != entry["new_hash"]
+        ):
+            raise ValueError(
+                f"File {path} was changed outside the editor since its last edit, so it can't be undone"
+            )
+
+        if entry["old_text"] is None:
+            with open(entry["spill_path"], "r") as f:
+                old_text = f.read()
+        else:
+            old_text = entry["old_text"]
+            self.memory -= entry["size"]
+
+        if entry["created"]:
+            os.remove(path)
+            message = f"Removed {path}, which was created by the last edit"
+        else:
+            write_text(path, content[:start] + old_text + content[end:])
+            message = f"Undid the last edit to {path}"
+
+        entries.pop()
+        if not entries:
+            del self.history[path]
+        if entry["spill_path"]:
+            os.remove(entry["spill_path"])
+        remaining = len(entries)
+        return f"{message} ({remaining} earlier edit{'s' if remaining != 1 else ''} can still be undone)"
+
+
+edit_journal = EditJournal(UNDO_FILE_BUDGET_BYTES, UNDO_TOTAL_BUDGET_BYTES)
+
+
+def get_line_index(path: str) -> array:
+    """
+    Get the line index of a file, building it on first use.
+
+    The index stores, for every LINE_INDEX_BLOCK_BYTES block of the file, how
+    many newlines come before it. It's built with one C-speed count per block
+    and cached until the file's size or modification time changes.
+
+    Args:
+        path: The path to the file
+
+    Returns:
+        Array where entry i is the number of newlines before block i
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = line_indexes.get(path)
+    if cached and cached[0] == key:
+        line_indexes.move_to_end(path)
+        return cached[1]
+
+    counts = array("Q", [0])
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(LINE_INDEX_BLOCK_BYTES)
+            if not block:
+                break
+            counts.append(counts[-1] + block.count(b"\n"))
+
+    line_indexes[path] = (key, counts)
+    if len(line_indexes) > LINE_INDEX_MAX_FILES:
+        line_indexes.popitem(last=False)
+    return counts
+
+
+def line_start_offset(data: mmap.mmap, counts: array, newlines: int) -> int:
+    """
+    Find the byte offset just after the given number of newlines.
+
+    Args:
+        data: The memory-mapped file
+        counts: The file's line index
+        newlines: How many newlines to skip
+
+    Returns:
+        Byte offset of the start of line newlines + 1
+    """
+    if newlines <= 0:
+        return 0
+    if newlines > counts[-1]:
+        return len(data)
+    # Jump to the block holding the newline, then scan within it
+    block = bisect.bisect_left(counts, newlines) - 1
+    offset = block * LINE_INDEX_BLOCK_BYTES
+    for _ in range(newlines - counts[block]):
+        offset = data.find(b"\n", offset) + 1
+    return offset
+
+
+def read_line_range(path: str, start: int, end: int) -> str:
+    """
+    Read lines start through end (1-indexed, end -1 for end of file) of a file.
+
+    Small files are read whole. Larger files are memory-mapped and only the
+    requested window is read, using the cached line index to seek to it.
+
+    Args:
+        path: The path to the file
+        start: First line to read
+        end: Last line to read, or -1 for the end of the file
+
+    Returns:
+        The text of the requested lines
+    """
+    if os.path.getsize(path) < LINE_INDEX_MIN_BYTES:
+        lines = io.StringIO(read_text(path)).readlines()
+        start = max(0, start - 1)
+        end = len(lines) if end == -1 else min(len(lines), end)
+        return "".join(lines[start:end])
+
+    counts = get_line_index(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        begin = line_start_offset(data, counts, start - 1)
+        stop = len(data) if end == -1 else line_start_offset(data, counts, end)
+        window = data[begin:stop] if stop > begin else b""
+    return window.decode(errors="replace").replace("\r\n", "\n")
+
+
 def view_file(path: str, view_range=None) -> Dict[str, Any]:
     """
     View the contents of a file.
@@ -172,20 +669,11 @@ def view_file(path: str, view_range=None) -> Dict[str, Any]:
             console.log(f"[view_file] Error: {error_msg}")
             return {"error": error_msg}
 
-        with open(path, "r") as f:
-            lines = f.readlines()
-
         if view_range:
             start, end = view_range
-            # Convert to 0-indexed for Python
-            start = max(0, start - 1)
-            if end == -1:
-                end = len(lines)
-            else:
-                end = min(len(lines), end)
-            lines = lines[start:end]
-
-        content = "".join(lines)
+            content = read_line_range(path, start, end)
+        else:
+            content = read_text(path)
 
         # Display the file content (only for console, not returned to Claude)
         file_extension = os.path.splitext(path)[1][1:]  # Get extension without the dot
@@ -222,8 +710,7 @@ def str_replace(path: str, old_str: str, new_str: str) -> Dict[str, Any]:
             console.log(f"[str_replace] Error: {error_msg}")
             return {"error": error_msg}
 
-        with open(path, "r") as f:
-            content = f.read()
+        content = read_text(path)
 
         if old_str not in content:
             error_msg = f"The specified string was not found in the file {path}"
@@ -232,8 +719,8 @@ def str_replace(path: str, old_str: str, new_str: str) -> Dict[str, Any]:
 
         new_content = content.replace(old_str, new_str, 1)
 
-        with open(path, "w") as f:
-            f.write(new_content)
+        write_text(path, new_content)
+        edit_journal.record(path, content, new_content)
 
         console.print(f"[green]Successfully replaced text in {path}[/green]")
         console.log(f"[str_replace] Successfully replaced text in {path}")
@@ -273,8 +760,12 @@ def create_file(path: str, file_text: str) -> Dict[str, Any]:
             console.log(f"[create_file] Creating directory: {directory}")
             os.makedirs(directory)
 
-        with open(path, "w") as f:
-            f.write(file_text or "")
+        old_content = None
+        if os.path.isfile(path):
+            old_content = read_text(path)
+
+        write_text(path, file_text or "")
+        edit_journal.record(path, old_content, file_text or "")
 
         console.print(f"[green]Successfully created file {path}[/green]")
         console.log(f"[create_file] Successfully created file {path}")
@@ -318,8 +809,7 @@ def insert_text(path: str, insert_line: int, new_str: str) -> Dict[str, Any]:
             console.log(f"[insert_text] Error: {error_msg}")
             return {"error": error_msg}
 
-        with open(path, "r") as f:
-            lines = f.readlines()
+        lines = io.StringIO(read_text(path)).readlines()
 
         # Line is 0-indexed for this function, but Claude provides 1-indexed
         insert_line = min(max(0, insert_line - 1), len(lines))
@@ -336,10 +826,12 @@ def insert_text(path: str, insert_line: int, new_str: str) -> Dict[str, Any]:
         if new_str and not new_str.endswith("\n"):
             new_str += "\n"
 
+        old_content = "".join(lines)
         lines.insert(insert_line, new_str)
 
-        with open(path, "w") as f:
-            f.writelines(lines)
+        new_content = "".join(lines)
+        write_text(path, new_content)
+        edit_journal.record(path, old_content, new_content)
 
         console.print(
             f"[green]Successfully inserted text at line {insert_line + 1} in {path}[/green]"
@@ -360,14 +852,14 @@ def insert_text(path: str, insert_line: int, new_str: str) -> Dict[str, Any]:
 
 def undo_edit(path: str) -> Dict[str, Any]:
     """
-    Placeholder for undo_edit functionality.
-    In a real implementation, you would need to track edit history.
+    Undo the most recent edit to a file made by this agent.
+    Can be called repeatedly to step further back through the file's history.
 
     Args:
         path: The path to the file whose last edit should be undone
 
     Returns:
-        Dictionary with message about undo functionality
+        Dictionary with result or error message
     """
     try:
         if not path or not path.strip():
@@ -378,8 +870,14 @@ def undo_edit(path: str) -> Dict[str, Any]:
         # Normalize the path
         path = normalize_path(path)
 
-        message = "Undo functionality is not implemented in this version."
-        console.print(f"[yellow]{message}[/yellow]")
+        try:
+            message = edit_journal.undo(path)
+        except ValueError as e:
+            error_msg = str(e)
+            console.log(f"[undo_edit] Error: {error_msg}")
+            return {"error": error_msg}
+
+        console.print(f"[green]{message}[/green]")
         console.log(f"[undo_edit] {message}")
         return {"result": message}
     except Exception as e:
@@ -390,6 +888,140 @@ def undo_edit(path: str) -> Dict[str, Any]:
         return {"error": error_msg}
 
 
+def plan_edits(content: str, edits: List[Tuple[int, dict]]) -> Tuple[Optional[str], List[str]]:
+    """
+    Apply a batch of edits to a file's content in a single pass.
+
+    Every anchor is resolved against the original content before anything is
+    changed: old_str must occur exactly once and insert_line must be in range,
+    and no two edits may touch overlapping text.
+
+    Args:
+        content: The file's current content
+        edits: (number, edit) pairs, where each edit has new_str and either
+            old_str or insert_line (insert after that line, 0 for the top)
+
+    Returns:
+        Tuple of the new content (None if any edit is invalid) and the errors
+    """
+    spans = []
+    errors = []
+    line_starts = None
+    for number, edit in edits:
+        new_str = edit.get("new_str") or ""
+        if edit.get("old_str"):
+            count = content.count(edit["old_str"])
+            if count != 1:
+                errors.append(
+                    f"edit {number}: old_str "
+                    + ("not found" if count == 0 else f"found {count} times, it must be unique")
+                )
+                continue
+            start = content.index(edit["old_str"])
+            spans.append((start, start + len(edit["old_str"]), new_str, number))
+        elif edit.get("insert_line") is not None:
+            if line_starts is None:
+                line_starts = [0] + [match.end() for match in re.finditer("\n", content)]
+                line_count = len(line_starts) - (1 if not content or content.endswith("\n") else 0)
+            line = edit["insert_line"]
+            if line < 0 or line > line_count:
+                errors.append(f"edit {number}: insert_line {line} out of range (0-{line_count})")
+                continue
+            if not new_str.endswith("\n"):
+                new_str += "\n"
+            if line == line_count:
+                offset = len(content)
+                if content and not content.endswith("\n"):
+                    new_str = "\n" + new_str
+            else:
+                offset = line_starts[line]
+            spans.append((offset, offset, new_str, number))
+        else:
+            errors.append(f"edit {number}: needs either old_str or insert_line")
+
+    # Sorting is stable, so insertions at the same line keep their order
+    spans.sort(key=lambda span: (span[0], span[1]))
+    for previous, current in zip(spans, spans[1:]):
+        if current[0] < previous[1]:
+            errors.append(f"edit {current[3]}: overlaps edit {previous[3]}")
+    if errors:
+        return None, errors
+
+    pieces = []
+    position = 0
+    for start, end, new_str, _ in spans:
+        pieces.append(content[position:start])
+        pieces.append(new_str)
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces), []
+
+
+def apply_edits(edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply a batch of replacements and insertions across one or more files.
+    Nothing is written unless every edit in the batch is valid, and then
+    either every file is changed or none are.
+
+    Args:
+        edits: Edits with path, new_str and either old_str or insert_line
+
+    Returns:
+        Dictionary with a summary or the list of invalid edits
+    """
+    try:
+        if not edits:
+            error_msg = "No edits provided."
+            console.log(f"[apply_edits] Error: {error_msg}")
+            return {"error": error_msg}
+
+        by_path = OrderedDict()
+        errors = []
+        for number, edit in enumerate(edits, 1):
+            path = edit.get("path")
+            if not path or not path.strip():
+                errors.append(f"edit {number}: path is empty")
+                continue
+            # Different spellings of one file must share a plan, or the later
+            # write would discard the earlier one's edits
+            by_path.setdefault(os.path.realpath(normalize_path(path)), []).append(
+                (number, edit)
+            )
+
+        planned = {}
+        for path, file_edits in by_path.items():
+            if not os.path.isfile(path):
+                errors.append(f"{path}: file does not exist")
+                continue
+            content = read_text(path)
+            new_content, file_errors = plan_edits(content, file_edits)
+            errors.extend(f"{path}: {error}" for error in file_errors)
+            planned[path] = (content, new_content)
+
+        if errors:
+            error_msg = "No edits were applied:\n- " + "\n- ".join(errors)
+            console.log(f"[apply_edits] Error: {error_msg}")
+            return {"error": error_msg}
+
+        write_texts(planned)
+        summary = []
+        for path, (content, new_content) in planned.items():
+            edit_journal.record(path, content, new_content)
+            summary.append(
+                f"{path}: {len(by_path[path])} edit{'s' if len(by_path[path]) != 1 else ''}, {content.count(chr(10))} -> {new_content.count(chr(10))} lines"
+            )
+        message = f"Applied {len(edits)} edits to {len(planned)} file{'s' if len(planned) != 1 else ''}:\n" + "\n".join(summary)
+        console.print(f"[green]{message}[/green]")
+        console.log(f"[apply_edits] {message}")
+        return {"result": message}
+    except Exception as e:
+        error_msg = f"Error applying edits: {str(e)}"
+        console.print(f"[red]{error_msg}[/red]")
+        console.log(f"[apply_edits] Error: {str(e)}")
+        console.log(traceback.format_exc())
+        return {"error": error_msg}
+
+
 def handle_tool_use(tool_use: Dict[str, Any]) -> Dict[str, Any]:
     """
     Handle text editor tool use from Claude.
@@ -494,6 +1126,7 @@ Follow these steps when handling file operations:
 1. First, view files to understand their content before making changes
 2. For edits, ensure you have the correct context and are making the right changes
 3. When creating files, make sure they're in the right location with proper formatting
+4. When a change touches many places, use apply_edits to make all of them in one call
 """
 
     # Define text editor tool
@@ -524,7 +1157,7 @@ Please use the text editor tool to help me with this. First, think through what
         message_args = {
             "model": MODEL,
             "max_tokens": 4096,
-            "tools": [text_editor_tool],
+            "tools": [text_editor_tool, APPLY_EDITS_TOOL],
             "messages": messages,
             "system": system_prompt,
             "thinking": {"type": "enabled", "budget_tokens": max_thinking_tokens},
@@ -617,7 +1250,10 @@ Please use the text editor tool to help me with this. First, think through what
             )
 
             # Handle the tool use
-            tool_result = handle_tool_use(tool_use_block.input)
+            if tool_use_block.name == "apply_edits":
+                tool_result = apply_edits(tool_use_block.input.get("edits"))
+            else:
+                tool_result = handle_tool_use(tool_use_block.input)
 
             # Log tool result
             result_text = tool_result.get("error") or tool_result.get("result", "")
@@ -676,8 +1312,35 @@ def main():
         action="store_true",
         help="Enable token-efficient tool use (beta feature)",
     )
+    parser.add_argument(
+        "--undo-budget-mb",
+        type=int,
+        default=32,
+        help="Memory kept for undo history across all files (default: 32)",
+    )
+    parser.add_argument(
+        "--undo-spill",
+        action="store_true",
+        help="Spill undo history over budget to a temp directory instead of dropping it",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=["none", "file", "dir"],
+        default="file",
+        help="fsync edited files before renaming them into place (file), also fsync their directory (dir), or neither (none) (default: file)",
+    )
     args = parser.parse_args()
 
+    global edit_journal, WRITE_DURABILITY
+    WRITE_DURABILITY = args.durability
+    spill_dir = None
+    if args.undo_spill:
+        spill_dir = tempfile.mkdtemp(prefix="sfa_undo_")
+        atexit.register(shutil.rmtree, spill_dir, ignore_errors=True)
+    edit_journal = EditJournal(
+        UNDO_FILE_BUDGET_BYTES, args.undo_budget_mb * 1024 * 1024, spill_dir
+    )
+
     # Get API key
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
@@ -1,6 +1,7 @@
 # /// script
 # dependencies = [
 #   "google-genai>=1.1.0",
+#   "jq>=1.6.0",
 # ]
 # ///
 
@@ -13,15 +14,33 @@ uv run sfa_jq_gemini_v1.py --exe "Filter scores above 80 from data/analytics.jso
 # generates jq command only
 uv run sfa_jq_gemini_v1.py "Filter scores above 80 from data/analytics.json and save to high_scores.json"
 
+# streams a large JSON array or NDJSON file one record at a time
+uv run sfa_jq_gemini_v1.py --exe --stream "Filter scores above 80 from data/analytics.json and save to high_scores.json"
+
+# reuses the cached command for near-identical requests, or always asks the model
+uv run sfa_jq_gemini_v1.py --exe --similarity 0.9 "Filter scores above 80 from data/analytics.json and save to high_scores.json"
+uv run sfa_jq_gemini_v1.py --exe --no-cache "Filter scores above 80 from data/analytics.json and save to high_scores.json"
+
 ///
 """
 
 import os
+import re
 import sys
+import json
+import time
+import shlex
 import argparse
+import hashlib
+import resource
+import itertools
 import subprocess
+from typing import Any, Dict, Iterator, Optional, Tuple
+import jq
 from google import genai
 
+MODEL = "gemini-2.0-flash-001"
+
 JQ_PROMPT = """<purpose>
     You are a world-class expert at crafting precise jq commands for JSON processing.
     Your goal is to generate accurate, minimal jq commands that exactly match the user's data manipulation needs.
@@ -36,6 +55,7 @@ JQ_PROMPT = """<purpose>
     <instruction>If the user request asks to pipe or output to a file, and no explicit directory is specified, use the directory of the input file.</instruction>
     <instruction>Output your response by itself, do not use backticks or markdown formatting. We're going to run your response as a shell command immediately.</instruction>
     <instruction>If your results you're working with a list of objects, default to outputting a valid json array.</instruction>
+    <instruction>When an input-structure sketch is given, use its key paths and types exactly instead of guessing field names.</instruction>
 </instructions>
 
 <examples>
@@ -106,12 +126,527 @@ JQ_PROMPT = """<purpose>
 </examples>
 
 
+{{input_structure}}
+
 <user-request>
     {{user_request}}
 </user-request>
 
 Your jq command:"""
 
+# Streaming mode reads the input one record at a time so memory stays constant
+STREAM_CHUNK_CHARS = 1 << 20
+STREAM_BATCH_RECORDS = 1000
+STREAM_FLAGS = {"-c", "-r", "-M", "-cr", "-rc", "--compact-output", "--raw-output"}
+
+STREAM_INSTRUCTION = """<instruction>The input file is a {layout} that is processed one record at a time, so the jq filter must work on a single record: write jq -c 'select(.score > 80) | {{name, score}}' data.json rather than jq '[.[] | select(.score > 80)]' data.json. Don't use .[], whole-input operations (length, sort_by, group_by, add) or slurping. Results are written one per line.</instruction>"""
+
+# Filters that are known to mean the same thing on one record as on each element
+# of the input: a path into the record, or a postfix path after .[]
+RECORD_PATH_PATTERN = re.compile(
+    r'(?:\.[A-Za-z_]\w*|\."[^"\\]*")(?:\.[A-Za-z_]\w*|\."[^"\\]*"|\.?\[(?:-?\d+|"[^"\\]*")?\])*'
+)
+PATH_SUFFIX_PATTERN = re.compile(
+    r'(?:\.[A-Za-z_]\w*|\."[^"\\]*"|\.?\[(?:-?\d+|"[^"\\]*")?\])*'
+)
+JSON_PATH_PATTERN = re.compile(r"[\w./~-]+\.(?:json|ndjson|jsonl)\b")
+
+
+def find_input_file(request: str) -> Optional[str]:
+    """Returns the first existing JSON file path mentioned in the request."""
+    for match in JSON_PATH_PATTERN.findall(request):
+        path = os.path.expanduser(match)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def detect_json_layout(path: str) -> str:
+    """Returns "array", "ndjson" or "document" based on the start of a JSON file."""
+    if path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    with open(path, encoding="utf-8") as f:
+        head = f.read(STREAM_CHUNK_CHARS).lstrip()
+    if head.startswith("["):
+        return "array"
+    first_line, _, rest = head.partition("\n")
+    try:
+        json.loads(first_line)
+    except ValueError:
+        return "document"
+    return "ndjson" if rest.strip() else "document"
+
+
+def iter_json_records(path: str, layout: str) -> Iterator[str]:
+    """Yields the JSON text of each record of a top-level array or NDJSON file.
+
+    Arrays are parsed incrementally with JSONDecoder.raw_decode over a buffer
+    that is refilled STREAM_CHUNK_CHARS at a time, so memory is bounded by the
+    largest record rather than the file.
+    """
+    with open(path, encoding="utf-8") as f:
+        if layout == "ndjson":
+            for line in f:
+                if line.strip():
+                    yield line
+            return
+
+        decoder = json.JSONDecoder()
+        buffer = f.read(STREAM_CHUNK_CHARS).lstrip()[1:]  # skip the opening [
+        pos = 0
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                buffer, pos = f.read(STREAM_CHUNK_CHARS), 0
+                if not buffer:
+                    return
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                _, end = decoder.raw_decode(buffer, pos)
+                # A number cut by the chunk boundary decodes as a shorter
+                # number, so a value only counts once the separator after it
+                # has been read
+                complete = eof or buffer[end : end + 1] in (" ", "\t", "\r", "\n", ",", "]")
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = f.read(STREAM_CHUNK_CHARS)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield buffer[pos:end]
+            pos = end
+
+
+def find_top_level(jq_filter: str, targets: str) -> int:
+    """Returns the index of the first character in targets outside strings and brackets.
+
+    A | that is part of |= is not a pipe and is skipped. Returns -1 when there
+    is no such character or the brackets don't balance.
+    """
+    depth = 0
+    in_string = False
+    i = 0
+    while i < len(jq_filter):
+        char = jq_filter[i]
+        if in_string:
+            if char == "\\":
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif depth == 0 and char in targets and jq_filter[i : i + 2] != "|=":
+            return i
+        elif char == '"':
+            in_string = True
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth < 0:
+                return -1
+        i += 1
+    return -1
+
+
+def encloses(jq_filter: str, opening: str, closing: str) -> bool:
+    """Returns True if jq_filter starts with opening and its matching closing bracket ends it."""
+    if not jq_filter.startswith(opening):
+        return False
+    return find_top_level(jq_filter[len(opening) :], closing) == len(jq_filter) - len(opening) - 1
+
+
+def per_record_filter(jq_filter: str) -> Optional[str]:
+    """Turns a filter written for the whole input into one that runs on each record.
+
+    Only an allowlist of forms is accepted: `.[] | f`, `.[].path | f` and
+    `[.[] | f]` are unwrapped, and filters that already start from a single
+    record (`select(...)`, `{...}`, `.field`) are kept. Anything else, or
+    anything that can't be parsed with confidence, returns None so the command
+    runs with the jq binary instead.
+    """
+    jq_filter = jq_filter.strip()
+    if not jq_filter or "\\(" in jq_filter:
+        return None
+    if jq_filter.startswith("["):
+        if not encloses(jq_filter, "[", "]"):
+            return None
+        jq_filter = jq_filter[1:-1].strip()
+        if not jq_filter.startswith(".[]"):
+            return None
+
+    pipe = find_top_level(jq_filter, "|")
+    head = jq_filter if pipe == -1 else jq_filter[:pipe].strip()
+    tail = "" if pipe == -1 else jq_filter[pipe + 1 :].strip()
+    if head.startswith(".[]"):
+        suffix = head[3:].strip()
+        if not PATH_SUFFIX_PATTERN.fullmatch(suffix):
+            return None
+        head = suffix if suffix.startswith(".") else "." + suffix
+    elif not (
+        head == "."
+        or RECORD_PATH_PATTERN.fullmatch(head)
+        or encloses(head, "select(", ")")
+        or encloses(head, "{", "}")
+    ):
+        return None
+    if pipe != -1 and not tail:
+        return None
+    if not tail:
+        return head
+    return tail if head == "." else f"{head} | {tail}"
+
+
+# A structure sketch of the input is added to the prompt so generated paths match the data
+SKETCH_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sfa", "sketches")
+SKETCH_SAMPLE_RECORDS = 200
+SKETCH_ARRAY_ITEMS = 20
+SKETCH_MAX_DEPTH = 6
+SKETCH_MAX_PATHS = 80
+SKETCH_MAX_DOCUMENT_BYTES = 64 * 1024 * 1024
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def file_fingerprint(path: str, *parts: str) -> str:
+    """Returns a key that changes whenever the file at path is rewritten.
+
+    Args:
+        path: Path to the data file
+        *parts: Extra key parts
+
+    Returns:
+        Hex digest of the absolute path, size, modification time and parts
+    """
+    stat = os.stat(path)
+    key = "|".join(
+        [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), *parts]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def json_type(value: Any) -> str:
+    """Returns the jq type name of a parsed JSON value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "array" if isinstance(value, list) else "object"
+
+
+def sketch_value(
+    value: Any, path: str, parent: Optional[str], paths: Dict[str, Dict[str, Any]], depth: int = 0
+) -> None:
+    """Merges one value and everything below it into the per-path sketch."""
+    entry = paths.setdefault(
+        path,
+        {"types": [], "count": 0, "parent": parent, "example": None, "lengths": None},
+    )
+    entry["count"] += 1
+    kind = json_type(value)
+    if kind not in entry["types"]:
+        entry["types"].append(kind)
+    if depth >= SKETCH_MAX_DEPTH:
+        return
+    prefix = "" if path == "." else path
+    if isinstance(value, dict):
+        for key, child in value.items():
+            key_path = f".{key}" if IDENTIFIER_PATTERN.fullmatch(key) else f".{json.dumps(key)}"
+            sketch_value(child, prefix + key_path, path, paths, depth + 1)
+    elif isinstance(value, list):
+        low, high = entry["lengths"] or (len(value), len(value))
+        entry["lengths"] = (min(low, len(value)), max(high, len(value)))
+        for item in value[:SKETCH_ARRAY_ITEMS]:
+            sketch_value(item, f"{prefix}[]", None, paths, depth + 1)
+    elif entry["example"] is None and value is not None:
+        entry["example"] = value
+
+
+def compute_structure_sketch(path: str) -> Optional[Dict[str, Any]]:
+    """Infers a merged schema of key paths, types, array lengths and examples for a JSON file.
+
+    Arrays and NDJSON files are streamed and only the first
+    SKETCH_SAMPLE_RECORDS records are read. Single documents are only sketched
+    up to SKETCH_MAX_DOCUMENT_BYTES.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        Dict with the layout, the number of records sampled and the per-path
+        sketch, or None if the file is too large to sketch
+    """
+    layout = detect_json_layout(path)
+    paths: Dict[str, Dict[str, Any]] = {}
+    sampled = 0
+    if layout == "document":
+        if os.path.getsize(path) > SKETCH_MAX_DOCUMENT_BYTES:
+            return None
+        with open(path, encoding="utf-8") as f:
+            sketch_value(json.load(f), ".", None, paths)
+    else:
+        # NDJSON records are separate jq inputs, so their paths start at the record
+        root = ".[]" if layout == "array" else "."
+        records = iter_json_records(path, layout)
+        for text in itertools.islice(records, SKETCH_SAMPLE_RECORDS):
+            sketch_value(json.loads(text), root, None, paths)
+            sampled += 1
+    for entry in paths.values():
+        entry["example"] = json.dumps(entry["example"], ensure_ascii=False)[:40]
+    return {"layout": layout, "sampled": sampled, "paths": paths}
+
+
+def format_structure_sketch(path: str, sketch: Dict[str, Any]) -> str:
+    """Renders a structure sketch as the <input-structure> block of the prompt."""
+    if sketch["layout"] == "document":
+        description = "single JSON document"
+    else:
+        kind = "JSON array" if sketch["layout"] == "array" else "NDJSON file"
+        description = f"{kind}, first {sketch['sampled']} records sampled"
+    paths = sketch["paths"]
+    lines = []
+    for key_path, entry in list(paths.items())[:SKETCH_MAX_PATHS]:
+        line = f"{key_path}  {'|'.join(entry['types'])}"
+        if entry["lengths"]:
+            low, high = entry["lengths"]
+            line += f"  length {low}" if low == high else f"  length {low}-{high}"
+        if entry["example"] != "null":
+            line += f"  e.g. {entry['example']}"
+        parent = paths.get(entry["parent"]) if entry["parent"] else None
+        if parent and entry["count"] < parent["count"]:
+            line += f"  (present in {entry['count'] / parent['count']:.0%})"
+        lines.append(f"    {line}")
+    if len(paths) > SKETCH_MAX_PATHS:
+        lines.append(f"    ... {len(paths) - SKETCH_MAX_PATHS} more paths")
+    return (
+        f'<input-structure file="{path}" layout="{description}">\n'
+        + "\n".join(lines)
+        + "\n</input-structure>"
+    )
+
+
+def get_structure_sketch(path: str) -> Optional[Dict[str, Any]]:
+    """Returns the structure sketch for a JSON file, cached by its fingerprint.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        The sketch from compute_structure_sketch, or None if the file can't be
+        sketched
+    """
+    cache_path = os.path.join(SKETCH_CACHE_DIR, f"{file_fingerprint(path, 'sketch')}.json")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    sketch = compute_structure_sketch(path)
+    if sketch is None:
+        return None
+    os.makedirs(SKETCH_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sketch, f)
+    os.replace(tmp_path, cache_path)
+    return sketch
+
+
+def schema_fingerprint(sketch: Dict[str, Any]) -> str:
+    """Returns a digest of a sketch's layout, key paths and types, ignoring example values."""
+    shape = [sketch["layout"], [[path, entry["types"]] for path, entry in sketch["paths"].items()]]
+    return hashlib.sha256(json.dumps(shape).encode()).hexdigest()[:16]
+
+
+# Generated commands are reused for repeat requests against the same input schema
+COMMAND_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "sfa", "commands", "jq.json"
+)
+COMMAND_CACHE_TTL_SECONDS = 7 * 24 * 3600
+COMMAND_CACHE_MAX_ENTRIES = 500
+SHINGLE_SIZE = 3
+# Tokens like numbers, paths and file names must match exactly for a near-match
+LITERAL_TOKEN_PATTERN = re.compile(r"\S*[\d/.'\"]\S*")
+
+
+def normalize_request(request: str) -> str:
+    """Collapses whitespace and trailing punctuation so trivially different requests share a key."""
+    return " ".join(request.split()).rstrip(".!?; ")
+
+
+def request_shingles(request: str) -> set:
+    """Returns the set of lowercase character shingles of a normalized request."""
+    text = request.lower()
+    return {text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+
+
+def load_command_cache(ttl_seconds: int) -> Dict[str, Dict[str, Any]]:
+    """Loads the command cache, dropping entries older than ttl_seconds.
+
+    Args:
+        ttl_seconds: Maximum age of a cached command
+
+    Returns:
+        Dict of cache key to entry, empty if the cache is missing or unreadable
+    """
+    try:
+        with open(COMMAND_CACHE_PATH, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {
+        key: entry
+        for key, entry in entries.items()
+        if now - entry["created_at"] <= ttl_seconds
+    }
+
+
+def save_command_cache(entries: Dict[str, Dict[str, Any]]) -> None:
+    """Writes the command cache atomically, keeping the most recently used entries."""
+    if len(entries) > COMMAND_CACHE_MAX_ENTRIES:
+        recent = sorted(entries, key=lambda key: entries[key]["last_used"])
+        for key in recent[: len(entries) - COMMAND_CACHE_MAX_ENTRIES]:
+            del entries[key]
+    os.makedirs(os.path.dirname(COMMAND_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{COMMAND_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+    os.replace(tmp_path, COMMAND_CACHE_PATH)
+
+
+def command_cache_key(request: str, scope: str) -> str:
+    """Returns the cache key for a normalized request within a scope."""
+    return hashlib.sha256(f"{scope}|{request}".encode()).hexdigest()
+
+
+def lookup_command(
+    entries: Dict[str, Dict[str, Any]], request: str, scope: str, similarity: float
+) -> Optional[Tuple[str, float]]:
+    """Finds a cached command for a request, exactly or by shingle similarity.
+
+    Args:
+        entries: Loaded command cache
+        request: Normalized user request
+        scope: Input schema fingerprint, model and prompt version
+        similarity: Minimum Jaccard similarity for a near-match, 0 to disable
+
+    Returns:
+        Tuple of the cached command and its similarity, or None on a miss
+    """
+    entry = entries.get(command_cache_key(request, scope))
+    score = 1.0
+    if entry is None and similarity > 0:
+        shingles = request_shingles(request)
+        literals = sorted(LITERAL_TOKEN_PATTERN.findall(request))
+        score = 0.0
+        for candidate in entries.values():
+            if candidate["scope"] != scope:
+                continue
+            if sorted(LITERAL_TOKEN_PATTERN.findall(candidate["request"])) != literals:
+                continue
+            other = request_shingles(candidate["request"])
+            candidate_score = len(shingles & other) / len(shingles | other)
+            if candidate_score >= similarity and candidate_score > score:
+                entry, score = candidate, candidate_score
+    if entry is None:
+        return None
+    entry["last_used"] = time.time()
+    save_command_cache(entries)
+    return entry["command"], score
+
+
+def store_command(
+    entries: Dict[str, Dict[str, Any]], request: str, scope: str, command: str
+) -> None:
+    """Adds a generated command to the cache and saves it."""
+    now = time.time()
+    entries[command_cache_key(request, scope)] = {
+        "request": request,
+        "scope": scope,
+        "command": command,
+        "created_at": now,
+        "last_used": now,
+    }
+    save_command_cache(entries)
+
+
+def parse_jq_command(jq_command: str) -> Optional[Dict[str, Any]]:
+    """Splits a simple `jq [flags] 'filter' file [> output]` command into its parts.
+
+    Returns None for anything else, such as pipes, several input files or flags
+    that change how input is read. The filter is returned as written.
+    """
+    try:
+        tokens = shlex.split(jq_command)
+    except ValueError:
+        return None
+    if not tokens or tokens[0] != "jq":
+        return None
+    flags, args, output = [], [], None
+    rest = iter(tokens[1:])
+    for token in rest:
+        if token == ">":
+            output = next(rest, None)
+        elif token.startswith(">") and not token.startswith(">>"):
+            output = token[1:]
+        elif token.startswith("-") and not args:
+            flags.append(token)
+        else:
+            args.append(token)
+    if len(args) != 2 or not set(flags) <= STREAM_FLAGS or output == "":
+        return None
+    return {
+        "filter": args[0],
+        "input": args[1],
+        "output": output,
+        "raw": any("r" in flag for flag in flags),
+    }
+
+
+def run_streaming(
+    jq_filter: str, input_path: str, layout: str, output_path: Optional[str], raw: bool
+) -> None:
+    """Runs a per-record jq filter over a large JSON input and reports throughput.
+
+    Records are fed to the in-process jq binding STREAM_BATCH_RECORDS at a
+    time, which keeps memory constant and is several times faster than
+    jq --stream. Results are written one JSON value per line.
+    """
+    program = jq.compile(jq_filter)
+    out = open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+    records = results = 0
+    start = time.perf_counter()
+    try:
+        batches = iter_json_records(input_path, layout)
+        while batch := list(itertools.islice(batches, STREAM_BATCH_RECORDS)):
+            records += len(batch)
+            for value in program.input_text("\n".join(batch)).all():
+                results += 1
+                if raw and isinstance(value, str):
+                    out.write(value + "\n")
+                else:
+                    out.write(json.dumps(value, ensure_ascii=False) + "\n")
+    finally:
+        if output_path:
+            out.close()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (
+        1024 * 1024 if sys.platform == "darwin" else 1024
+    )
+    print(
+        f"\n📈 Streamed {records:,} records in {elapsed:.2f}s "
+        f"({records / elapsed:,.0f} records/s), {results:,} results, peak memory {peak_mb:.0f} MB"
+    )
+
 
 def main():
     # Set up argument parser
@@ -125,6 +660,28 @@ def main():
         action="store_true",
         help="Execute the generated JQ command",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process a large JSON array or NDJSON input one record at a time",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask the model instead of reusing a cached command",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=COMMAND_CACHE_TTL_SECONDS,
+        help="Seconds a cached command stays valid",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.0,
+        help="Reuse a cached command for a near-identical request at this shingle similarity (e.g. 0.9, 0 disables)",
+    )
     args = parser.parse_args()
 
     # Configure the API key
@@ -141,17 +698,110 @@ def main():
     )
 
     try:
-        # Replace {{user_request}} in the prompt template
-        prompt = JQ_PROMPT.replace("{{user_request}}", args.prompt)
+        # Sketch the input file's structure so the model sees real key paths
+        input_file = find_input_file(args.prompt)
+        input_structure = ""
+        input_schema = "none"
+        if input_file:
+            try:
+                sketch = get_structure_sketch(input_file)
+                if sketch:
+                    input_structure = format_structure_sketch(input_file, sketch)
+                    input_schema = schema_fingerprint(sketch)
+                else:
+                    input_schema = file_fingerprint(input_file)[:16]
+            except Exception as e:
+                print(f"\n⚠️ Could not sketch {input_file}: {str(e)}")
 
-        # Generate JQ command
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-001", contents=prompt
+        # Replace {{user_request}} and {{input_structure}} in the prompt template
+        prompt = JQ_PROMPT.replace("{{user_request}}", args.prompt).replace(
+            "{{input_structure}}", input_structure
         )
-        jq_command = response.text.strip()
-        print("\n🤖 Generated JQ command:", jq_command)
+
+        # Streaming only applies to inputs made of records
+        layout = None
+        if args.stream:
+            layout = detect_json_layout(input_file) if input_file else None
+            if layout in ("array", "ndjson"):
+                prompt = prompt.replace(
+                    "</instructions>",
+                    "    "
+                    + STREAM_INSTRUCTION.format(
+                        layout="JSON array" if layout == "array" else "NDJSON file"
+                    )
+                    + "\n</instructions>",
+                )
+            else:
+                print("\n⚠️ Streaming needs a JSON array or NDJSON input file, running normally")
+                layout = None
+
+        # Reuse the command generated for the same request, schema, model and prompt
+        request = normalize_request(args.prompt)
+        prompt_version = hashlib.sha256(
+            (JQ_PROMPT + (STREAM_INSTRUCTION if layout else "")).encode()
+        ).hexdigest()[:12]
+        scope = f"{input_schema}|{MODEL}|{prompt_version}"
+        cache = {} if args.no_cache else load_command_cache(args.cache_ttl)
+        cached = None if args.no_cache else lookup_command(cache, request, scope, args.similarity)
+
+        if cached:
+            jq_command, score = cached
+            match = "exact match" if score == 1.0 else f"{score:.0%} similar request"
+            print(f"\n⚡ Cached JQ command ({match}):", jq_command)
+        else:
+            # Generate JQ command
+            response = client.models.generate_content(model=MODEL, contents=prompt)
+            jq_command = response.text.strip()
+            print("\n🤖 Generated JQ command:", jq_command)
+            # Commands that will be executed are only cached once they succeed
+            if not args.exe and not args.no_cache:
+                store_command(cache, request, scope, jq_command)
 
         # Execute the command if --exe flag is present
+        if args.exe and layout:
+            command = parse_jq_command(jq_command)
+            if command and os.path.isfile(command["input"]):
+                layout = detect_json_layout(command["input"])
+            # How the command runs is settled before any output is written
+            if command and layout in ("array", "ndjson"):
+                jq_filter = per_record_filter(command["filter"])
+                if jq_filter is None:
+                    # The model was asked for a filter on one record, so it runs on
+                    # each record as written, as jq '.[] | filter' would
+                    jq_filter = command["filter"]
+                    print("\n⚠️ Running the filter on each record as written")
+                try:
+                    jq.compile(jq_filter)
+                except ValueError as e:
+                    print(f"\n❌ Invalid jq filter: {str(e)}")
+                    sys.exit(1)
+                print("\n🔍 Streaming records...")
+                try:
+                    run_streaming(
+                        jq_filter,
+                        command["input"],
+                        layout,
+                        command["output"],
+                        command["raw"],
+                    )
+                except ValueError as e:
+                    # The jq binding raises ValueError for runtime errors
+                    print(f"\n❌ Error while streaming records: {str(e)}")
+                    sys.exit(1)
+                if not cached and not args.no_cache:
+                    store_command(cache, request, scope, jq_command)
+                print("\n✅ Command executed successfully")
+                return
+            if layout == "array":
+                # jq would load the whole array and apply the per-record filter to it
+                print(
+                    "\n❌ Only a single `jq [flags] 'filter' file [> output]` command can be "
+                    f"streamed over a JSON array, got: {jq_command}"
+                )
+                sys.exit(1)
+            # jq reads NDJSON and single documents one value at a time already
+            print("\n⚠️ Command can't be streamed in process, running it with jq instead")
+
         if args.exe:
             print("\n🔍 Executing command...")
             # Execute the command using subprocess
@@ -163,6 +813,8 @@ def main():
                 sys.exit(1)
             print(result.stdout + result.stderr)
 
+            if not cached and not args.no_cache:
+                store_command(cache, request, scope, jq_command)
             if not result.stderr:
                 print("\n✅ Command executed successfully")
 
@@ -3,7 +3,7 @@
 #   "anthropic>=0.47.1",
 #   "rich>=13.7.0",
 #   "pydantic>=2.0.0",
-#   "polars>=1.22.0",
+#   "polars>=1.25.0",
 # ]
 # ///
 
@@ -17,10 +17,20 @@ import os
 import sys
 import json
 import argparse
+import ast
+import atexit
+import csv
+import hashlib
+import importlib.util
+import inspect
+import queue
+import re
+import select
 import tempfile
 import subprocess
+import threading
 import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from rich.console import Console
 from rich.panel import Panel
 import anthropic
@@ -32,6 +42,375 @@ from pydantic import BaseModel, Field, ValidationError
 console = Console()
 
 # Tool functions
+# Column profiles are cached on disk, keyed by the data file's fingerprint
+PROFILE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sfa", "profiles")
+PROFILE_TOP_K = 5
+
+
+def file_fingerprint(path: str, *parts: str) -> str:
+    """Returns a key that changes whenever the file at path is rewritten.
+
+    Args:
+        path: Path to the data file
+        *parts: Extra key parts, such as a table name
+
+    Returns:
+        Hex digest of the absolute path, size, modification time and parts
+    """
+    stat = os.stat(path)
+    key = "|".join(
+        [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), *parts]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_cached_profile(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Returns the cached profile for fingerprint, or None if there is none."""
+    try:
+        with open(os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_profile(fingerprint: str, profile: Dict[str, Any]) -> None:
+    """Writes a profile to the cache, replacing any previous entry atomically."""
+    os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Renders a profile as one compact line per column for the model."""
+    lines = [f"rows: {profile['row_count']}"]
+    for column in profile["columns"]:
+        line = (
+            f"{column['name']} ({column['type']}): "
+            f"nulls={column['null_fraction']:.1%}, "
+            f"distinct~{column['approx_distinct']}, "
+            f"min={column['min']}, max={column['max']}"
+        )
+        if column.get("top_values"):
+            line += f", top={column['top_values']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def is_identifier_like(approx_distinct: int, row_count: int) -> bool:
+    """Returns True for columns where nearly every value is unique (ids, uuids).
+
+    Top values carry no information for these, so profiling skips them.
+    """
+    return row_count > 0 and approx_distinct >= row_count * 0.9
+
+
+# CSVs are converted once to Parquet, keyed by the CSV's fingerprint, so tools
+# and generated code stop re-parsing the source file
+COLUMNAR_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sfa", "columnar")
+COLUMNAR_CACHE_MAX_BYTES = 8 * 1024 * 1024 * 1024
+
+# Literal-path CSV reads in generated code that can be pointed at the cache
+CSV_READ_PATTERN = re.compile(r"""pl\.(scan|read)_csv\(\s*r?(["'])([^"'\n]+)\2\s*\)""")
+
+_columnar_cache_lock = threading.Lock()
+_columnar_cache_pending = set()
+# Separator and header detected for each version of a CSV, by fingerprint
+_csv_formats: Dict[str, Tuple[str, bool]] = {}
+
+
+def csv_format(csv_path: str) -> Tuple[str, bool]:
+    """Returns the separator and has_header that introspect_csv detects for a CSV."""
+    key = file_fingerprint(csv_path, "format")
+    if key not in _csv_formats:
+        info = introspect_csv(csv_path)
+        _csv_formats[key] = (info["delimiter"], info["has_header"])
+    return _csv_formats[key]
+
+
+def scan_csv(csv_path: str) -> pl.LazyFrame:
+    """Scans a CSV with its detected separator and header."""
+    separator, has_header = csv_format(csv_path)
+    return pl.scan_csv(csv_path, separator=separator, has_header=has_header)
+
+
+def columnar_cache_paths(csv_path: str) -> Tuple[str, str, str]:
+    """Returns the cached Parquet file, schema file and failure marker paths for a CSV.
+
+    The detected separator and header are part of the key, so a copy is only
+    reused for the parse it was made with.
+    """
+    separator, has_header = csv_format(csv_path)
+    fingerprint = file_fingerprint(csv_path, "columnar", separator, str(has_header))
+    return (
+        os.path.join(COLUMNAR_CACHE_DIR, f"{fingerprint}.parquet"),
+        os.path.join(COLUMNAR_CACHE_DIR, f"{fingerprint}.schema.json"),
+        os.path.join(COLUMNAR_CACHE_DIR, f"{fingerprint}.failed"),
+    )
+
+
+def get_columnar_cache(csv_path: str) -> str:
+    """Returns the Parquet copy of a CSV, converting the CSV on first use.
+
+    The CSV is parsed with the separator and header introspect_csv detects, and
+    the inferred schema is stored next to the Parquet file. The Parquet file is moved into place before the schema file, so a schema file
+    means the copy is complete. A CSV that fails to convert is recorded and not
+    retried until it changes.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        Path to the cached Parquet file
+
+    Raises:
+        RuntimeError: If this version of the CSV failed to convert before
+    """
+    parquet_path, schema_path, failed_path = columnar_cache_paths(csv_path)
+    with _columnar_cache_lock:
+        if os.path.exists(schema_path) and os.path.exists(parquet_path):
+            os.utime(parquet_path)  # keep recently used copies out of eviction
+            return parquet_path
+        if os.path.exists(failed_path):
+            with open(failed_path) as f:
+                raise RuntimeError(f"Converting the CSV to Parquet failed before: {f.read()}")
+        os.makedirs(COLUMNAR_CACHE_DIR, exist_ok=True)
+        try:
+            lf = scan_csv(csv_path)
+            schema = {name: str(dtype) for name, dtype in lf.collect_schema().items()}
+
+            def write_schema(tmp_path: str) -> None:
+                with open(tmp_path, "w") as f:
+                    json.dump(schema, f)
+
+            for path, write in [(parquet_path, lf.sink_parquet), (schema_path, write_schema)]:
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    write(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        except Exception as e:
+            with open(failed_path, "w") as f:
+                f.write(str(e))
+            raise
+        evict_columnar_cache(keep=parquet_path)
+        return parquet_path
+
+
+def evict_columnar_cache(keep: str) -> None:
+    """Removes the least recently used copies until the cache fits COLUMNAR_CACHE_MAX_BYTES."""
+    entries = {}
+    for name in os.listdir(COLUMNAR_CACHE_DIR):
+        path = os.path.join(COLUMNAR_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint = name.split(".", 1)[0]
+        size, mtime, paths = entries.get(fingerprint, (0, 0, []))
+        entries[fingerprint] = (size + stat.st_size, max(mtime, stat.st_mtime), paths + [path])
+    total = sum(size for size, _, _ in entries.values())
+    keep_fingerprint = os.path.basename(keep).split(".", 1)[0]
+    for fingerprint, (size, _, paths) in sorted(entries.items(), key=lambda item: item[1][1]):
+        if total <= COLUMNAR_CACHE_MAX_BYTES:
+            break
+        if fingerprint == keep_fingerprint:
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+
+def start_columnar_cache(csv_path: str) -> None:
+    """Converts a CSV to its Parquet copy in a background thread, once per CSV."""
+    with _columnar_cache_lock:
+        if csv_path in _columnar_cache_pending:
+            return
+        _columnar_cache_pending.add(csv_path)
+
+    def convert() -> None:
+        try:
+            get_columnar_cache(csv_path)
+        except Exception as e:
+            console.log(f"[yellow]Could not cache {csv_path} as Parquet: {str(e)}[/yellow]")
+        finally:
+            with _columnar_cache_lock:
+                _columnar_cache_pending.discard(csv_path)
+
+    threading.Thread(target=convert, daemon=True).start()
+
+
+def columnar_cache_ready(csv_path: str) -> Optional[str]:
+    """Returns the Parquet copy of a CSV if it has been fully written, otherwise None."""
+    parquet_path, schema_path, _ = columnar_cache_paths(csv_path)
+    if os.path.exists(schema_path) and os.path.exists(parquet_path):
+        return parquet_path
+    return None
+
+
+def scan_source(csv_path: str) -> pl.LazyFrame:
+    """Scans the cached Parquet copy of a CSV if it is ready, otherwise the CSV itself."""
+    parquet_path = columnar_cache_ready(csv_path)
+    if parquet_path:
+        return pl.scan_parquet(parquet_path)
+    return scan_csv(csv_path)
+
+
+def use_columnar_cache(polars_python_code: str) -> str:
+    """Points pl.scan_csv/pl.read_csv calls on a literal CSV path at its Parquet copy.
+
+    Calls that pass extra options are left alone, since the options may parse
+    the CSV differently from the cached copy, and so are CSVs that need a
+    separator or header option, which a plain call doesn't parse like the
+    copy either. A CSV whose copy isn't ready yet
+    is read as is while the conversion runs in the background, so test runs
+    never wait for it.
+
+    Args:
+        polars_python_code: Generated Polars code
+
+    Returns:
+        The code with plain CSV reads rewritten to read the cached Parquet file
+    """
+
+    def replace(match: re.Match) -> str:
+        func, _, csv_path = match.groups()
+        if not os.path.isfile(csv_path) or csv_format(csv_path) != (",", True):
+            return match.group(0)
+        parquet_path = columnar_cache_ready(csv_path)
+        if not parquet_path:
+            start_columnar_cache(csv_path)
+            return match.group(0)
+        return f"pl.{func}_parquet({parquet_path!r})"
+
+    return CSV_READ_PATTERN.sub(replace, polars_python_code)
+
+
+# Introspection reads the head of a CSV plus a strided sample instead of the whole file
+CSV_HEAD_BYTES = 64 * 1024
+CSV_STRIDE_SAMPLES = 16
+CSV_STRIDE_BYTES = 16 * 1024
+CSV_DELIMITERS = ",;\t|"
+
+
+def read_complete_lines(f: io.BufferedReader, size: int) -> bytes:
+    """Reads up to size bytes from f, dropping a trailing partial line."""
+    chunk = f.read(size)
+    if len(chunk) == size and b"\n" in chunk:
+        chunk = chunk[: chunk.rfind(b"\n") + 1]
+    return chunk
+
+
+def widen_dtype(head_dtype: pl.DataType, sample_dtype: pl.DataType) -> pl.DataType:
+    """Returns a dtype that holds values of both inferred dtypes."""
+    if head_dtype == sample_dtype:
+        return head_dtype
+    if head_dtype.is_numeric() and sample_dtype.is_numeric():
+        return pl.Float64 if head_dtype.is_float() or sample_dtype.is_float() else pl.Int64
+    return pl.String
+
+
+def detect_header(head: bytes, delimiter: str) -> bool:
+    """Returns whether the first line of a CSV is a header rather than data.
+
+    A header is assumed unless the first row parses as the same types as the
+    rows below it: with a header row of names, a numeric column reads as a
+    string when that row is treated as data. A file whose columns are all
+    strings can't be told apart this way and is taken to have a header.
+    """
+    try:
+        with_header = pl.read_csv(
+            head, separator=delimiter, has_header=True, infer_schema_length=None
+        )
+        without_header = pl.read_csv(
+            head, separator=delimiter, has_header=False, infer_schema_length=None
+        )
+    except Exception:
+        return True
+    if all(dtype == pl.String for dtype in with_header.dtypes):
+        return True
+    return with_header.dtypes != without_header.dtypes
+
+
+def introspect_csv(csv_path: str) -> Dict[str, Any]:
+    """Infers a CSV's delimiter, header, column types and first rows from a few reads.
+
+    The head of the file gives the delimiter, header and an initial schema. A
+    second pass parses lines at evenly spaced offsets through the file and
+    widens any column whose type doesn't hold there, so a column that turns
+    non-numeric deep into the file is reported as a string. Only
+    CSV_HEAD_BYTES plus CSV_STRIDE_SAMPLES * CSV_STRIDE_BYTES are read, however
+    large the file is.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        Dict with delimiter, has_header, schema (column name to dtype) and
+        head (a DataFrame of the rows in the head of the file)
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        head = read_complete_lines(f, CSV_HEAD_BYTES)
+        text = head.decode("utf-8", errors="replace")
+        try:
+            delimiter = csv.Sniffer().sniff(text, delimiters=CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+        has_header = detect_header(head, delimiter)
+        head_df = pl.read_csv(
+            head, separator=delimiter, has_header=has_header, infer_schema_length=None
+        )
+        schema = dict(head_df.schema)
+
+        chunks = []
+        if size > len(head):
+            for i in range(1, CSV_STRIDE_SAMPLES + 1):
+                f.seek(len(head) + (size - len(head)) * i // (CSV_STRIDE_SAMPLES + 1))
+                f.readline()  # skip the partial line the offset landed in
+                chunks.append(read_complete_lines(f, CSV_STRIDE_BYTES))
+
+    # A strided chunk can start inside a quoted multi-line field, in which case
+    # the head schema is kept as is
+    try:
+        sample_df = pl.read_csv(
+            b"".join(chunks),
+            separator=delimiter,
+            has_header=False,
+            infer_schema_length=None,
+        )
+        if chunks and sample_df.width == len(schema):
+            for name, column in zip(list(schema), sample_df.iter_columns()):
+                if column.null_count() < len(column):
+                    schema[name] = widen_dtype(schema[name], column.dtype)
+    except Exception:
+        pass
+
+    return {
+        "delimiter": delimiter,
+        "has_header": has_header,
+        "schema": schema,
+        "head": head_df,
+    }
+
+
+def csv_read_options(info: Dict[str, Any]) -> str:
+    """Returns the pl.scan_csv arguments a CSV needs beyond the defaults, if any."""
+    options = []
+    if info["delimiter"] != ",":
+        options.append(f"separator={info['delimiter']!r}")
+    if not info["has_header"]:
+        options.append("has_header=False")
+    return ", ".join(options)
+
+
 def list_columns(reasoning: str, csv_path: str) -> List[str]:
     """Returns a list of columns in the CSV file.
 
@@ -50,8 +429,10 @@ def list_columns(reasoning: str, csv_path: str) -> List[str]:
         # Returns: ['user_id', 'age', 'name', ...]
     """
     try:
-        df = pl.scan_csv(csv_path).collect()
-        columns = df.columns
+        # Always from introspection, so the names don't depend on whether the
+        # Parquet copy exists yet
+        schema = introspect_csv(csv_path)["schema"]
+        columns = list(schema)
         console.log(f"[blue]List Columns Tool[/blue] - Reasoning: {reasoning}")
         console.log(f"[dim]Columns: {columns}[/dim]")
         return columns
@@ -79,9 +460,16 @@ def sample_csv(reasoning: str, csv_path: str, row_count: int) -> str:
         # Returns formatted string with 3 rows of data
     """
     try:
-        df = pl.scan_csv(csv_path).limit(row_count).collect()
+        info = introspect_csv(csv_path)
+        if info["head"].height >= row_count:
+            df = info["head"].head(row_count)
+        else:
+            df = scan_source(csv_path).limit(row_count).collect()
         # Convert to string representation
         output = df.select(pl.all()).write_csv(None)
+        options = csv_read_options(info)
+        if options:
+            output = f"Note: read this file with pl.scan_csv(csv_path, {options})\n{output}"
         console.log(
             f"[blue]Sample CSV Tool[/blue] - Rows: {row_count} - Reasoning: {reasoning}"
         )
@@ -92,6 +480,567 @@ def sample_csv(reasoning: str, csv_path: str, row_count: int) -> str:
         return ""
 
 
+def compute_csv_profile(csv_path: str) -> Dict[str, Any]:
+    """Computes a column profile for a CSV file with Polars.
+
+    Null counts, approximate distinct counts and min/max for every column are
+    evaluated as one lazy select, so Polars computes them in a single parallel
+    scan; a second scan collects the top values of the categorical columns.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        Profile dict with row_count and a list of per-column statistics
+    """
+    lf = scan_source(csv_path)
+    schema = lf.collect_schema()
+    exprs = [pl.len().alias("rows")]
+    for i, name in enumerate(schema.names()):
+        exprs += [
+            pl.col(name).null_count().alias(f"{i}_nulls"),
+            pl.col(name).approx_n_unique().alias(f"{i}_distinct"),
+            pl.col(name).min().alias(f"{i}_min"),
+            pl.col(name).max().alias(f"{i}_max"),
+        ]
+    stats = lf.select(exprs).collect().row(0, named=True)
+    row_count = stats["rows"]
+
+    columns = [
+        {
+            "name": name,
+            "type": str(dtype),
+            "min": stats[f"{i}_min"],
+            "max": stats[f"{i}_max"],
+            "approx_distinct": stats[f"{i}_distinct"],
+            "null_fraction": stats[f"{i}_nulls"] / row_count if row_count else 0.0,
+        }
+        for i, (name, dtype) in enumerate(schema.items())
+    ]
+
+    categorical = [
+        column
+        for column, dtype in zip(columns, schema.dtypes())
+        if dtype in (pl.String, pl.Boolean)
+        and not is_identifier_like(column["approx_distinct"], row_count)
+    ]
+    if categorical:
+        top_values = (
+            lf.select(
+                pl.col(column["name"])
+                .drop_nulls()
+                .value_counts(sort=True)
+                .head(PROFILE_TOP_K)
+                .struct.field(column["name"])
+                .implode()
+                for column in categorical
+            )
+            .collect()
+            .row(0)
+        )
+        for column, values in zip(categorical, top_values):
+            column["top_values"] = values
+
+    return {"row_count": row_count, "columns": columns}
+
+
+def profile_csv(reasoning: str, csv_path: str) -> str:
+    """Returns per-column statistics for the CSV file.
+
+    The agent uses this to learn null rates, distinct counts, value ranges and the
+    most frequent values in one call instead of several samples and test runs.
+    Profiles are cached on disk until the CSV file changes.
+
+    Args:
+        reasoning: Explanation of why we're profiling this data
+        csv_path: Path to the CSV file
+
+    Returns:
+        String containing one summary line per column
+
+    Example:
+        profile = profile_csv("Find the valid status values", "data.csv")
+        # Returns: 'rows: 30\nstatus (String): nulls=0.0%, distinct~4, ...'
+    """
+    try:
+        fingerprint = file_fingerprint(csv_path)
+        profile = load_cached_profile(fingerprint)
+        cached = profile is not None
+        if not cached:
+            profile = compute_csv_profile(csv_path)
+            save_cached_profile(fingerprint, profile)
+        output = format_profile(profile)
+        console.log(
+            f"[blue]Profile CSV Tool[/blue] - Cached: {cached} - Reasoning: {reasoning}"
+        )
+        console.log(f"[dim]Profile:\n{output}[/dim]")
+        return output
+    except Exception as e:
+        console.log(f"[red]Error profiling CSV: {str(e)}[/red]")
+        return str(e)
+
+
+# Generated code runs in pre-warmed worker processes that have polars imported
+WORKER_POOL_SIZE = 2
+WORKER_MAX_JOBS = 50
+WORKER_MAX_RSS_MB = 2048
+WORKER_MEMORY_LIMIT_MB = None
+CODE_TIMEOUT_SECONDS = 300
+
+# A DataFrame assigned to RESULT_VARIABLE comes back as an Arrow IPC file in RESULT_DIR
+RESULT_VARIABLE = "result"
+RESULT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+RESULT_PREVIEW_ROWS = 10
+RESULT_PREVIEW_COLUMNS = 20
+
+WORKER_SOURCE = r"""
+import contextlib, io, json, os, resource, sys, tempfile, traceback
+import polars as pl
+
+# Replies go over a private copy of stdout and fd 1 is pointed at stderr, so
+# output written outside of Python can't corrupt the protocol
+channel = os.fdopen(os.dup(1), "w")
+os.dup2(2, 1)
+
+# An address space ceiling makes runaway jobs fail instead of exhausting the machine
+memory_limit_mb = int(sys.argv[1])
+if memory_limit_mb:
+    limit = memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def memory_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def write_result(frame, result_dir):
+    # The frame is written uncompressed so the parent can memory-map it
+    if isinstance(frame, pl.LazyFrame):
+        frame = frame.collect(engine="streaming")
+    if not isinstance(frame, pl.DataFrame):
+        return None
+    fd, path = tempfile.mkstemp(prefix="sfa_result_", suffix=".arrow", dir=result_dir)
+    os.close(fd)
+    frame.write_ipc(path)
+    return path
+
+
+def reset_peak():
+    # Writing 5 to clear_refs resets VmHWM, so each job reports its own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+channel.write("ready\n")
+channel.flush()
+for line in sys.stdin:
+    job = json.loads(line)
+    reset_peak()
+    output = io.StringIO()
+    namespace = {"__name__": "__main__"}
+    result_path = None
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            exec(compile(job["code"], job["filename"], "exec"), namespace)
+        except SystemExit:
+            pass
+        except BaseException:
+            traceback.print_exc()
+        try:
+            result_path = write_result(namespace.get(job["result_variable"]), job["result_dir"])
+        except BaseException:
+            traceback.print_exc()
+    pl.Config.restore_defaults()
+    reply = {
+        "output": output.getvalue(),
+        "result_path": result_path,
+        "peak_rss_mb": memory_mb("VmHWM:"),
+        "rss_mb": memory_mb("VmRSS:"),
+    }
+    channel.write(json.dumps(reply) + "\n")
+    channel.flush()
+"""
+
+
+class PolarsWorker:
+    """A Python process with polars already imported that executes submitted code.
+
+    Each job runs in a fresh namespace with stdout and stderr captured. Jobs are
+    sent as JSON lines on stdin and answered with one JSON line on stdout.
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", WORKER_SOURCE, str(WORKER_MEMORY_LIMIT_MB or 0)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self.jobs = 0
+        self.rss_mb = 0.0
+        self.ready = False
+
+    def read_line(self, timeout: float) -> str:
+        """Reads one line from the worker, raising TimeoutError after timeout seconds."""
+        readable, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not readable:
+            raise TimeoutError
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("worker process exited unexpectedly")
+        return line
+
+    def run(self, code: str, filename: str, timeout: float) -> Dict[str, Any]:
+        """Executes code in the worker and returns its output, peak RSS and result file."""
+        deadline = time.monotonic() + timeout
+        if not self.ready:
+            self.read_line(timeout)
+            self.ready = True
+        job = {
+            "code": code,
+            "filename": filename,
+            "result_variable": RESULT_VARIABLE,
+            "result_dir": RESULT_DIR,
+        }
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        result = json.loads(self.read_line(max(deadline - time.monotonic(), 0)))
+        self.jobs += 1
+        self.rss_mb = result["rss_mb"]
+        return result
+
+    def should_recycle(self) -> bool:
+        """Returns True once the worker has exited, run too many jobs or grown too large."""
+        return (
+            self.process.poll() is not None
+            or self.jobs >= WORKER_MAX_JOBS
+            or self.rss_mb >= WORKER_MAX_RSS_MB
+        )
+
+    def close(self) -> None:
+        self.process.kill()
+        self.process.wait()
+
+
+_worker_pool: Optional[queue.Queue] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> queue.Queue:
+    """Returns the queue of idle workers, starting WORKER_POOL_SIZE workers on first use."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = queue.Queue()
+            for _ in range(WORKER_POOL_SIZE):
+                _worker_pool.put(PolarsWorker())
+            atexit.register(shutdown_worker_pool)
+    return _worker_pool
+
+
+def shutdown_worker_pool() -> None:
+    """Stops every idle worker in the pool."""
+    while _worker_pool is not None and not _worker_pool.empty():
+        _worker_pool.get_nowait().close()
+
+
+def render_result_frame(result_path: str, output_file: Optional[str] = None) -> str:
+    """Renders a bounded preview of a result frame handed back by a worker.
+
+    polars memory-maps the uncompressed Arrow IPC file rather than copying it,
+    and the file is removed afterwards.
+
+    Args:
+        result_path: Arrow IPC file written by the worker
+        output_file: Optional path to write the full frame to, as Parquet or CSV
+
+    Returns:
+        The frame's shape and preview, and where the full frame was written
+    """
+    try:
+        frame = pl.read_ipc(result_path)
+        lines = [f"{RESULT_VARIABLE}: {frame.height} rows x {frame.width} columns"]
+        with pl.Config(
+            tbl_rows=RESULT_PREVIEW_ROWS,
+            tbl_cols=RESULT_PREVIEW_COLUMNS,
+            tbl_width_chars=1000,
+        ):
+            lines.append(str(frame.head(RESULT_PREVIEW_ROWS)))
+        if output_file:
+            if output_file.endswith(".parquet"):
+                frame.write_parquet(output_file)
+            else:
+                frame.write_csv(output_file)
+            lines.append(f"Full result written to {output_file}")
+        return "\n".join(lines)
+    finally:
+        os.remove(result_path)
+
+
+# Streaming mode keeps larger-than-memory CSVs out of RAM
+STREAMING_MODE = False
+STREAMING_INSTRUCTION = (
+    "The CSV may be larger than memory. Build a LazyFrame with pl.scan_csv and never load "
+    'the whole file eagerly (no pl.read_csv). End with .collect(engine="streaming") on a small, '
+    "aggregated or limited result, or write large results with .sink_parquet()/.sink_csv(). "
+    "Code that doesn't follow this is rejected before it runs."
+)
+EAGER_READERS = {"read_csv", "read_parquet", "read_ipc", "read_ndjson"}
+
+
+def check_streaming_code(polars_python_code: str) -> List[str]:
+    """Returns the reasons code can't run in streaming mode, or an empty list if it can.
+
+    Streaming code must read through scan_* functions and collect with the
+    streaming engine (or write with sink_*), so no step materializes the file.
+
+    Args:
+        polars_python_code: Generated Polars code
+
+    Returns:
+        One message per offending call
+    """
+    try:
+        tree = ast.parse(polars_python_code)
+    except SyntaxError as e:
+        return [f"line {e.lineno}: syntax error: {e.msg}"]
+    problems = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        attr = node.func.attr
+        if attr in EAGER_READERS:
+            problems.append(
+                f"line {node.lineno}: {attr}() loads the whole file, use scan_{attr[5:]}() instead"
+            )
+        elif attr == "collect" and not any(
+            keyword.arg == "engine"
+            and isinstance(keyword.value, ast.Constant)
+            and keyword.value.value == "streaming"
+            for keyword in node.keywords
+        ):
+            if not (isinstance(node.func.value, ast.Name) and node.func.value.id == "gc"):
+                problems.append(
+                    f'line {node.lineno}: collect() must use engine="streaming"'
+                )
+    return problems
+
+
+# Static analysis runs before generated code is sent to a worker
+SCAN_CSV_PARAMETERS = set(inspect.signature(pl.scan_csv).parameters)
+LAZY_CHAIN_METHODS = {
+    "filter",
+    "select",
+    "with_columns",
+    "group_by",
+    "agg",
+    "sort",
+    "head",
+    "limit",
+    "tail",
+    "unique",
+    "drop",
+    "rename",
+    "drop_nulls",
+    "fill_null",
+    "with_row_index",
+    "explode",
+    "unpivot",
+}
+
+
+def eager_read_chain(node: ast.Call) -> Optional[ast.Call]:
+    """Returns the pl.read_csv call at the root of node's method chain if the chain can run lazily.
+
+    A chain qualifies when every method also exists on LazyFrame, it doesn't
+    end in group_by, and read_csv is only given arguments scan_csv accepts.
+    """
+    methods = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        func = node.func
+        if func.attr == "read_csv" and isinstance(func.value, ast.Name) and func.value.id == "pl":
+            break
+        methods.append(func.attr)
+        node = func.value
+    else:
+        return None
+    if not methods or methods[0] == "group_by" or not set(methods) <= LAZY_CHAIN_METHODS:
+        return None
+    if len(node.args) > 1 or any(kw.arg not in SCAN_CSV_PARAMETERS for kw in node.keywords):
+        return None
+    return node
+
+
+def apply_source_edits(source: str, edits: List[Tuple[int, int, int, str]]) -> str:
+    """Replaces (line, start column, end column, text) spans in source, keeping line numbers."""
+    lines = source.splitlines(keepends=True)
+    for lineno, start, end, text in sorted(edits, reverse=True):
+        # ast column offsets count UTF-8 bytes
+        line = lines[lineno - 1].encode()
+        lines[lineno - 1] = (line[:start] + text.encode() + line[end:]).decode()
+    return "".join(lines)
+
+
+def analyze_polars_code(polars_python_code: str) -> Tuple[str, List[str], List[str]]:
+    """Checks generated code before it runs, rewriting slow patterns where that is safe.
+
+    Code that can't run (syntax errors, missing modules, polars functions that
+    don't exist, APIs removed in polars 1.0) is rejected so the model gets the
+    diagnostic without an execution round-trip. pl.read_csv(...) chains made of
+    lazy-compatible methods are rewritten to pl.scan_csv(...)...collect() so
+    projections and filters are pushed into the scan. Other slow patterns, such
+    as per-row Python functions, are reported as notes.
+
+    Args:
+        polars_python_code: Generated Polars code
+
+    Returns:
+        The possibly rewritten code, errors that block execution, and notes
+    """
+    try:
+        tree = ast.parse(polars_python_code)
+    except SyntaxError as e:
+        return polars_python_code, [f"line {e.lineno}: syntax error: {e.msg}"], []
+
+    errors, notes, edits = [], [], []
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            imports.add(node.module.split(".")[0])
+    for module in sorted(imports):
+        if importlib.util.find_spec(module) is None:
+            errors.append(f"module '{module}' is not installed")
+
+    collect = '.collect(engine="streaming")' if STREAMING_MODE else ".collect()"
+    rewritten = set()
+    # ast.walk visits outer calls first, so each chain is rewritten from its outermost call
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == "pl"
+            and not hasattr(pl, node.attr)
+        ):
+            errors.append(f"line {node.lineno}: pl.{node.attr} does not exist")
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        attr = node.func.attr
+        root = eager_read_chain(node)
+        if root is not None and id(root) not in rewritten:
+            rewritten.add(id(root))
+            end = root.func.end_col_offset
+            edits.append((root.func.end_lineno, end - len("read_csv"), end, "scan_csv"))
+            edits.append((node.end_lineno, node.end_col_offset, node.end_col_offset, collect))
+            notes.append(
+                f"line {node.lineno}: rewrote the pl.read_csv(...) chain to pl.scan_csv(...){collect} "
+                "so polars only reads the rows and columns it needs"
+            )
+        elif attr == "read_csv" and id(node) not in rewritten:
+            notes.append(
+                f"line {node.lineno}: pl.read_csv() loads every row and column, "
+                "pl.scan_csv(...) with a .collect() at the end lets polars skip unused data"
+            )
+        elif attr == "apply" and "pandas" not in imports:
+            errors.append(
+                f"line {node.lineno}: apply() was removed in polars 1.0, use native expressions "
+                "(or map_elements as a last resort)"
+            )
+        elif attr in ("map_elements", "map_rows"):
+            notes.append(
+                f"line {node.lineno}: {attr}() calls Python once per value, native expressions "
+                "(arithmetic, pl.when, .str, .dt) are much faster"
+            )
+        elif attr == "iter_rows":
+            notes.append(
+                f"line {node.lineno}: iter_rows() loops over rows in Python, "
+                "use expressions or group_by instead"
+            )
+        elif attr == "to_pandas" and (
+            importlib.util.find_spec("pandas") is None
+            or importlib.util.find_spec("pyarrow") is None
+        ):
+            errors.append(
+                f"line {node.lineno}: to_pandas() needs pandas and pyarrow, which are not installed, stay in polars"
+            )
+
+    return apply_source_edits(polars_python_code, edits), errors, notes
+
+
+def run_polars_code(
+    polars_python_code: str, filename: str, output_file: Optional[str] = None
+) -> str:
+    """Runs code on a pooled worker and returns its output, result frame and peak memory.
+
+    The code is statically analyzed first and rejected if it can't run, or in
+    streaming mode if it would load the CSV into memory. Plain CSV reads are
+    pointed at the cached Parquet copy.
+    Workers that time out or crash are replaced. Workers are also recycled
+    after WORKER_MAX_JOBS jobs or once their RSS reaches WORKER_MAX_RSS_MB.
+
+    Args:
+        polars_python_code: The Python code to execute
+        filename: Name shown in tracebacks for the code
+        output_file: Optional path to write the code's result frame to
+
+    Returns:
+        Analysis notes, the code's combined stdout and stderr, a preview of its
+        result frame and its peak RSS, or an error message if it was rejected,
+        timed out or crashed
+    """
+    polars_python_code, errors, notes = analyze_polars_code(polars_python_code)
+    if errors:
+        console.log(f"[yellow]Code rejected by static analysis: {errors}[/yellow]")
+        return "Error: code was not run:\n" + "\n".join(f"- {error}" for error in errors)
+    notes = "".join(f"Note: {note}\n" for note in notes)
+    if notes:
+        console.log(f"[dim]{notes}[/dim]")
+    if STREAMING_MODE:
+        problems = check_streaming_code(polars_python_code)
+        if problems:
+            return (
+                "Error: code was not run because streaming mode requires lazy, streaming execution:\n"
+                + "\n".join(f"- {problem}" for problem in problems)
+            )
+    pool = get_worker_pool()
+    worker = pool.get()
+    try:
+        result = worker.run(
+            use_columnar_cache(polars_python_code), filename, CODE_TIMEOUT_SECONDS
+        )
+        output = result["output"]
+        if result["result_path"]:
+            output += render_result_frame(result["result_path"], output_file) + "\n"
+        console.log(f"[dim]Peak memory: {result['peak_rss_mb']:.0f} MB[/dim]")
+        return f"{notes}{output}\nPeak memory: {result['peak_rss_mb']:.0f} MB"
+    except TimeoutError:
+        worker.close()
+        return f"Error: code did not finish within {CODE_TIMEOUT_SECONDS} seconds and was stopped"
+    except RuntimeError as e:
+        worker.close()
+        if WORKER_MEMORY_LIMIT_MB:
+            return f"Error: {str(e)}, possibly by exceeding the {WORKER_MEMORY_LIMIT_MB} MB memory limit"
+        return f"Error: {str(e)}"
+    finally:
+        if worker.should_recycle():
+            worker.close()
+            worker = PolarsWorker()
+        pool.put(worker)
+
+
 def run_test_polars_code(reasoning: str, polars_python_code: str, csv_path: str) -> str:
     """Executes test Polars Python code and returns results.
 
@@ -108,24 +1057,7 @@ def run_test_polars_code(reasoning: str, polars_python_code: str, csv_path: str)
         Code execution results as a string
     """
     try:
-        # Create a unique filename based on timestamp
-        timestamp = int(time.time())
-        filename = f"test_polars_{timestamp}.py"
-
-        # Write code to a real file
-        with open(filename, "w") as f:
-            f.write(polars_python_code)
-
-        # Execute the code
-        result = subprocess.run(
-            ["uv", "run", "--with", "polars", filename],
-            text=True,
-            capture_output=True,
-        )
-        output = result.stdout + result.stderr
-
-        # Clean up the file
-        os.remove(filename)
+        output = run_polars_code(polars_python_code, "<test_polars_code>")
 
         console.log(f"[blue]Test Code Tool[/blue] - Reasoning: {reasoning}")
         console.log(f"[dim]Code:\n{polars_python_code}[/dim]")
@@ -157,24 +1089,9 @@ def run_final_polars_code(
         Code execution results as a string
     """
     try:
-        # Create a unique filename based on timestamp
-        timestamp = int(time.time())
-        filename = f"polars_code_{timestamp}.py"
-
-        # Write code to a real file
-        with open(filename, "w") as f:
-            f.write(polars_python_code)
-
-        # Execute the code
-        result = subprocess.run(
-            ["uv", "run", "--with", "polars", filename],
-            text=True,
-            capture_output=True,
+        output = run_polars_code(
+            polars_python_code, "<final_polars_code>", output_file
         )
-        output = result.stdout + result.stderr
-
-        # Clean up the file
-        os.remove(filename)
 
         console.log(Panel(f"[green]Final Code Tool[/green]\nReasoning: {reasoning}\n"))
         console.log(f"[dim]Code:\n{polars_python_code}[/dim]")
@@ -226,6 +1143,24 @@ TOOLS = [
             "required": ["reasoning", "csv_path", "row_count"],
         },
     },
+    {
+        "name": "profile_csv",
+        "description": "Returns per-column null rates, distinct counts, min/max and top values in the CSV file",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "reasoning": {
+                    "type": "string",
+                    "description": "Why we need to profile this data",
+                },
+                "csv_path": {
+                    "type": "string",
+                    "description": "Path to the CSV file",
+                },
+            },
+            "required": ["reasoning", "csv_path"],
+        },
+    },
     {
         "name": "run_test_polars_code",
         "description": "Tests Polars Python code and returns results (only visible to agent)",
@@ -283,8 +1218,9 @@ Your goal is to generate accurate code that exactly matches the user's data anal
 Use the provided tools to explore the CSV data and construct the perfect Polars transformation:
 1. Start by listing columns to understand what's available in the CSV.
 2. Sample the CSV to see actual data patterns.
-3. Test Polars code with run_test_polars_code before finalizing it. Run the run_test_polars_code tool as many times as needed to get the code working.
-4. Only call run_final_polars_code when you're confident the code is perfect.
+3. Profile the CSV to learn null rates, distinct counts, value ranges and top values in a single call instead of running several exploratory test scripts.
+4. Test Polars code with run_test_polars_code before finalizing it. Run the run_test_polars_code tool as many times as needed to get the code working.
+5. Only call run_final_polars_code when you're confident the code is perfect.
 
 If you find your run_test_polars_code tool call returns an error or won't satisfy the user request, try to fix the code or try a different approach.
 Think step by step about what information you need.
@@ -293,9 +1229,10 @@ Be sure to specify every parameter for each tool call, and every tool call shoul
 
 When using run_test_polars_code, make sure to test edge cases and validate data types.
 If saving results to a file, add file writing code to the end of your polars_python_code variable (df.write_csv(output_file)).
+To return a table, assign the final DataFrame or LazyFrame to a variable named result instead of printing it. The tool shows a bounded preview, and run_final_polars_code writes the full frame to output_file (.parquet or .csv) when one is given.
 
 Your code should use DataFrame to immediately operate on the data.
-Your polars_python_code variable should be a complete python script that can be run with uv run --with polars. Read the code in the csv_file_path, operate on the data as requested, and print the results.
+Your polars_python_code variable should be a complete python script. It runs in a pre-warmed worker process that already has polars loaded, so import polars as pl is instant, but each run starts from a fresh namespace and nothing carries over between runs. Only installed modules can be imported and nothing can be installed. A run is stopped after {{code_timeout_seconds}} seconds{{worker_memory_limit}}. Read the data in the csv_file_path, operate on the data as requested, and print the results.
 
 User request: {{user_request}}
 CSV file path: {{csv_file_path}}
@@ -314,6 +1251,29 @@ def main():
         default=10,
         help="Maximum number of agent loops (default: 10)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of pre-warmed Python workers that run generated code (default: 2)",
+    )
+    parser.add_argument(
+        "--code-timeout",
+        type=int,
+        default=300,
+        help="Time limit in seconds for each code execution (default: 300)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Require lazy code that runs on the streaming engine, for CSVs larger than memory",
+    )
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=int,
+        default=None,
+        help="Memory ceiling in MB for each code worker (default: no limit)",
+    )
     args = parser.parse_args()
 
     # Configure the API key
@@ -330,10 +1290,33 @@ def main():
 
     client = Anthropic(api_key=ANTHROPIC_API_KEY)
 
+    # Start the code workers now so polars is imported while the model is thinking
+    global WORKER_POOL_SIZE, CODE_TIMEOUT_SECONDS, WORKER_MEMORY_LIMIT_MB, STREAMING_MODE
+    WORKER_POOL_SIZE = args.workers
+    CODE_TIMEOUT_SECONDS = args.code_timeout
+    WORKER_MEMORY_LIMIT_MB = args.memory_limit_mb
+    STREAMING_MODE = args.streaming
+    get_worker_pool()
+
+    # Convert the CSV to Parquet in the background so test code can read the cached copy
+    start_columnar_cache(args.input)
+
     # Create a single combined prompt based on the full template
     completed_prompt = AGENT_PROMPT.replace("{{user_request}}", args.prompt).replace(
         "{{csv_file_path}}", args.input
     )
+    completed_prompt = completed_prompt.replace(
+        "{{code_timeout_seconds}}", str(CODE_TIMEOUT_SECONDS)
+    ).replace(
+        "{{worker_memory_limit}}",
+        f" or when it uses more than {WORKER_MEMORY_LIMIT_MB} MB of memory"
+        if WORKER_MEMORY_LIMIT_MB
+        else "",
+    )
+    if STREAMING_MODE:
+        completed_prompt = completed_prompt.replace(
+            "User request:", f"{STREAMING_INSTRUCTION}\n\nUser request:"
+        )
     
     # Initialize messages with proper typing for Anthropic chat
     messages = [{"role": "user", "content": completed_prompt}]
@@ -428,6 +1411,11 @@ def main():
                                 csv_path=tool_input["csv_path"],
                                 row_count=tool_input["row_count"],
                             )
+                        elif tool_name == "profile_csv":
+                            result = profile_csv(
+                                reasoning=tool_input["reasoning"],
+                                csv_path=tool_input["csv_path"],
+                            )
                         elif tool_name == "run_test_polars_code":
                             result = run_test_polars_code(
                                 reasoning=tool_input["reasoning"],
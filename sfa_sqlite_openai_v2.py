@@ -10,10 +10,17 @@
 import os
 import sys
 import json
+import re
 import argparse
+import hashlib
+import queue
 import sqlite3
 import subprocess
-from typing import List
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 from rich.console import Console
 from rich.panel import Panel
 import openai
@@ -44,11 +51,23 @@ class SampleTableArgs(BaseModel):
     )
 
 
+class ProfileTableArgs(BaseModel):
+    reasoning: str = Field(..., description="Explanation for profiling the table")
+    table_name: str = Field(..., description="Name of the table to profile")
+
+
 class RunTestSQLQuery(BaseModel):
     reasoning: str = Field(..., description="Reason for testing this query")
     sql_query: str = Field(..., description="The SQL query to test")
 
 
+class RunTestSQLQueries(BaseModel):
+    reasoning: str = Field(..., description="Reason for comparing these queries")
+    sql_queries: List[str] = Field(
+        ..., description="Alternative SELECT queries to run and compare"
+    )
+
+
 class RunFinalSQLQuery(BaseModel):
     reasoning: str = Field(
         ...,
@@ -57,12 +76,17 @@ class RunFinalSQLQuery(BaseModel):
     sql_query: str = Field(..., description="The validated SQL query to run")
 
 
+# Maximum number of tool calls from one model turn executed at the same time
+MAX_PARALLEL_TOOL_CALLS = 8
+
 # Create tools list
 tools = [
     pydantic_function_tool(ListTablesArgs),
     pydantic_function_tool(DescribeTableArgs),
     pydantic_function_tool(SampleTableArgs),
+    pydantic_function_tool(ProfileTableArgs),
     pydantic_function_tool(RunTestSQLQuery),
+    pydantic_function_tool(RunTestSQLQueries),
     pydantic_function_tool(RunFinalSQLQuery),
 ]
 
@@ -76,10 +100,14 @@ AGENT_PROMPT = """<purpose>
     <instruction>Start by listing tables to understand what's available.</instruction>
     <instruction>Describe tables to understand their schema and columns.</instruction>
     <instruction>Sample tables to see actual data patterns.</instruction>
+    <instruction>Profile tables to learn null rates, distinct counts, value ranges and top values in a single call instead of running several exploratory queries.</instruction>
     <instruction>Test queries before finalizing them.</instruction>
+    <instruction>When you have several candidate formulations, compare them in a single run_test_sql_queries call and pick the fastest one that returns the right data.</instruction>
     <instruction>Only call run_final_sql_query when you're confident the query is perfect.</instruction>
     <instruction>Be thorough but efficient with tool usage.</instruction>
     <instruction>If you find your run_test_sql_query tool call returns an error or won't satisfy the user request, try to fix the query or try a different query.</instruction>
+    <instruction>The database is opened read-only, so only run queries that read data.</instruction>
+    <instruction>Queries are cancelled after a time limit; if a tool call returns a timeout error, revise the query to scan less data instead of retrying it unchanged.</instruction>
     <instruction>Think step by step about what information you need.</instruction>
     <instruction>Be sure to specify every parameter for each tool call.</instruction>
     <instruction>Every tool call should have a reasoning parameter which gives you a place to explain why you are calling the tool.</instruction>
@@ -143,6 +171,25 @@ AGENT_PROMPT = """<purpose>
         </parameters>
     </tool>
     
+    <tool>
+        <name>profile_table</name>
+        <description>Returns per-column null rates, distinct counts, min/max and top values for specified table</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Why we need to profile this table</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>table_name</name>
+                <type>string</type>
+                <description>Name of table to profile</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+    
     <tool>
         <name>run_test_sql_query</name>
         <description>Tests a SQL query and returns results (only visible to agent)</description>
@@ -162,6 +209,25 @@ AGENT_PROMPT = """<purpose>
         </parameters>
     </tool>
     
+    <tool>
+        <name>run_test_sql_queries</name>
+        <description>Runs several alternative SQL queries concurrently and returns per-query timing, row counts and previews (only visible to agent)</description>
+        <parameters>
+            <parameter>
+                <name>reasoning</name>
+                <type>string</type>
+                <description>Why we're comparing these queries</description>
+                <required>true</required>
+            </parameter>
+            <parameter>
+                <name>sql_queries</name>
+                <type>array of strings</type>
+                <description>Alternative SELECT queries to compare</description>
+                <required>true</required>
+            </parameter>
+        </parameters>
+    </tool>
+    
     <tool>
         <name>run_final_sql_query</name>
         <description>Runs the final validated SQL query and shows results to user</description>
@@ -188,6 +254,381 @@ AGENT_PROMPT = """<purpose>
 """
 
 
+# Guardrails for agent-issued SQL (overridable from the command line)
+QUERY_TIMEOUT_MS = 30000
+# Number of SQLite VM instructions between deadline checks
+PROGRESS_HANDLER_STEPS = 100000
+
+# Tuning for the shared read-only connection
+SQLITE_MMAP_SIZE = 1 << 30  # bytes of the database file to memory-map
+SQLITE_CACHE_SIZE_KIB = 256 * 1024  # page cache size
+SQLITE_CACHED_STATEMENTS = 256  # prepared statements kept per connection
+
+_connection = None
+# Guards the shared connection; parallel tool calls run on worker threads
+_connection_lock = threading.RLock()
+# Idle read-only connections for evaluating candidate queries concurrently
+_candidate_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+
+
+def open_connection() -> sqlite3.Connection:
+    """Opens a tuned read-only connection to DB_PATH.
+
+    Returns:
+        A new SQLite connection that may be used from any thread
+    """
+    uri = f"{Path(DB_PATH).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        check_same_thread=False,
+        cached_statements=SQLITE_CACHED_STATEMENTS,
+    )
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE};")
+    conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KIB};")
+    conn.execute("PRAGMA query_only = ON;")
+    # temp_store stays at its default: an in-memory temp store measured
+    # slower for GROUP BY/ORDER BY sorters on large tables
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the shared read-only SQLite connection, opening it on first use.
+
+    Reusing one connection keeps the page cache, memory map and prepared statement
+    cache warm across tool calls instead of rebuilding them on every connect.
+    Callers must hold _connection_lock while using the connection.
+
+    Returns:
+        The SQLite connection for DB_PATH
+    """
+    global _connection
+    if _connection is None:
+        _connection = open_connection()
+    return _connection
+
+
+def execute_sql(sql_query: str, timeout_ms: Optional[int] = None) -> str:
+    """Executes a SQL query and renders the result rows, aborting it after timeout_ms.
+
+    A progress handler checks the deadline every PROGRESS_HANDLER_STEPS virtual
+    machine instructions and aborts the statement once it has passed, so a bad
+    cross join can't stall the agent.
+
+    Args:
+        sql_query: The SQL query to execute
+        timeout_ms: Time limit in milliseconds (defaults to QUERY_TIMEOUT_MS)
+
+    Returns:
+        The result rows as a string, or a JSON timeout payload the model can act on
+    """
+    timeout_ms = timeout_ms or QUERY_TIMEOUT_MS
+    with _connection_lock:
+        conn = get_connection()
+        deadline = time.monotonic() + timeout_ms / 1000
+        # A truthy return value from the handler interrupts the running statement
+        conn.set_progress_handler(
+            lambda: time.monotonic() > deadline, PROGRESS_HANDLER_STEPS
+        )
+        try:
+            rows = conn.execute(sql_query).fetchall()
+        except sqlite3.OperationalError:
+            if time.monotonic() <= deadline:
+                raise
+            console.log(f"[yellow]Query timed out after {timeout_ms} ms[/yellow]")
+            return json.dumps(
+                {
+                    "error": "timeout",
+                    "message": f"Query timed out after {timeout_ms} ms and was cancelled. "
+                    "Revise the query to scan less data (add filters, avoid cross joins, aggregate earlier).",
+                    "timeout_ms": timeout_ms,
+                }
+            )
+        finally:
+            conn.set_progress_handler(None, 0)
+    return "\n".join([str(row) for row in rows])
+
+
+# Temp index advisor: test queries that scan tables with at least
+# ADVISOR_MIN_ROWS rows get session-scoped indexes on their filter/join columns
+ADVISOR_MIN_ROWS = 100_000
+ADVISOR_BUDGET_BYTES = 512 * 1024 * 1024  # data copied into TEMP shadow tables
+ADVISOR_MAX_INDEXES_PER_TABLE = 4
+
+_table_rows: Dict[str, int] = {}
+_temp_indexes: Dict[str, List[str]] = {}
+_temp_bytes_used = 0
+
+_TABLE_REF_PATTERN = re.compile(
+    r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.IGNORECASE
+)
+_PREDICATE_PATTERN = re.compile(
+    r'(?:"?(\w+)"?\.)?"?(\w+)"?\s*(?:[=<>!]=?|<>|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)'
+    r'|(?:[=<>]|<>|!=)\s*(?:"?(\w+)"?\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+_SQL_KEYWORDS = {
+    "where", "on", "join", "left", "right", "inner", "outer", "cross", "natural",
+    "group", "order", "limit", "using", "union", "having", "window", "except",
+    "intersect", "full",
+}
+
+
+def query_plan(conn: sqlite3.Connection, sql_query: str) -> List[str]:
+    """Returns the detail lines of EXPLAIN QUERY PLAN for a query."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql_query}")]
+
+
+def table_aliases(sql_query: str, tables: List[str]) -> Dict[str, str]:
+    """Maps every name a query uses for a table (its name or alias) to the table."""
+    known = {table.lower(): table for table in tables}
+    aliases = {}
+    for table, alias in _TABLE_REF_PATTERN.findall(sql_query):
+        if table.lower() not in known:
+            continue
+        aliases[table.lower()] = known[table.lower()]
+        if alias and alias.lower() not in _SQL_KEYWORDS:
+            aliases[alias.lower()] = known[table.lower()]
+    return aliases
+
+
+def predicate_columns(
+    sql_query: str, table: str, columns: List[str], aliases: Dict[str, str]
+) -> List[str]:
+    """Returns the columns of table that the query compares in filters or joins."""
+    by_name = {column.lower(): column for column in columns}
+    found = []
+    for match in _PREDICATE_PATTERN.finditer(sql_query):
+        if match.group(2):
+            qualifier, name = match.group(1), match.group(2)
+        else:
+            qualifier, name = match.group(3), match.group(4)
+        column = by_name.get((name or "").lower())
+        if not column or column in found:
+            continue
+        if qualifier and aliases.get(qualifier.lower()) != table:
+            continue
+        found.append(column)
+    return found
+
+
+def quote_identifier(name: str) -> str:
+    """Quotes a table or column name for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Returns the column names of a table in the main database."""
+    return [row[1] for row in conn.execute(f"PRAGMA main.table_info({quote_identifier(table)});")]
+
+
+def shadow_table(conn: sqlite3.Connection, table: str) -> bool:
+    """Copies a table into a TEMP table of the same name so it can be indexed.
+
+    SQLite only allows indexes in the schema of their table and the database is
+    read-only, so the copy lives in the temp schema, where unqualified names
+    resolve first. Copies are limited to ADVISOR_BUDGET_BYTES per session.
+
+    Returns:
+        True if the table is shadowed, False if it doesn't fit the budget
+    """
+    global _temp_bytes_used
+    if table in _temp_indexes:
+        return True
+    lengths = " + ".join(
+        f"IFNULL(LENGTH({quote_identifier(column)}), 0)"
+        for column in table_columns(conn, table)
+    )
+    row_bytes = conn.execute(
+        f"SELECT AVG({lengths}) FROM (SELECT * FROM main.{quote_identifier(table)} LIMIT 1000);"
+    ).fetchone()[0] or 0
+    estimated_bytes = int(row_bytes * _table_rows[table])
+    if _temp_bytes_used + estimated_bytes > ADVISOR_BUDGET_BYTES:
+        return False
+    ddl = conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type='table' AND name=?;", (table,)
+    ).fetchone()[0]
+    conn.execute(re.sub(r"^\s*CREATE\s+TABLE", "CREATE TEMP TABLE", ddl, flags=re.IGNORECASE))
+    conn.execute(
+        f"INSERT INTO temp.{quote_identifier(table)} SELECT * FROM main.{quote_identifier(table)};"
+    )
+    _temp_bytes_used += estimated_bytes
+    _temp_indexes[table] = []
+    return True
+
+
+def advise_temp_indexes(sql_query: str) -> str:
+    """Creates session-scoped indexes for large tables a test query scans.
+
+    Inspects EXPLAIN QUERY PLAN for full scans (and per-query automatic indexes)
+    of tables with at least ADVISOR_MIN_ROWS rows, then indexes the columns the
+    query filters or joins on. Indexes persist for the session, so repeated test
+    queries get progressively faster. Counting, copying and indexing share one
+    QUERY_TIMEOUT_MS deadline, enforced by the same progress handler as
+    execute_sql, so the advisor can't hold the shared connection indefinitely.
+
+    Args:
+        sql_query: The SQL query about to be tested
+
+    Returns:
+        A report of created indexes and the plan change, or "" if nothing changed
+    """
+    with _connection_lock:
+        conn = get_connection()
+        try:
+            plan_before = query_plan(conn, sql_query)
+        except sqlite3.Error:
+            return ""  # Invalid queries are reported by the query execution
+
+        tables = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM main.sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';"
+            )
+        ]
+        aliases = table_aliases(sql_query, tables)
+        scanned = []
+        for detail in plan_before:
+            words = detail.split()
+            if len(words) < 2 or words[0] not in ("SCAN", "SEARCH"):
+                continue
+            if words[0] == "SEARCH" and "AUTOMATIC" not in detail:
+                continue
+            if words[0] == "SCAN" and "USING" in detail:
+                continue
+            table = aliases.get(words[1].lower())
+            if table and table not in scanned:
+                scanned.append(table)
+
+        notes = []
+        deadline = time.monotonic() + QUERY_TIMEOUT_MS / 1000
+        conn.execute("PRAGMA query_only = OFF;")
+        conn.set_progress_handler(
+            lambda: time.monotonic() > deadline, PROGRESS_HANDLER_STEPS
+        )
+        try:
+            for table in scanned:
+                try:
+                    if table not in _table_rows:
+                        _table_rows[table] = conn.execute(
+                            f"SELECT COUNT(*) FROM main.{quote_identifier(table)};"
+                        ).fetchone()[0]
+                    if _table_rows[table] < ADVISOR_MIN_ROWS:
+                        continue
+                    columns = predicate_columns(
+                        sql_query, table, table_columns(conn, table), aliases
+                    )
+                    missing = [c for c in columns if c not in _temp_indexes.get(table, [])]
+                    if not missing:
+                        continue
+                    if not shadow_table(conn, table):
+                        notes.append(
+                            f"{table}: full scan of {_table_rows[table]:,} rows, too large for the temp index budget"
+                        )
+                        continue
+                    for column in missing:
+                        if len(_temp_indexes[table]) >= ADVISOR_MAX_INDEXES_PER_TABLE:
+                            break
+                        conn.execute(
+                            f"CREATE INDEX temp.{quote_identifier(f'sfa_{table}_{column}')} "
+                            f"ON {quote_identifier(table)}({quote_identifier(column)});"
+                        )
+                        _temp_indexes[table].append(column)
+                        notes.append(f"created temp index on {table}({column})")
+                except sqlite3.OperationalError:
+                    if time.monotonic() <= deadline:
+                        raise
+                    conn.set_progress_handler(None, 0)
+                    # A copy cut short would shadow the real table with partial rows
+                    if table not in _temp_indexes:
+                        conn.execute(f"DROP TABLE IF EXISTS temp.{quote_identifier(table)};")
+                    console.log(f"[yellow]Index advisor timed out after {QUERY_TIMEOUT_MS} ms[/yellow]")
+                    notes.append(
+                        f"{table}: timed out after {QUERY_TIMEOUT_MS} ms, remaining indexes skipped"
+                    )
+                    break
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.execute("PRAGMA query_only = ON;")
+
+        if not notes:
+            return ""
+        plan_after = query_plan(conn, sql_query)
+
+    console.log(f"[blue]Index Advisor[/blue] - {'; '.join(notes)}")
+    return (
+        "Index advisor: "
+        + "; ".join(notes)
+        + f"\nPlan before: {' | '.join(plan_before)}"
+        + f"\nPlan after: {' | '.join(plan_after)}"
+    )
+
+
+# Column profiles are cached on disk, keyed by the data file's fingerprint
+PROFILE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sfa", "profiles")
+PROFILE_TOP_K = 5
+
+
+def file_fingerprint(path: str, *parts: str) -> str:
+    """Returns a key that changes whenever the file at path is rewritten.
+
+    Args:
+        path: Path to the data file
+        *parts: Extra key parts, such as a table name
+
+    Returns:
+        Hex digest of the absolute path, size, modification time and parts
+    """
+    stat = os.stat(path)
+    key = "|".join(
+        [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), *parts]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_cached_profile(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Returns the cached profile for fingerprint, or None if there is none."""
+    try:
+        with open(os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_profile(fingerprint: str, profile: Dict[str, Any]) -> None:
+    """Writes a profile to the cache, replacing any previous entry atomically."""
+    os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_CACHE_DIR, f"{fingerprint}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Renders a profile as one compact line per column for the model."""
+    lines = [f"rows: {profile['row_count']}"]
+    for column in profile["columns"]:
+        line = (
+            f"{column['name']} ({column['type']}): "
+            f"nulls={column['null_fraction']:.1%}, "
+            f"distinct~{column['approx_distinct']}, "
+            f"min={column['min']}, max={column['max']}"
+        )
+        if column.get("top_values"):
+            line += f", top={column['top_values']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def is_identifier_like(approx_distinct: int, row_count: int) -> bool:
+    """Returns True for columns where nearly every value is unique (ids, uuids).
+
+    Top values carry no information for these, so profiling skips them.
+    """
+    return row_count > 0 and approx_distinct >= row_count * 0.9
+
+
 def list_tables(reasoning: str) -> List[str]:
     """Returns a list of tables in the database.
 
@@ -200,11 +641,9 @@ def list_tables(reasoning: str) -> List[str]:
         List of table names as strings
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-        tables = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with _connection_lock:
+            cursor = get_connection().execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+            tables = [row[0] for row in cursor.fetchall()]
         console.log(f"[blue]List Tables Tool[/blue] - Reasoning: {reasoning}")
         return tables
     except Exception as e:
@@ -225,11 +664,8 @@ def describe_table(reasoning: str, table_name: str) -> str:
         String containing table schema information
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info('{table_name}');")
-        rows = cursor.fetchall()
-        conn.close()
+        with _connection_lock:
+            rows = get_connection().execute(f"PRAGMA table_info('{table_name}');").fetchall()
         output = "\n".join([str(row) for row in rows])
         console.log(f"[blue]Describe Table Tool[/blue] - Table: {table_name} - Reasoning: {reasoning}")
         return output
@@ -252,12 +688,7 @@ def sample_table(reasoning: str, table_name: str, row_sample_size: int) -> str:
         String containing sample rows in readable format
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table_name} LIMIT {row_sample_size};")
-        rows = cursor.fetchall()
-        conn.close()
-        output = "\n".join([str(row) for row in rows])
+        output = execute_sql(f"SELECT * FROM {table_name} LIMIT {row_sample_size};")
         console.log(
             f"[blue]Sample Table Tool[/blue] - Table: {table_name} - Rows: {row_sample_size} - Reasoning: {reasoning}"
         )
@@ -267,6 +698,95 @@ def sample_table(reasoning: str, table_name: str, row_sample_size: int) -> str:
         return ""
 
 
+def compute_table_profile(table_name: str) -> Dict[str, Any]:
+    """Computes a column profile for a table.
+
+    Null counts, distinct counts and min/max for every column are gathered in a
+    single aggregate scan; top values are then collected for the text columns.
+
+    Args:
+        table_name: Name of table to profile
+
+    Returns:
+        Profile dict with row_count and a list of per-column statistics
+    """
+    with _connection_lock:
+        conn = get_connection()
+        table_info = conn.execute(f"PRAGMA table_info('{table_name}');").fetchall()
+        aggregates = ["COUNT(*)"]
+        for column in table_info:
+            quoted = '"' + column[1].replace('"', '""') + '"'
+            aggregates += [
+                f"SUM({quoted} IS NULL)",
+                f"COUNT(DISTINCT {quoted})",
+                f"MIN({quoted})",
+                f"MAX({quoted})",
+            ]
+        stats = conn.execute(
+            f"SELECT {', '.join(aggregates)} FROM {table_name};"
+        ).fetchone()
+        row_count = stats[0]
+
+        columns = []
+        for i, column in enumerate(table_info):
+            nulls, distinct, min_value, max_value = stats[1 + i * 4 : 5 + i * 4]
+            columns.append(
+                {
+                    "name": column[1],
+                    "type": column[2],
+                    "min": min_value,
+                    "max": max_value,
+                    "approx_distinct": distinct,
+                    "null_fraction": (nulls or 0) / row_count if row_count else 0.0,
+                }
+            )
+
+        for column in columns:
+            if "CHAR" not in column["type"].upper() and "TEXT" not in column["type"].upper():
+                continue
+            if is_identifier_like(column["approx_distinct"], row_count):
+                continue
+            quoted = '"' + column["name"].replace('"', '""') + '"'
+            rows = conn.execute(
+                f"SELECT {quoted} FROM {table_name} WHERE {quoted} IS NOT NULL "
+                f"GROUP BY {quoted} ORDER BY COUNT(*) DESC LIMIT {PROFILE_TOP_K};"
+            ).fetchall()
+            column["top_values"] = [row[0] for row in rows]
+
+    return {"row_count": row_count, "columns": columns}
+
+
+def profile_table(reasoning: str, table_name: str) -> str:
+    """Returns per-column statistics for the specified table.
+
+    The agent uses this to learn null rates, distinct counts, value ranges and the
+    most frequent values in one call instead of several samples and test queries.
+    Profiles are cached on disk until the database file changes.
+
+    Args:
+        reasoning: Explanation of why we're profiling this table
+        table_name: Name of table to profile
+
+    Returns:
+        String containing one summary line per column
+    """
+    try:
+        fingerprint = file_fingerprint(DB_PATH, table_name)
+        profile = load_cached_profile(fingerprint)
+        cached = profile is not None
+        if not cached:
+            profile = compute_table_profile(table_name)
+            save_cached_profile(fingerprint, profile)
+        output = format_profile(profile)
+        console.log(
+            f"[blue]Profile Table Tool[/blue] - Table: {table_name} - Cached: {cached} - Reasoning: {reasoning}"
+        )
+        return output
+    except Exception as e:
+        console.log(f"[red]Error profiling table: {str(e)}[/red]")
+        return str(e)
+
+
 def run_test_sql_query(reasoning: str, sql_query: str) -> str:
     """Executes a test SQL query and returns results.
 
@@ -281,21 +801,116 @@ def run_test_sql_query(reasoning: str, sql_query: str) -> str:
         Query results as a string
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(sql_query)
-        rows = cursor.fetchall()
-        conn.commit()
-        conn.close()
-        output = "\n".join([str(row) for row in rows])
+        advice = advise_temp_indexes(sql_query)
+        output = execute_sql(sql_query)
         console.log(f"[blue]Test Query Tool[/blue] - Reasoning: {reasoning}")
         console.log(f"[dim]Query: {sql_query}[/dim]")
+        if advice:
+            output = f"{output}\n\n{advice}"
         return output
     except Exception as e:
         console.log(f"[red]Error running test query: {str(e)}[/red]")
         return str(e)
 
 
+# Limits for comparing candidate queries in one tool call
+MAX_CANDIDATE_QUERIES = 8
+CANDIDATE_PREVIEW_ROWS = 5
+
+
+def format_candidate_results(
+    sql_queries: List[str], results: List[Dict[str, Any]]
+) -> str:
+    """Renders candidate query results as one block per query, marking the fastest."""
+    timings = [result["elapsed_ms"] for result in results if "error" not in result]
+    fastest = min(timings) if timings else None
+    blocks = []
+    for i, (sql_query, result) in enumerate(zip(sql_queries, results), start=1):
+        if "error" in result:
+            lines = [f"query {i}: error: {' '.join(result['error'].split())}"]
+        else:
+            header = f"query {i}: {result['elapsed_ms']:.1f} ms, {result['row_count']} rows"
+            if result["elapsed_ms"] == fastest:
+                header += " (fastest)"
+            lines = [header]
+        lines.append(f"  sql: {' '.join(sql_query.split())}")
+        if "error" not in result:
+            lines.append(f"  columns: {', '.join(result['columns'])}")
+            lines += [f"  {row}" for row in result["preview"]]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def evaluate_candidate_query(sql_query: str) -> Dict[str, Any]:
+    """Runs one candidate query on a pooled read-only connection and measures it.
+
+    Pool connections are separate from the shared connection so candidates run
+    concurrently; they don't see the advisor's TEMP shadow tables. Candidates
+    that exceed QUERY_TIMEOUT_MS are aborted by a progress handler.
+
+    Args:
+        sql_query: The candidate SQL query
+
+    Returns:
+        Dict with elapsed_ms, row_count, columns and preview rows, or an error
+    """
+    try:
+        conn = _candidate_pool.get_nowait()
+    except queue.Empty:
+        conn = open_connection()
+    deadline = time.monotonic() + QUERY_TIMEOUT_MS / 1000
+    conn.set_progress_handler(
+        lambda: time.monotonic() > deadline, PROGRESS_HANDLER_STEPS
+    )
+    try:
+        start = time.perf_counter()
+        cursor = conn.execute(sql_query)
+        preview = cursor.fetchmany(CANDIDATE_PREVIEW_ROWS)
+        row_count = len(preview) + sum(1 for _ in cursor)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            "elapsed_ms": elapsed_ms,
+            "row_count": row_count,
+            "columns": [column[0] for column in cursor.description or []],
+            "preview": preview,
+        }
+    except Exception as e:
+        if time.monotonic() > deadline:
+            return {"error": f"timed out after {QUERY_TIMEOUT_MS} ms"}
+        return {"error": str(e)}
+    finally:
+        conn.set_progress_handler(None, 0)
+        _candidate_pool.put(conn)
+
+
+def run_test_sql_queries(reasoning: str, sql_queries: List[str]) -> str:
+    """Executes several alternative SQL queries concurrently and compares them.
+
+    The agent uses this to evaluate candidate formulations side by side and pick
+    the fastest correct one in a single call. Results are only shown to the agent.
+
+    Args:
+        reasoning: Explanation of why we're comparing these queries
+        sql_queries: Alternative SQL queries to compare (SELECT only)
+
+    Returns:
+        Per-query timing, row count and a preview of the first rows
+    """
+    try:
+        sql_queries = sql_queries[:MAX_CANDIDATE_QUERIES]
+        with ThreadPoolExecutor(max_workers=max(len(sql_queries), 1)) as executor:
+            results = list(executor.map(evaluate_candidate_query, sql_queries))
+        output = format_candidate_results(sql_queries, results)
+        console.log(
+            f"[blue]Compare Queries Tool[/blue] - Queries: {len(sql_queries)} - Reasoning: {reasoning}"
+        )
+        console.log(f"[dim]{output}[/dim]")
+        return output
+    except Exception as e:
+        console.log(f"[red]Error comparing queries: {str(e)}[/red]")
+        return str(e)
+
+
 def run_final_sql_query(reasoning: str, sql_query: str) -> str:
     """Executes the final SQL query and returns results to user.
 
@@ -309,13 +924,7 @@ def run_final_sql_query(reasoning: str, sql_query: str) -> str:
         Query results as a string
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(sql_query)
-        rows = cursor.fetchall()
-        conn.commit()
-        conn.close()
-        output = "\n".join([str(row) for row in rows])
+        output = execute_sql(sql_query)
         console.log(
             Panel(
                 f"[green]Final Query Tool[/green]\nReasoning: {reasoning}\nQuery: {sql_query}"
@@ -327,6 +936,64 @@ def run_final_sql_query(reasoning: str, sql_query: str) -> str:
         return str(e)
 
 
+def execute_tool_call(func_name: str, func_args_str: str) -> str:
+    """Validates a tool call's arguments and runs the matching tool function.
+
+    Called from worker threads so that every tool call in a model turn can run
+    concurrently.
+
+    Args:
+        func_name: Name of the pydantic model the tool call targets
+        func_args_str: JSON encoded arguments of the tool call
+
+    Returns:
+        The tool result
+    """
+    # Validate and parse arguments using the corresponding pydantic model
+    if func_name == "ListTablesArgs":
+        args_parsed = ListTablesArgs.model_validate_json(func_args_str)
+        return list_tables(reasoning=args_parsed.reasoning)
+    elif func_name == "DescribeTableArgs":
+        args_parsed = DescribeTableArgs.model_validate_json(func_args_str)
+        return describe_table(
+            reasoning=args_parsed.reasoning,
+            table_name=args_parsed.table_name,
+        )
+    elif func_name == "SampleTableArgs":
+        args_parsed = SampleTableArgs.model_validate_json(func_args_str)
+        return sample_table(
+            reasoning=args_parsed.reasoning,
+            table_name=args_parsed.table_name,
+            row_sample_size=args_parsed.row_sample_size,
+        )
+    elif func_name == "ProfileTableArgs":
+        args_parsed = ProfileTableArgs.model_validate_json(func_args_str)
+        return profile_table(
+            reasoning=args_parsed.reasoning,
+            table_name=args_parsed.table_name,
+        )
+    elif func_name == "RunTestSQLQuery":
+        args_parsed = RunTestSQLQuery.model_validate_json(func_args_str)
+        return run_test_sql_query(
+            reasoning=args_parsed.reasoning,
+            sql_query=args_parsed.sql_query,
+        )
+    elif func_name == "RunTestSQLQueries":
+        args_parsed = RunTestSQLQueries.model_validate_json(func_args_str)
+        return run_test_sql_queries(
+            reasoning=args_parsed.reasoning,
+            sql_queries=args_parsed.sql_queries,
+        )
+    elif func_name == "RunFinalSQLQuery":
+        args_parsed = RunFinalSQLQuery.model_validate_json(func_args_str)
+        return run_final_sql_query(
+            reasoning=args_parsed.reasoning,
+            sql_query=args_parsed.sql_query,
+        )
+    else:
+        raise Exception(f"Unknown tool call: {func_name}")
+
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="SQLite Agent using OpenAI API")
@@ -341,6 +1008,12 @@ def main():
         default=10,
         help="Maximum number of agent loops (default: 3)",
     )
+    parser.add_argument(
+        "--timeout-ms",
+        type=int,
+        default=30000,
+        help="Per-query time limit in milliseconds (default: 30000)",
+    )
     args = parser.parse_args()
 
     # Configure the API key
@@ -361,6 +1034,10 @@ def main():
     global DB_PATH
     DB_PATH = args.db
 
+    # Set global query time limit for tool functions
+    global QUERY_TIMEOUT_MS
+    QUERY_TIMEOUT_MS = args.timeout_ms
+
     # Create a single combined prompt based on the full template
     completed_prompt = AGENT_PROMPT.replace("{{user_request}}", args.prompt)
     messages = [{"role": "user", "content": completed_prompt}]
@@ -390,25 +1067,15 @@ def main():
                 messages=messages,
                 tools=tools,
                 tool_choice="required",
+                parallel_tool_calls=True,
             )
 
             if response.choices:
                 assert len(response.choices) == 1
                 message = response.choices[0].message
 
-                if message.function_call:
-                    func_call = message.function_call
-                elif message.tool_calls and len(message.tool_calls) > 0:
-                    # If a tool_calls list is present, use the first call and extract its function details.
-                    tool_call = message.tool_calls[0]
-                    func_call = tool_call.function
-                else:
-                    func_call = None
-
-                if func_call:
-                    func_name = func_call.name
-                    func_args_str = func_call.arguments
-
+                if message.tool_calls:
+                    tool_calls = message.tool_calls
                     messages.append(
                         {
                             "role": "assistant",
@@ -416,60 +1083,52 @@ def main():
                                 {
                                     "id": tool_call.id,
                                     "type": "function",
-                                    "function": func_call,
+                                    "function": tool_call.function,
                                 }
+                                for tool_call in tool_calls
                             ],
                         }
                     )
 
-                    console.print(
-                        f"[blue]Function Call:[/blue] {func_name}({func_args_str})"
-                    )
-                    try:
-                        # Validate and parse arguments using the corresponding pydantic model
-                        if func_name == "ListTablesArgs":
-                            args_parsed = ListTablesArgs.model_validate_json(
-                                func_args_str
-                            )
-                            result = list_tables(reasoning=args_parsed.reasoning)
-                        elif func_name == "DescribeTableArgs":
-                            args_parsed = DescribeTableArgs.model_validate_json(
-                                func_args_str
-                            )
-                            result = describe_table(
-                                reasoning=args_parsed.reasoning,
-                                table_name=args_parsed.table_name,
-                            )
-                        elif func_name == "SampleTableArgs":
-                            args_parsed = SampleTableArgs.model_validate_json(
-                                func_args_str
-                            )
-                            result = sample_table(
-                                reasoning=args_parsed.reasoning,
-                                table_name=args_parsed.table_name,
-                                row_sample_size=args_parsed.row_sample_size,
-                            )
-                        elif func_name == "RunTestSQLQuery":
-                            args_parsed = RunTestSQLQuery.model_validate_json(
-                                func_args_str
-                            )
-                            result = run_test_sql_query(
-                                reasoning=args_parsed.reasoning,
-                                sql_query=args_parsed.sql_query,
-                            )
-                        elif func_name == "RunFinalSQLQuery":
-                            args_parsed = RunFinalSQLQuery.model_validate_json(
-                                func_args_str
+                    for tool_call in tool_calls:
+                        console.print(
+                            f"[blue]Function Call:[/blue] {tool_call.function.name}({tool_call.function.arguments})"
+                        )
+
+                    # Execute every tool call from this turn concurrently
+                    with ThreadPoolExecutor(
+                        max_workers=min(len(tool_calls), MAX_PARALLEL_TOOL_CALLS)
+                    ) as executor:
+                        futures = [
+                            executor.submit(
+                                execute_tool_call,
+                                tool_call.function.name,
+                                tool_call.function.arguments,
                             )
-                            result = run_final_sql_query(
-                                reasoning=args_parsed.reasoning,
-                                sql_query=args_parsed.sql_query,
+                            for tool_call in tool_calls
+                        ]
+
+                    # Append all tool results in the order the calls were made
+                    final_result = None
+                    for tool_call, future in zip(tool_calls, futures):
+                        func_name = tool_call.function.name
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            error_msg = f"Argument validation failed for {func_name}: {e}"
+                            console.print(f"[red]{error_msg}[/red]")
+                            messages.append(
+                                {
+                                    "role": "tool",
+                                    "tool_call_id": tool_call.id,
+                                    "content": json.dumps({"error": error_msg}),
+                                }
                             )
-                            console.print("\n[green]Final Results:[/green]")
-                            console.print(result)
-                            return
-                        else:
-                            raise Exception(f"Unknown tool call: {func_name}")
+                            continue
+
+                        if func_name == "RunFinalSQLQuery":
+                            final_result = result
+                            continue
 
                         console.print(
                             f"[blue]Function Call Result:[/blue] {func_name}(...) ->\n{result}"
@@ -484,17 +1143,10 @@ def main():
                             }
                         )
 
-                    except Exception as e:
-                        error_msg = f"Argument validation failed for {func_name}: {e}"
-                        console.print(f"[red]{error_msg}[/red]")
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": json.dumps({"error": error_msg}),
-                            }
-                        )
-                        continue
+                    if final_result is not None:
+                        console.print("\n[green]Final Results:[/green]")
+                        console.print(final_result)
+                        return
                 else:
                     raise Exception(
                         "No function call in this response - should never happen"
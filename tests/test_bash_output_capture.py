@@ -0,0 +1,45 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(name, ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(
+    params=["sfa_bash_editor_agent_anthropic_v2", "sfa_bash_editor_agent_anthropic_v3"]
+)
+def agent(request):
+    return load(request.param)
+
+
+def test_single_long_line_keeps_head_and_tail(agent):
+    capture = agent.OutputCapture(100, spill=False)
+    capture.write(b"a" * 1000 + b"b" * 1000)
+    text = capture.text()
+    assert text.startswith("a" * 50 + "\n... [1,900 bytes")
+    assert text.endswith("b" * 50)
+
+
+def test_long_last_line_keeps_tail(agent):
+    capture = agent.OutputCapture(100, spill=False)
+    capture.write(b"a" * 1000 + b"\n" + b"b" * 1000 + b"\n")
+    text = capture.text()
+    assert text.startswith("a" * 50 + "\n...")
+    assert text.endswith("b" * 49 + "\n")
+
+
+def test_multiline_output_cut_at_line_boundaries(agent):
+    capture = agent.OutputCapture(40, spill=False)
+    capture.write(b"".join(f"line {i:03d}\n".encode() for i in range(100)))
+    head, rest = capture.text().split("... [", 1)
+    tail = rest.split("] ...\n", 1)[1]
+    assert head == "line 000\n" "line 001\n"
+    assert tail == "line 098\n" "line 099\n"
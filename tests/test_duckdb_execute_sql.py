@@ -0,0 +1,53 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(name, ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+AGENTS = ["sfa_duckdb_openai_v2", "sfa_duckdb_anthropic_v2"]
+try:
+    import google.genai  # noqa: F401
+
+    AGENTS.append("sfa_duckdb_gemini_v2")
+except ImportError:
+    pass
+
+
+@pytest.fixture(params=AGENTS)
+def agent(request, tmp_path):
+    module = load(request.param)
+    module.DB_PATH = str(tmp_path / "test.duckdb")
+    module.MAX_RESULT_ROWS = 50
+    yield module
+    if module._connection is not None:
+        module._connection.close()
+
+
+def test_renders_every_row_up_to_the_bound(agent):
+    result = agent.execute_sql("SELECT range AS x FROM range(40)")
+    lines = result.splitlines()
+    assert lines[0] == "x"
+    assert lines[1:41] == [str(i) for i in range(40)]
+    assert lines[-1] == "(40 rows)"
+
+
+def test_reports_when_the_bound_is_hit(agent):
+    result = agent.execute_sql("SELECT range AS x, NULL AS y FROM range(1000)")
+    lines = result.splitlines()
+    assert lines[0] == "x | y"
+    assert lines[50] == "49 | NULL"
+    assert len(lines) == 52
+    assert "stopped after 50 rows" in lines[-1]
+
+
+def test_statements_without_a_result(agent):
+    assert agent.execute_sql("CREATE TABLE t AS SELECT 1 AS a") == "OK"
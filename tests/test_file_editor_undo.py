@@ -0,0 +1,50 @@
+"""Tests for undo_edit in the file editor agent."""
+
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def editor(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location(
+        "sfa_file_editor_sonny37_v1", ROOT / "sfa_file_editor_sonny37_v1.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.edit_journal = module.EditJournal(1 << 20, 1 << 22)
+    monkeypatch.chdir(tmp_path)
+    return module
+
+
+def test_apply_edits_through_a_symlink_can_be_undone(editor, tmp_path):
+    (tmp_path / "target.txt").write_text("alpha\nbeta\n")
+    os.symlink("target.txt", tmp_path / "link.txt")
+
+    result = editor.apply_edits(
+        [
+            {"path": "link.txt", "old_str": "alpha", "new_str": "ALPHA"},
+            {"path": "./target.txt", "old_str": "beta", "new_str": "BETA"},
+        ]
+    )
+    assert "error" not in result
+    assert (tmp_path / "target.txt").read_text() == "ALPHA\nBETA\n"
+    assert (tmp_path / "link.txt").is_symlink()
+
+    result = editor.undo_edit("link.txt")
+    assert "error" not in result
+    assert (tmp_path / "target.txt").read_text() == "alpha\nbeta\n"
+
+
+def test_edit_through_the_target_is_undone_through_the_symlink(editor, tmp_path):
+    (tmp_path / "target.txt").write_text("alpha\n")
+    os.symlink("target.txt", tmp_path / "link.txt")
+
+    assert "error" not in editor.str_replace("target.txt", "alpha", "gamma")
+    assert "error" not in editor.undo_edit("link.txt")
+    assert (tmp_path / "target.txt").read_text() == "alpha\n"
+    assert "error" in editor.undo_edit("target.txt")
@@ -0,0 +1,65 @@
+"""Tests for the Parquet copy the Polars CSV agents keep of their input CSV."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+AGENTS = ["sfa_polars_csv_agent_openai_v2", "sfa_polars_csv_agent_anthropic_v3"]
+
+
+def load_agent(name: str):
+    spec = importlib.util.spec_from_file_location(name, ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=AGENTS)
+def agent(request, tmp_path, monkeypatch):
+    module = load_agent(request.param)
+    monkeypatch.setattr(module, "COLUMNAR_CACHE_DIR", str(tmp_path / "cache"))
+    return module
+
+
+def test_semicolon_csv_is_cached_with_its_separator(agent, tmp_path):
+    csv_path = tmp_path / "scores.csv"
+    csv_path.write_text(
+        "id;name;score\n" + "".join(f"{i};user{i};{i % 100}\n" for i in range(1000))
+    )
+
+    parquet_path = agent.get_columnar_cache(str(csv_path))
+    assert agent.columnar_cache_ready(str(csv_path)) == parquet_path
+
+    # Reads after the copy exists go through it and must see the same columns
+    lf = agent.scan_source(str(csv_path))
+    assert lf.collect_schema().names() == ["id", "name", "score"]
+    assert lf.select(agent.pl.col("score").sum()).collect().item() == sum(
+        i % 100 for i in range(1000)
+    )
+    assert agent.list_columns("test", str(csv_path)) == ["id", "name", "score"]
+    profile = agent.compute_csv_profile(str(csv_path))
+    assert [column["name"] for column in profile["columns"]] == ["id", "name", "score"]
+
+    # A plain pl.read_csv call doesn't parse this file like the copy, so it is left alone
+    code = f'df = pl.read_csv("{csv_path}")'
+    assert agent.use_columnar_cache(code) == code
+
+
+def test_comma_csv_reads_are_pointed_at_the_copy(agent, tmp_path):
+    csv_path = tmp_path / "scores.csv"
+    csv_path.write_text("id,score\n1,2\n3,4\n")
+    parquet_path = agent.get_columnar_cache(str(csv_path))
+
+    code = f'df = pl.read_csv("{csv_path}")'
+    assert agent.use_columnar_cache(code) == f"df = pl.read_parquet({parquet_path!r})"
+
+
+def test_list_columns_is_the_same_before_and_after_caching(agent, tmp_path):
+    csv_path = tmp_path / "cities.csv"
+    csv_path.write_text("name,city\nann,paris\nbob,rome\n")
+
+    before = agent.list_columns("test", str(csv_path))
+    agent.get_columnar_cache(str(csv_path))
+    assert agent.list_columns("test", str(csv_path)) == before == ["name", "city"]